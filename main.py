@@ -1,75 +1,67 @@
 import sys
+import argparse
 
-from PySide6.QtWidgets import QApplication
-from PySide6.QtCore import Qt
-from PySide6.QtGui import QPalette, QColor
-from tictactoe.ui.main_window import TicTacToeWindow
+# qt is only imported once we know a window is wanted, so headless runs
+# (cli play, bots, the server) start without loading PySide6
 
 # -----------------------------------------------------------------------------
-# COLOR CONSTANTS
-# -----------------------------------------------------------------------------
-
-WINDOW_COLOR = QColor(53, 53, 53)
-WINDOW_TEXT_COLOR = Qt.white
-BASE_COLOR = QColor(35, 35, 35)
-ALT_BASE_COLOR = QColor(53, 53, 53)
-TOOLTIP_BASE_COLOR = Qt.white
-TOOLTIP_TEXT_COLOR = Qt.black
-TEXT_COLOR = Qt.white
-BUTTON_COLOR = QColor(66, 66, 66)
-BUTTON_TEXT_COLOR = Qt.white
-BRIGHT_TEXT_COLOR = Qt.red
-LINK_COLOR = QColor(42, 130, 218)
-HIGHLIGHT_COLOR = QColor(42, 130, 218)
-HIGHLIGHTED_TEXT_COLOR = Qt.white
-PLACEHOLDER_TEXT_COLOR = QColor(160, 160, 160)
-
-DISABLED_TEXT_COLOR = QColor(127, 127, 127)
-DISABLED_BUTTON_TEXT_COLOR = QColor(127, 127, 127)
-DISABLED_WINDOW_TEXT_COLOR = QColor(127, 127, 127)
-
-# -----------------------------------------------------------------------------
-# PALETTE SETUP
+# ENTRY POINT
 # -----------------------------------------------------------------------------
 
-def apply_default_palette(app: QApplication):
+def parse_args(argv):
     """
-    Apply the default dark theme palette using predefined constants.
+    board options; anything unknown is left for Qt
     """
-    palette = QPalette()
-    # Standard roles
-    palette.setColor(QPalette.Window, WINDOW_COLOR)
-    palette.setColor(QPalette.WindowText, WINDOW_TEXT_COLOR)
-    palette.setColor(QPalette.Base, BASE_COLOR)
-    palette.setColor(QPalette.AlternateBase, ALT_BASE_COLOR)
-    palette.setColor(QPalette.ToolTipBase, TOOLTIP_BASE_COLOR)
-    palette.setColor(QPalette.ToolTipText, TOOLTIP_TEXT_COLOR)
-    palette.setColor(QPalette.Text, TEXT_COLOR)
-    palette.setColor(QPalette.Button, BUTTON_COLOR)
-    palette.setColor(QPalette.ButtonText, BUTTON_TEXT_COLOR)
-    palette.setColor(QPalette.BrightText, BRIGHT_TEXT_COLOR)
-    palette.setColor(QPalette.Link, LINK_COLOR)
-    palette.setColor(QPalette.Highlight, HIGHLIGHT_COLOR)
-    palette.setColor(QPalette.HighlightedText, HIGHLIGHTED_TEXT_COLOR)
-    # Placeholder text (e.g., QLineEdit placeholder)
-    palette.setColor(QPalette.PlaceholderText, PLACEHOLDER_TEXT_COLOR)
-    # Disabled roles
-    palette.setColor(QPalette.Disabled, QPalette.Text, DISABLED_TEXT_COLOR)
-    palette.setColor(QPalette.Disabled, QPalette.ButtonText, DISABLED_BUTTON_TEXT_COLOR)
-    palette.setColor(QPalette.Disabled, QPalette.WindowText, DISABLED_WINDOW_TEXT_COLOR)
-    app.setPalette(palette)
+    parser = argparse.ArgumentParser(description="Network Tic-Tac-Toe")
+    parser.add_argument("--size", type=int, default=3,
+                        help="cells per side (default 3)")
+    parser.add_argument("--win", type=int, default=None,
+                        help="marks in a row to win (default: size)")
+    parser.add_argument("--transport", choices=("thread", "qt"), default="thread",
+                        help="network i/o on a worker thread or the qt event loop")
+    parser.add_argument("--log", default=None, metavar="PATH",
+                        help="game record log (default ~/.tictactoe/games.ttr, "
+                             "'' to turn it off)")
+    parser.add_argument("--history", default=None, metavar="PATH",
+                        help="also keep games in a sqlite match history "
+                             "(e.g. ~/.tictactoe/history.db)")
+    parser.add_argument("--headless", action="store_true",
+                        help="no gui: play, bot or server from the terminal "
+                             "(see --headless --help)")
+    return parser.parse_known_args(argv)
 
-# -----------------------------------------------------------------------------
-# ENTRY POINT
-# -----------------------------------------------------------------------------
+def run_gui(args, qt_argv):
+    """
+    import qt, build the window, run the event loop
+    """
+    from PySide6.QtWidgets import QApplication
+    from tictactoe.ui.theme import apply_default_palette
+    from tictactoe.ui.main_window import TicTacToeWindow
 
-if __name__ == '__main__':
-    app = QApplication(sys.argv)
+    app = QApplication(sys.argv[:1] + qt_argv)
     app.setStyle('Fusion')
 
     # Apply default dark theme
     apply_default_palette(app)
 
-    window = TicTacToeWindow()
+    from tictactoe.records import DEFAULT_LOG
+    log_path = DEFAULT_LOG if args.log is None else args.log
+    window = TicTacToeWindow(args.size, args.win, args.transport, log_path,
+                             args.history)
     window.show()
-    sys.exit(app.exec())
\ No newline at end of file
+    return app.exec()
+
+if __name__ == '__main__':
+    argv = sys.argv[1:]
+    if '--headless' in argv:
+        # everything after the flag belongs to the headless cli; gui options
+        # in front of it have no meaning there, board options go after the
+        # subcommand (--headless play --size 5)
+        i = argv.index('--headless')
+        if argv[:i]:
+            sys.exit(f"main.py: {' '.join(argv[:i])}: with --headless, options go "
+                     f"after the subcommand (--headless play --size 5)")
+        from tictactoe.cli import main as headless_main
+        sys.exit(headless_main(argv[i + 1:]))
+    args, qt_argv = parse_args(argv)
+    sys.exit(run_gui(args, qt_argv))
@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+from tictactoe.batch import (
+    EMPTY, INVALID, O, STATUS_NAMES, X, BatchGameLogic, random_playouts
+)
+from tictactoe.game_logic import GameLogic
+
+# the batch engine move for move against GameLogic, invalid moves included
+#   python -m pytest -q
+
+WINNERS = {EMPTY: None, X: 'X', O: 'O'}
+
+@pytest.mark.parametrize('n, k', [(3, 3), (4, 3), (5, 4), (7, 5)])
+def test_matches_game_logic(n, k):
+    rng = np.random.default_rng(n * 10 + k)
+    batch = BatchGameLogic(200, n, k)
+    games = [GameLogic(n, k) for _ in range(200)]
+    for turn in range(2 * n * n):
+        # mostly open cells, some taken or off the board, and moves
+        # keep coming after a game ends
+        rows, cols = batch.random_moves(rng)
+        noise = rng.random(200) < 0.2
+        rows = np.where(noise, rng.integers(-1, n + 1, 200), rows)
+        cols = np.where(noise, rng.integers(-1, n + 1, 200), cols)
+        players = np.where(rng.random(200) < 0.5, X, O)
+        status = STATUS_NAMES[batch.make_moves(rows, cols, players)]
+        for i, g in enumerate(games):
+            got = g.make_move(int(rows[i]), int(cols[i]), 'X' if players[i] == X else 'O')
+            assert status[i] == got, (turn, i)
+            assert batch.game_over[i] == g.game_over
+            assert WINNERS[int(batch.winner[i])] == g.winner
+            assert batch.move_count[i] == g.move_count
+
+def test_empty_cells_and_partial_reset():
+    batch = BatchGameLogic(3)
+    batch.make_moves([1, 0, 2], [1, 0, 2], 'X')
+    assert batch.empty_cells().sum(axis=1).tolist() == [8, 8, 8]
+    assert not batch.empty_cells()[0, 4]
+    batch.reset_game([True, False, True])
+    assert batch.move_count.tolist() == [0, 1, 0]
+    assert batch.empty_cells().sum(axis=1).tolist() == [9, 8, 9]
+
+def test_finished_games_get_no_moves():
+    batch = BatchGameLogic(1)
+    for c in range(3): batch.make_moves([0], [c], 'X')
+    assert batch.game_over[0]
+    rows, cols = batch.random_moves(np.random.default_rng(0))
+    assert (rows[0], cols[0]) == (-1, -1)
+    assert batch.make_moves(rows, cols, 'O')[0] == INVALID
+
+def test_random_playouts_add_up():
+    r = random_playouts(1000, seed=1)
+    assert r['X'] + r['O'] + r['draw'] == 1000
+    assert r['X'] > r['O']                       # first move is worth something
+    assert 5 * 1000 <= r['moves'] <= 9 * 1000
+
+def test_refuses_big_boards():
+    with pytest.raises(ValueError):
+        BatchGameLogic(1, 8)
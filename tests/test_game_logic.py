@@ -0,0 +1,143 @@
+import random
+import pytest
+from tictactoe.bitboard import BitboardGameLogic
+from tictactoe.game_logic import GameLogic
+
+# both engines: zobrist hashing, make/unmake and move generation
+#   python -m pytest -q
+
+ENGINES = [GameLogic, BitboardGameLogic]
+
+def _random_game(engine, n, k, seed, stop=None):
+    # random legal moves until the game ends (or `stop` moves)
+    rng = random.Random(seed); game = engine(n, k); player = 'X'
+    while not game.game_over and (stop is None or game.move_count < stop):
+        r, c = rng.choice(list(game.legal_moves()))
+        game.make_move(r, c, player)
+        player = 'O' if player == 'X' else 'X'
+    return game
+
+def _rehash(game):
+    # the hash from scratch: a fresh engine loaded with the same marks
+    fresh = type(game)(game.board_size, game.win_length)
+    n = game.board_size; board = game.game_board
+    fresh.load_masks(sum(1 << r*n + c for r in range(n) for c in range(n) if board[r][c] == 'X'),
+                     sum(1 << r*n + c for r in range(n) for c in range(n) if board[r][c] == 'O'))
+    return fresh.zobrist_hash
+
+# ----- zobrist -----
+
+@pytest.mark.parametrize('engine', ENGINES)
+def test_hash_tracks_the_board(engine):
+    for seed in range(20):
+        game = _random_game(engine, 4, 3, seed)
+        assert game.zobrist_hash == _rehash(game)
+
+@pytest.mark.parametrize('engine', ENGINES)
+def test_hash_ignores_move_order(engine):
+    a = engine(3); b = engine(3)
+    for r, c, p in [(0, 0, 'X'), (1, 1, 'O'), (2, 2, 'X')]: a.make_move(r, c, p)
+    for r, c, p in [(2, 2, 'X'), (1, 1, 'O'), (0, 0, 'X')]: b.make_move(r, c, p)
+    assert a.zobrist_hash == b.zobrist_hash != 0
+
+def test_engines_hash_alike():
+    for seed in range(20):
+        assert _random_game(GameLogic, 5, 4, seed).zobrist_hash == \
+               _random_game(BitboardGameLogic, 5, 4, seed).zobrist_hash
+
+@pytest.mark.parametrize('engine', ENGINES)
+def test_invalid_move_and_reset_keep_hash(engine):
+    game = engine(3); game.make_move(1, 1, 'X'); h = game.zobrist_hash
+    assert game.make_move(1, 1, 'O') == "invalid"
+    assert game.zobrist_hash == h
+    game.reset_game()
+    assert game.zobrist_hash == 0
+
+@pytest.mark.parametrize('engine', ENGINES)
+def test_unknown_mark_is_an_invalid_move(engine):
+    game = engine(3)
+    for player in ('Z', '', None, 'x'):
+        assert game.make_move(0, 0, player) == "invalid"
+    assert game.move_count == 0 and game.zobrist_hash == 0
+    assert game.make_move(0, 0, 'X') == "continue"
+
+# ----- make / unmake -----
+
+def _state(game):
+    return ([row[:] for row in game.game_board], game.move_count, game.game_over,
+            game.winner, game.zobrist_hash, game.empty_mask, list(game.move_stack))
+
+@pytest.mark.parametrize('engine', ENGINES)
+def test_unmake_restores_every_step(engine):
+    for seed in range(20):
+        game = _random_game(engine, 4, 3, seed)
+        replay = engine(4, 3); states = [_state(replay)]
+        for r, c, p in game.move_stack:
+            replay.make_move(r, c, p); states.append(_state(replay))
+        assert states[-1] == _state(game)
+        while game.move_stack:
+            states.pop()
+            game.unmake_move()
+            assert _state(game) == states[-1]
+        assert game.zobrist_hash == 0
+
+@pytest.mark.parametrize('engine', ENGINES)
+def test_unmake_the_winning_move(engine):
+    game = engine(3)
+    for r, c, p in [(0, 0, 'X'), (1, 0, 'O'), (0, 1, 'X'), (1, 1, 'O')]:
+        game.make_move(r, c, p)
+    assert game.make_move(0, 2, 'X') == "win"
+    assert game.unmake_move() == (0, 2, 'X')
+    assert not game.game_over and game.winner is None
+    assert game.make_move(1, 2, 'O') == "win" and game.winner == 'O'
+
+@pytest.mark.parametrize('engine', ENGINES)
+def test_push_pop_and_empty_stack(engine):
+    game = engine(3)
+    with pytest.raises(IndexError):
+        game.pop()
+    game.push(1, 1, 'X')
+    assert game.pop() == (1, 1, 'X') and game.move_count == 0
+
+@pytest.mark.parametrize('engine', ENGINES)
+def test_invalid_move_isnt_stacked(engine):
+    game = engine(3); game.make_move(0, 0, 'X')
+    assert game.make_move(0, 0, 'O') == "invalid"
+    assert game.make_move(3, 0, 'O') == "invalid"
+    assert game.move_stack == [(0, 0, 'X')]
+
+# ----- move generation -----
+
+def _open_cells(game):
+    n = game.board_size
+    return [(r, c) for r in range(n) for c in range(n) if game.is_cell_empty(r, c)]
+
+@pytest.mark.parametrize('engine', ENGINES)
+def test_legal_moves_are_the_open_cells(engine):
+    for seed in range(20):
+        game = _random_game(engine, 5, 4, seed, stop=seed)
+        n = game.board_size; over = game.game_over
+        assert game.empty_mask == sum(1 << r*n + c for r, c in _open_cells(game))
+        assert list(game.legal_moves()) == ([] if over else _open_cells(game))
+        assert game.legal_mask == (0 if over else game.empty_mask)
+
+@pytest.mark.parametrize('engine', ENGINES)
+def test_no_legal_moves_once_over(engine):
+    game = _random_game(engine, 3, 3, 7)
+    assert game.game_over
+    assert list(game.legal_moves()) == [] and game.legal_mask == 0
+    game.unmake_move()
+    assert list(game.legal_moves()) == _open_cells(game)
+
+@pytest.mark.parametrize('engine', ENGINES)
+def test_mask_after_load_and_reset(engine):
+    game = engine(3); game.load_masks(0b000010001, 0b100000000)
+    assert game.empty_mask == 0b011101110
+    assert list(game.legal_moves()) == [(0, 1), (0, 2), (1, 0), (1, 2), (2, 0), (2, 1)]
+    game.reset_game()
+    assert game.empty_mask == 0b111111111 and len(list(game.legal_moves())) == 9
+
+def test_big_board_moves():
+    game = GameLogic(20, 5); game.make_move(19, 19, 'X'); game.make_move(0, 0, 'O')
+    moves = list(game.legal_moves())
+    assert len(moves) == 398 and moves[0] == (0, 1) and moves[-1] == (19, 18)
@@ -0,0 +1,31 @@
+import time
+from tictactoe.history import MatchHistory, open_db, player_results, recent_games
+from tictactoe.records import GameRecord
+
+# the background writer and the per-player queries
+#   python -m pytest -q
+
+def _rec(x, o, winner='X', started=1, moves=((0, 0), (1, 1), (0, 1))):
+    return GameRecord(3, 3, 'X', list(moves), winner, True, x, o, started, 5)
+
+def test_written_games_read_back(tmp_path):
+    path = str(tmp_path / 'h.db')
+    games = [_rec('alice', 'bob', 'X', 1), _rec('bob', 'alice', None, 2),
+             _rec('carol', 'alice', 'X', 3)]
+    with MatchHistory(path, flush_interval=0.01) as h:
+        for g in games: h.append(g)
+    assert h.written == 3
+    db = open_db(path)
+    assert recent_games(db, 'alice') == games[::-1]
+    assert player_results(db, 'alice') == (1, 1, 1, 0)
+    assert recent_games(db, 'nobody') == []
+
+def test_unopenable_db_drops_games(tmp_path):
+    blocker = tmp_path / 'file'; blocker.write_text('')
+    h = MatchHistory(str(blocker / 'h.db'))          # parent is a file
+    deadline = time.monotonic() + 5
+    while not h.dead and time.monotonic() < deadline: time.sleep(0.01)
+    assert h.dead
+    for _ in range(100): h.append(_rec('a', 'b'))
+    assert h._queue.empty()
+    h.close()
@@ -0,0 +1,23 @@
+import pytest
+from tictactoe.game_logic import GameLogic
+from tictactoe.policies import POLICIES, make_policy, policy_for_board
+
+# every policy plays legal moves; the solver is kept off boards it can't search
+#   python -m pytest -q
+
+@pytest.mark.parametrize('name', sorted(POLICIES))
+def test_plays_legal_moves_to_the_end(name):
+    policy = make_policy(policy_for_board(name, 4), seed=1)
+    game = GameLogic(4, 3); player = 'X'
+    while not game.game_over:
+        assert game.make_move(*policy(game, player), player) != "invalid"
+        player = 'O' if player == 'X' else 'X'
+
+def test_solver_falls_back_on_big_boards():
+    assert policy_for_board('solver', 3) == 'solver'
+    assert policy_for_board('solver', 4) == 'heuristic'
+    assert policy_for_board('random', 9) == 'random'
+
+def test_unknown_policy():
+    with pytest.raises(ValueError):
+        make_policy('oracle')
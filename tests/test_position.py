@@ -0,0 +1,63 @@
+import pickle
+import pytest
+from tictactoe.bitboard import BitboardGameLogic
+from tictactoe.game_logic import GameLogic
+from tictactoe.position import Position
+
+# Position round trips through engines, pickle and play()
+#   python -m pytest -q
+
+def _game(moves, n=3, k=None, engine=GameLogic):
+    game = engine(n, k); player = 'X'
+    for r, c in moves:
+        game.make_move(r, c, player); player = 'O' if player == 'X' else 'X'
+    return game
+
+@pytest.mark.parametrize('engine', [GameLogic, BitboardGameLogic])
+def test_round_trip_through_an_engine(engine):
+    game = _game([(1, 1), (0, 0), (2, 1), (0, 1)], 4, 3, engine)
+    pos = Position.from_game(game)
+    assert pos.to_move == 'X' and pos.move_count == 4
+    back = pos.to_game(engine)
+    assert back.game_board == game.game_board
+    assert back.zobrist_hash == game.zobrist_hash
+    assert (back.game_over, back.winner) == (game.game_over, game.winner)
+    assert Position.from_game(back, 'X') == pos
+
+def test_finished_game_round_trip():
+    game = _game([(0, 0), (1, 0), (0, 1), (1, 1), (0, 2)])
+    back = Position.from_game(game).to_game()
+    assert back.game_over and back.winner == 'X'
+
+def test_fields_and_identity():
+    pos = Position(0b101, 0b010000, 3, 3, 'O')
+    assert (pos.x, pos.o, pos.board_size, pos.win_length, pos.to_move) == \
+           (0b101, 0b010000, 3, 3, 'O')
+    assert pos == Position(0b101, 0b010000, 3, 3, 'O')
+    assert pos != Position(0b101, 0b010000, 3, 3, 'X')
+    assert len({pos, Position(0b101, 0b010000, 3, 3, 'O')}) == 1
+    assert pickle.loads(pickle.dumps(pos)) == pos
+    with pytest.raises(AttributeError):
+        pos.stones = 0
+
+def test_big_boards_keep_their_shape():
+    # 16 bits each for size and win length, past the old 8
+    pos = Position(1, 1 << 299*300, 300, 260, 'O')
+    assert (pos.board_size, pos.win_length, pos.to_move) == (300, 260, 'O')
+    assert pos.o == 1 << 299*300 and pos.x == 1
+    with pytest.raises(ValueError):
+        Position(board_size=0x10000)
+
+def test_play_matches_the_engine():
+    moves = [(1, 1), (0, 2), (2, 0), (0, 0)]
+    pos = Position()
+    for r, c in moves: pos = pos.play(r, c)
+    assert pos == Position.from_game(_game(moves))
+    with pytest.raises(ValueError):
+        pos.play(1, 1)
+
+def test_bad_masks():
+    with pytest.raises(ValueError):
+        Position(0b1, 0b1)
+    with pytest.raises(ValueError):
+        Position(1 << 9)
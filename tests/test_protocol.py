@@ -0,0 +1,76 @@
+import struct
+import pytest
+from tictactoe.protocol import (
+    T_MOVE, T_REQ_REMATCH, T_ASSIGN, HELLO_SIZE, MAX_BOARD, FrameCodec, TextCodec,
+    ProtocolError, hello, negotiate
+)
+
+# wire framing and protocol negotiation
+#   python -m pytest -q
+
+MSGS = [(T_MOVE, 1, 2), (T_REQ_REMATCH,), (T_ASSIGN, 'O'), (T_MOVE, 300, 7)]
+
+def _stream(msgs):
+    codec = FrameCodec()
+    return b''.join(codec.encode(m) for m in msgs)
+
+# ----- FrameCodec -----
+
+def test_feed_one_byte_at_a_time():
+    codec = FrameCodec(); got = []
+    data = _stream(MSGS)
+    for i in range(len(data)):
+        got += codec.feed(data[i:i+1])
+    assert got == MSGS
+
+def test_feed_coalesced_and_split_mid_frame():
+    data = _stream(MSGS)
+    for cut in range(1, len(data)):
+        codec = FrameCodec()
+        assert codec.feed(data[:cut]) + codec.feed(data[cut:]) == MSGS
+
+def test_drain_keeps_partial_frame():
+    data = _stream(MSGS[:2])
+    cut = len(_stream(MSGS[:1])) + 1      # one byte into the second frame
+    codec = FrameCodec()
+    assert codec.feed(data[:cut]) == [MSGS[0]]
+    assert codec.drain() == []
+    assert codec.feed(data[cut:]) == [MSGS[1]]
+
+def test_feed_wraps_a_small_buffer():
+    # more bytes than the buffer holds, so the tail gets compacted
+    msgs = [(T_MOVE, i, i + 1) for i in range(200)]
+    codec = FrameCodec(size=128); data = _stream(msgs); got = []
+    for i in range(0, len(data), 13):
+        got += codec.feed(data[i:i+13])
+    assert got == msgs
+
+def test_drain_rejects_oversized_frame():
+    with pytest.raises(ProtocolError):
+        FrameCodec().feed(struct.pack('>HB', 1000, T_MOVE))
+
+# ----- negotiate -----
+
+def test_negotiate_silent_peer_is_legacy():
+    codec, leftover = negotiate(b'', 3)
+    assert isinstance(codec, TextCodec) and leftover == b''
+
+def test_negotiate_text_move_is_legacy():
+    codec, leftover = negotiate(b'1,1', 3)
+    assert isinstance(codec, TextCodec)
+    assert codec.feed(leftover) == [(T_MOVE, 1, 1)]
+
+def test_negotiate_binary_hands_back_leftover():
+    data = _stream([hello(4, 3), (T_MOVE, 0, 3)])
+    codec, leftover = negotiate(data, 4, 3)
+    assert isinstance(codec, FrameCodec) and len(leftover) == len(data) - HELLO_SIZE
+    assert codec.feed(leftover) == [(T_MOVE, 0, 3)]
+
+def test_negotiate_board_mismatch():
+    with pytest.raises(ProtocolError):
+        negotiate(_stream([hello(3)]), 4)
+
+def test_hello_refuses_boards_it_cant_carry():
+    assert hello(MAX_BOARD)[2:] == (MAX_BOARD, MAX_BOARD)
+    with pytest.raises(ProtocolError):
+        hello(MAX_BOARD + 1)
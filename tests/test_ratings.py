@@ -0,0 +1,81 @@
+import json, threading
+import pytest
+from tictactoe import ratings as ratings_mod
+from tictactoe.history import MatchHistory, open_db
+from tictactoe.ratings import START, Ratings
+from tictactoe.records import GameRecord
+
+# elo updates and the live / history split between ladders
+#   python -m pytest -q
+
+def _rec(x, o, winner='X', finished=True):
+    return GameRecord(3, 3, 'X', [], winner, finished, x, o, 1, 0)
+
+@pytest.fixture
+def history(tmp_path):
+    path = str(tmp_path / 'history.db')
+    with MatchHistory(path) as h:
+        for _ in range(3): h.append(_rec('alice', 'bob'))
+        h.append(_rec('bob', 'carol', None, False))
+    db = open_db(path)
+    yield db
+    db.close()
+
+def test_update_is_zero_sum():
+    r = Ratings()
+    for rec in (_rec('a', 'b'), _rec('b', 'c', 'O'), _rec('c', 'a', None)): r.append(rec)
+    assert sum(r.rating(n) for n in 'abc') == pytest.approx(3 * START)
+    assert r.players['a'][1:] == [2, 1, 1, 0] and r.games == 3
+
+def test_self_play_and_unfinished_are_skipped():
+    r = Ratings(); r.append(_rec('a', 'a')); r.append(_rec('a', 'b', None, False))
+    assert r.games == 0 and r.players == {}
+
+def test_history_ladder_resumes_from_last_id(history, tmp_path):
+    path = str(tmp_path / 'h.json')
+    r = Ratings(source='history')
+    assert r.apply_history(history) == 3            # unfinished row skipped
+    r.snapshot(path, wait=True)
+    again = Ratings.load(path, 0, 'history')
+    assert again.apply_history(history) == 0
+    assert again.players == r.players and again.last_id == 4
+
+def test_history_ladder_refuses_live_games(history):
+    r = Ratings(source='history'); r.apply_history(history)
+    with pytest.raises(ValueError):
+        r.append(_rec('alice', 'bob'))
+
+def test_live_ladder_refuses_history(history):
+    r = Ratings(); r.append(_rec('alice', 'bob'))
+    with pytest.raises(ValueError):
+        r.apply_history(history)
+    assert Ratings().apply_history(history) == 3   # an empty one may turn
+
+def test_load_refuses_the_other_kind(tmp_path):
+    live = str(tmp_path / 'live.json')
+    r = Ratings(live); r.append(_rec('a', 'b')); r.close()
+    assert json.load(open(live))['source'] == 'live'
+    assert Ratings.load(live).games == 1
+    with pytest.raises(ValueError):
+        Ratings.load(live, source='history')
+
+def test_load_infers_old_snapshots(tmp_path):
+    # written before the source field: last_id says which kind it was
+    old = str(tmp_path / 'old.json')
+    with open(old, 'w') as f:
+        json.dump({'version': 1, 'games': 1, 'last_id': 7,
+                   'players': {'a': [1510.0, 1, 1, 0, 0]}}, f)
+    assert Ratings.load(old, source='history').last_id == 7
+    with pytest.raises(ValueError):
+        Ratings.load(old)
+
+def test_auto_snapshot_doesnt_wait_on_a_slow_write(tmp_path, monkeypatch):
+    release = threading.Event(); writes = []
+    def slow_write(path, data):
+        release.wait(5); writes.append(data['games'])
+    monkeypatch.setattr(ratings_mod, '_write_json', slow_write)
+    r = Ratings(str(tmp_path / 'r.json'), snapshot_every=2)
+    for _ in range(10): r.update('a', 'b', 'X')
+    assert writes == []                           # nothing waited on the first write
+    release.set(); r.close()
+    assert writes[0] == 2 and writes[-1] == 10
@@ -0,0 +1,70 @@
+import pytest
+from tictactoe.records import (
+    FILE_HEADER, MAGIC, RECORDS, VERSION, GameLog, GameRecord, encode_record,
+    read_records, scan_records
+)
+
+# record log round trips, layouts and torn-tail handling
+#   python -m pytest -q
+
+RECORD = RECORDS[VERSION]
+
+def _rec(i, moves=((0, 0), (1, 1), (0, 1), (2, 2), (0, 2))):
+    return GameRecord(3, 3, 'X', list(moves), 'X', True, f"p{i}", 'bot',
+                      1700000000 + i, 12)
+
+def _log(recs):
+    return FILE_HEADER.pack(MAGIC, VERSION) + b''.join(map(encode_record, recs))
+
+def test_scan_round_trip():
+    recs = [_rec(i) for i in range(5)]
+    assert [r for _, r in scan_records(_log(recs))] == recs
+
+def test_scan_stops_at_torn_tail():
+    recs = [_rec(i) for i in range(3)]
+    whole = _log(recs); last = len(_log(recs[:2]))
+    for cut in range(last + 1, len(whole)):
+        got = list(scan_records(whole[:cut]))
+        assert [r for _, r in got] == recs[:2]
+        assert got[-1][0] < last
+
+def test_scan_stops_at_bad_trailer():
+    buf = bytearray(_log([_rec(0), _rec(1)]))
+    buf[-1] ^= 0xff
+    assert [r for _, r in scan_records(buf)] == [_rec(0)]
+
+def test_gamelog_cuts_torn_tail_on_open(tmp_path):
+    path = str(tmp_path / 'games.ttr')
+    with open(path, 'wb') as f:
+        f.write(_log([_rec(0), _rec(1)]) + encode_record(_rec(2))[:-3])
+    with GameLog(path) as log: log.append(_rec(3))
+    assert list(read_records(path)) == [_rec(0), _rec(1), _rec(3)]
+
+def test_big_board_round_trip():
+    rec = GameRecord(300, 5, 'O', [(0, 0), (299, 299), (150, 7)], None, False,
+                     'a', 'b', 1, 2)
+    assert [r for _, r in scan_records(_log([rec]))] == [rec]
+
+def test_v1_log_read_and_appended_in_its_layout(tmp_path):
+    path = str(tmp_path / 'old.ttr')
+    with open(path, 'wb') as f:
+        f.write(FILE_HEADER.pack(MAGIC, 1) + encode_record(_rec(0), 1))
+    with GameLog(path) as log:
+        log.append(_rec(1))
+        with pytest.raises(ValueError):
+            log.append(GameRecord(300, 5, 'X', [], None, False, '', '', 1, 0))
+    assert list(read_records(path)) == [_rec(0), _rec(1)]
+
+def test_scan_rejects_more_moves_than_cells():
+    # a flipped count byte still passes the size and trailer checks
+    rec = GameRecord(3, 3, 'X', [(0, 0), (1, 1)], None, False, 'a', 'b', 1, 2)
+    buf = bytearray(_log([rec]))
+    count = FILE_HEADER.size + RECORD.size - 4
+    assert buf[count] == 2
+    buf[count] = 10
+    assert list(scan_records(buf)) == []
+
+def test_scan_rejects_empty_board():
+    buf = bytearray(_log([_rec(0)]))
+    buf[FILE_HEADER.size] = 0
+    assert list(scan_records(buf)) == []
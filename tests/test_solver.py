@@ -0,0 +1,72 @@
+from functools import lru_cache
+import pytest
+from tictactoe.bitboard import line_tables
+from tictactoe.game_logic import GameLogic
+from tictactoe.solver import Solver, symmetry_perms
+from tictactoe.tablebase import reachable_positions
+
+# solver values against a plain minimax with no table or symmetry folding
+#   python -m pytest -q
+
+@lru_cache(maxsize=None)
+def _minimax(me, opp, n, k):
+    # 1 win, 0 draw, -1 loss for the side to move
+    _, cell_lines, full = line_tables(n, k)
+    if me | opp == full: return 0
+    best = -1
+    for i in range(n*n):
+        if (me | opp) >> i & 1: continue
+        nme = me | 1 << i
+        if any(nme & m == m for m in cell_lines[i]): return 1
+        best = max(best, -_minimax(opp, nme, n, k))
+    return best
+
+def _game(moves, n=3, k=None):
+    game = GameLogic(n, k); player = 'X'
+    for r, c in moves:
+        assert game.make_move(r, c, player) != "invalid"
+        player = 'O' if player == 'X' else 'X'
+    return game
+
+def test_empty_board_is_a_draw():
+    value, moves = Solver(3).solve(GameLogic(3))
+    assert value == 0 and len(moves) == 9       # every opening draws
+
+def test_takes_the_win():
+    game = _game([(0, 0), (1, 0), (0, 1), (1, 1)])
+    assert Solver(3).solve(game) == (1, [(0, 2)])
+
+def test_blocks_the_only_threat():
+    game = _game([(0, 0), (1, 1), (0, 1)])
+    assert Solver(3).solve(game) == (0, [(0, 2)])
+
+def test_finished_game():
+    game = _game([(0, 0), (1, 0), (0, 1), (1, 1), (0, 2)])
+    assert Solver(3).solve(game, 'O') == (-1, [])
+
+@pytest.mark.parametrize('k', [3, 2])
+def test_values_match_minimax(k):
+    # every reachable 3x3 position, and every move the solver calls best
+    solver = Solver(3, k); _, cell_lines, _ = line_tables(3, k)
+    for me, opp, game in reachable_positions(3, k):
+        if game.game_over: continue
+        value, best = solver.solve_masks(me, opp)
+        assert value == _minimax(me, opp, 3, k)
+        for i in best:
+            nme = me | 1 << i
+            won = any(nme & m == m for m in cell_lines[i])
+            assert (1 if won else -_minimax(opp, nme, 3, k)) == value
+
+def test_canonical_is_symmetry_invariant():
+    solver = Solver(3); me, opp = 0b000000011, 0b000010000
+    for perm in symmetry_perms(3):
+        pm = sum(1 << perm[i] for i in range(9) if me >> i & 1)
+        po = sum(1 << perm[i] for i in range(9) if opp >> i & 1)
+        assert solver.canonical(pm, po) == solver.canonical(me, opp)
+
+def test_bounded_table_keeps_answers():
+    small = Solver(3, max_entries=64)
+    assert small.solve(GameLogic(3))[0] == 0
+    assert len(small.table) <= 64 and len(small._root_cache) <= 64
+    game = _game([(0, 0), (1, 1), (0, 1)])
+    assert small.solve(game) == Solver(3).solve(game)
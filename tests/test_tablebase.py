@@ -0,0 +1,51 @@
+import pytest
+from tictactoe.game_logic import GameLogic
+from tictactoe.solver import Solver
+from tictactoe.tablebase import Tablebase, build, reachable_positions
+
+# tablebase lookups against the solver it was built from
+#   python -m pytest -q
+
+@pytest.fixture(scope='module')
+def table(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp('tb') / 'tb_3x3.ttb')
+    count = build(path)
+    tb = Tablebase(path)
+    yield tb, count
+    tb.close()
+
+def test_every_reachable_position_matches_the_solver(table):
+    tb, count = table
+    solver = Solver(3); seen = 0
+    for me, opp, game in reachable_positions(3):
+        value, mask = tb.lookup_masks(me, opp)
+        if game.game_over:
+            assert (value, mask) == (-1 if game.winner else 0, 0)
+        else:
+            want, moves = solver.solve_masks(me, opp)
+            assert (value, mask) == (want, sum(1 << i for i in moves))
+        seen += 1
+    assert seen == count
+
+def test_lookup_agrees_with_solve(table):
+    tb, _ = table
+    game = GameLogic(3)
+    for r, c, p in [(1, 1, 'X'), (0, 0, 'O'), (2, 2, 'X')]:
+        game.make_move(r, c, p)
+        assert tb.lookup(game) == Solver(3).solve(game)
+
+def test_unreachable_position(table):
+    tb, _ = table
+    assert tb.lookup_masks(0b111, 0b111000) is None   # both have three in a row
+
+def test_refuses_other_boards(table):
+    tb, _ = table
+    with pytest.raises(ValueError):
+        tb.lookup(GameLogic(4))
+    with pytest.raises(ValueError):
+        build('unused.ttb', 4)                    # entries only fit 3x3
+
+def test_bad_file(tmp_path):
+    path = tmp_path / 'junk.ttb'; path.write_bytes(b'\0' * 32)
+    with pytest.raises(ValueError):
+        Tablebase(str(path))
@@ -0,0 +1,18 @@
+from tictactoe.tournament import SEATS, _run_chunk, run_tournament
+
+# tallies from the first seat's side, timing kept per seat
+#   python -m pytest -q
+
+def test_same_policy_keeps_both_seats():
+    t = _run_chunk(('solver', 'solver', 0, 20, 3, None, 0))
+    assert t['games'] == t['draws'] == 20               # perfect play draws
+    assert set(t['moves']) == set(t['seconds']) == set(SEATS)
+    # seats alternate X and O, X always has the odd move of a draw
+    assert t['moves']['first'] == t['moves']['second'] == 20 * 9 // 2
+
+def test_pool_merge_matches_one_chunk():
+    whole = _run_chunk(('random', 'heuristic', 0, 60, 3, None, 5))
+    t = run_tournament('random', 'heuristic', 60, workers=2, chunk_size=60, seed=5)
+    for key in ('games', 'wins', 'draws', 'losses', 'moves'):
+        assert t[key] == whole[key]
+    assert t['wins'] + t['draws'] + t['losses'] == 60
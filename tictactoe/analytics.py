@@ -0,0 +1,178 @@
+import argparse, os, sys, time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from .game_logic import GameLogic
+from .records import map_log, record_size, scan_records, split_log
+
+# python -m tictactoe.analytics games.ttr [more.ttr ...] -j 8
+# each worker streams one record-aligned byte range of a log through
+# read -> replay -> fold generator stages; the parent merges the tallies
+
+def _new_tally():
+    return {
+        'games': 0, 'unfinished': 0, 'moves': 0,
+        'first_won': 0, 'first_lost': 0, 'draws': 0,
+        'openings': Counter(),            # (board size, first moves) -> games
+        'players': {},                    # name -> [wins, draws, losses]
+        'corrupt': 0, 'errors': [],       # (path, offset, why), first few only
+    }
+
+MAX_ERRORS = 20
+
+def read_stage(path, start, stop, tally):
+    """
+    (offset, GameRecord) from one shard; a record that doesn't parse
+    ends the shard early and is counted as corrupt
+    """
+    mm = map_log(path)
+    if mm is None: return
+    try:
+        last = None
+        for last, rec in scan_records(mm, start, stop):
+            yield last, rec
+        # scan stopped before the end of the range: bad or torn record
+        bad = start if last is None else last + record_size(mm, last)
+        if bad < stop:
+            _error(tally, path, bad, f"unreadable record, {stop - bad} bytes skipped")
+    finally:
+        mm.close()
+
+def replay_stage(records, path, tally):
+    """
+    replay every record through GameLogic.make_move and pass it on;
+    records that disagree with the engine are counted as corrupt and
+    dropped
+    """
+    games = {}                            # (n, k) -> reused engine
+    for pos, rec in records:
+        key = (rec.board_size, rec.win_length)
+        game = games.get(key)
+        try:
+            if game is None: game = games[key] = GameLogic(*key)
+            else: game.reset_game()
+        except ValueError as e:
+            _error(tally, path, pos, str(e)); continue
+        why = _replay(game, rec)
+        if why: _error(tally, path, pos, why)
+        else: yield rec
+
+def _replay(game, rec):
+    # None if the record is a legal game with the outcome it claims
+    player = rec.first; res = "continue"
+    for i, (r, c) in enumerate(rec.moves):
+        if res != "continue": return f"move {i+1} played after the game ended"
+        res = game.make_move(r, c, player)
+        if res == "invalid": return f"illegal move {i+1} ({r},{c})"
+        player = 'O' if player == 'X' else 'X'
+    if not rec.finished:
+        return None if res == "continue" else "marked unfinished but the game ended"
+    if res == "continue": return "marked finished but the game goes on"
+    if rec.winner != game.winner: return f"claims winner {rec.winner}, replay says {game.winner}"
+    return None
+
+def fold_stage(records, tally, opening_depth=2):
+    """
+    last stage: count every replayed record into the tally
+    """
+    players = tally['players']; openings = tally['openings']
+    for rec in records:
+        if not rec.finished:
+            tally['unfinished'] += 1; continue
+        tally['games'] += 1; tally['moves'] += len(rec.moves)
+        openings[(rec.board_size, tuple(rec.moves[:opening_depth]))] += 1
+        if rec.winner is None: tally['draws'] += 1
+        elif rec.winner == rec.first: tally['first_won'] += 1
+        else: tally['first_lost'] += 1
+        for sym, name in (('X', rec.x_player), ('O', rec.o_player)):
+            row = players.get(name)
+            if row is None: row = players[name] = [0, 0, 0]
+            row[1 if rec.winner is None else 0 if rec.winner == sym else 2] += 1
+
+def _error(tally, path, pos, why):
+    tally['corrupt'] += 1
+    if len(tally['errors']) < MAX_ERRORS: tally['errors'].append((path, pos, why))
+
+def _run_shard(args):
+    """
+    worker: one byte range of one log through the whole pipeline
+    """
+    path, start, stop, opening_depth = args
+    tally = _new_tally()
+    fold_stage(replay_stage(read_stage(path, start, stop, tally), path, tally),
+               tally, opening_depth)
+    return tally
+
+def _merge(total, part):
+    # fold one shard's tally into the running total
+    for key in ('games', 'unfinished', 'moves', 'first_won', 'first_lost',
+                'draws', 'corrupt'):
+        total[key] += part[key]
+    total['openings'].update(part['openings'])
+    for name, row in part['players'].items():
+        mine = total['players'].setdefault(name, [0, 0, 0])
+        for i, v in enumerate(row): mine[i] += v
+    total['errors'].extend(part['errors'][:MAX_ERRORS - len(total['errors'])])
+
+def analyze(paths, workers=None, shards_per_worker=4, opening_depth=2):
+    """
+    stream every record of every log over a process pool
+    returns: merged tally plus wall time
+    """
+    workers = workers or os.cpu_count() or 1
+    shards = []
+    for path in paths:
+        # small logs stay one shard, big ones get cut so workers share them
+        parts = max(1, min(workers * shards_per_worker, os.path.getsize(path) >> 20))
+        shards += [(path, a, b, opening_depth) for a, b in split_log(path, parts)]
+    total = _new_tally()
+    t0 = time.perf_counter()
+    if workers == 1 or len(shards) <= 1:
+        for part in map(_run_shard, shards): _merge(total, part)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for part in pool.map(_run_shard, shards):
+                _merge(total, part)
+    total['wall_seconds'] = time.perf_counter() - t0
+    total['shards'] = len(shards)
+    return total
+
+def _cells(moves):
+    return ' '.join(f"{r},{c}" for r, c in moves) or '-'
+
+def main(argv=None):
+    """
+    headless entry: python -m tictactoe.analytics games.ttr -j 4
+    """
+    parser = argparse.ArgumentParser(description="stats over game record logs")
+    parser.add_argument("logs", nargs="+", help="record logs (.ttr)")
+    parser.add_argument("-j", "--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--depth", type=int, default=2,
+                        help="moves that make up an opening")
+    parser.add_argument("--top", type=int, default=10,
+                        help="openings and players to list")
+    args = parser.parse_args(argv)
+    try:
+        t = analyze(args.logs, args.workers, opening_depth=args.depth)
+    except (OSError, ValueError) as e:
+        print(e); return 1
+
+    g = t['games'] or 1; w = t['wall_seconds'] or 1e-9
+    n = t['games'] + t['unfinished'] + t['corrupt']
+    print(f"{n} records in {t['wall_seconds']:.2f}s ({n/w:.0f}/s, {t['shards']} shards)")
+    print(f"  finished {t['games']}, unfinished {t['unfinished']}, corrupt {t['corrupt']}")
+    print(f"  average length {t['moves']/g:.2f} moves")
+    print(f"  first mover: {100*t['first_won']/g:.1f}% won, "
+          f"{100*t['draws']/g:.1f}% drawn, {100*t['first_lost']/g:.1f}% lost")
+    print("openings:")
+    for (size, moves), count in t['openings'].most_common(args.top):
+        print(f"  {size}x{size} {_cells(moves):20} {count:8} ({100*count/g:.1f}%)")
+    print("players (won/drawn/lost):")
+    ranked = sorted(t['players'].items(), key=lambda kv: -sum(kv[1]))
+    for name, (won, drawn, lost) in ranked[:args.top]:
+        print(f"  {name or '-':24} {won:6} {drawn:6} {lost:6}")
+    for path, pos, why in t['errors']:
+        print(f"corrupt: {path}@{pos}: {why}")
+    return 1 if t['corrupt'] else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
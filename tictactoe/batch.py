@@ -0,0 +1,125 @@
+import numpy as np
+from .bitboard import line_tables
+
+# per-game status codes, same meaning as GameLogic.make_move's strings
+CONTINUE, WIN, DRAW, INVALID = 0, 1, 2, 3
+STATUS_NAMES = np.array(["continue", "win", "draw", "invalid"])
+# player codes in the arrays
+EMPTY, X, O = 0, 1, 2
+
+class BatchGameLogic:
+    """
+    K independent games held as numpy arrays, one uint64 mask per side
+    every call advances all games at once, no python loop per game
+    """
+    # bit 63 is never a cell, so it pads the per-cell line table
+    GUARD = np.uint64(1 << 63)
+
+    def __init__(self, num_games, board_size=3, win_length=None):
+        """
+        init arrays and line tables
+        """
+        if win_length is None: win_length = board_size
+        if board_size * board_size > 63:
+            raise ValueError("batch engine fits boards up to 7x7")
+        masks, cell_lines, full = line_tables(board_size, win_length)
+        self.num_games = num_games
+        self.board_size = board_size
+        self.win_length = win_length
+        self.full_mask = np.uint64(full)
+        # (cells, most lines through a cell), short rows padded with GUARD
+        width = max(len(lines) for lines in cell_lines) or 1
+        self._cell_lines = np.full((len(cell_lines), width), self.GUARD, np.uint64)
+        for i, lines in enumerate(cell_lines):
+            self._cell_lines[i, :len(lines)] = lines
+        self._bits = np.left_shift(np.uint64(1),
+                                   np.arange(board_size*board_size, dtype=np.uint64))
+        self.reset_game()
+
+    def reset_game(self, which=None):
+        """
+        clear every game, or only those where `which` is true
+        """
+        if which is None:
+            k = self.num_games
+            self.x = np.zeros(k, np.uint64)           # X stones per game
+            self.o = np.zeros(k, np.uint64)           # O stones per game
+            self.move_count = np.zeros(k, np.int16)
+            self.game_over = np.zeros(k, bool)
+            self.winner = np.zeros(k, np.int8)        # EMPTY, X or O
+            return
+        which = np.asarray(which, bool)
+        self.x[which] = 0; self.o[which] = 0; self.move_count[which] = 0
+        self.game_over[which] = False; self.winner[which] = EMPTY
+
+    def _player_codes(self, players):
+        # 'X' / 'O' / X / O, scalar or per game -> int8 array
+        p = np.asarray(players)
+        if p.dtype.kind in 'USO':
+            p = np.where(p == 'X', X, O)
+        return np.broadcast_to(p.astype(np.int8), (self.num_games,))
+
+    def make_moves(self, rows, cols, players):
+        """
+        apply one move per game
+        returns: int8 status codes (CONTINUE, WIN, DRAW, INVALID);
+        STATUS_NAMES[codes] gives make_move's strings
+        """
+        rows = np.asarray(rows, np.int64); cols = np.asarray(cols, np.int64)
+        players = self._player_codes(players)
+        n = self.board_size
+        inside = (rows >= 0) & (rows < n) & (cols >= 0) & (cols < n)
+        idx = np.where(inside, rows*n + cols, 0)
+        bit = self._bits[idx]
+        valid = inside & ~self.game_over & ((self.x | self.o) & bit == 0)
+        is_x = players == X
+        self.x = np.where(valid & is_x, self.x | bit, self.x)
+        self.o = np.where(valid & ~is_x, self.o | bit, self.o)
+        self.move_count += valid
+        # only lines through each game's new stone can have changed
+        board = np.where(is_x, self.x, self.o)
+        lines = self._cell_lines[idx]
+        won = valid & ((board[:, None] & lines) == lines).any(axis=1)
+        drew = valid & ~won & ((self.x | self.o) == self.full_mask)
+        status = np.full(self.num_games, INVALID, np.int8)
+        status[valid] = CONTINUE; status[won] = WIN; status[drew] = DRAW
+        self.game_over |= won | drew
+        self.winner = np.where(won, players, self.winner).astype(np.int8)
+        return status
+
+    def empty_cells(self):
+        """
+        (K, cells) bool matrix of open cells
+        """
+        occupied = (self.x | self.o)[:, None]
+        return (occupied & self._bits) == 0
+
+    def random_moves(self, rng):
+        """
+        one uniformly random open cell per game as (rows, cols)
+        finished or full games get (-1, -1), which make_moves rejects
+        """
+        empty = self.empty_cells() & ~self.game_over[:, None]
+        pick = np.argmax(rng.random(empty.shape) * empty, axis=1)
+        has = empty.any(axis=1)
+        rows, cols = np.divmod(pick, self.board_size)
+        return np.where(has, rows, -1), np.where(has, cols, -1)
+
+def random_playouts(num_games, board_size=3, win_length=None, seed=None):
+    """
+    play num_games uniformly random games, X moving first
+    returns: dict of 'X' wins, 'O' wins, draws and total moves
+    """
+    rng = np.random.default_rng(seed)
+    batch = BatchGameLogic(num_games, board_size, win_length)
+    player = X
+    while not batch.game_over.all():
+        rows, cols = batch.random_moves(rng)
+        batch.make_moves(rows, cols, player)
+        player = O if player == X else X
+    return {
+        'X': int((batch.winner == X).sum()),
+        'O': int((batch.winner == O).sum()),
+        'draw': int((batch.winner == EMPTY).sum()),
+        'moves': int(batch.move_count.sum()),
+    }
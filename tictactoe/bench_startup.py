@@ -0,0 +1,101 @@
+# startup timings, each run in a fresh interpreter so imports are cold
+#   python -m tictactoe.bench_startup --runs 5
+import argparse, json, os, statistics, subprocess, sys, time
+
+def _probe_headless():
+    """
+    child: cost of the qt-free entry points, and proof they stay qt-free
+    """
+    t0 = time.perf_counter()
+    import tictactoe.game_logic, tictactoe.protocol
+    t1 = time.perf_counter()
+    import tictactoe.cli, tictactoe.client, tictactoe.server
+    t2 = time.perf_counter()
+    print(json.dumps({'core_import': t1-t0, 'headless_import': t2-t1,
+                      'qt_loaded': 'PySide6' in sys.modules}))
+
+def _probe_gui(board_size):
+    """
+    child: qt import, window import/build, and time until the board's
+    first paint has run
+    """
+    t0 = time.perf_counter()
+    from PySide6.QtWidgets import QApplication
+    from PySide6.QtCore import QObject, QEvent
+    t1 = time.perf_counter()
+    from tictactoe.ui.theme import apply_default_palette
+    from tictactoe.ui.main_window import TicTacToeWindow
+    t2 = time.perf_counter()
+    app = QApplication([]); app.setStyle('Fusion'); apply_default_palette(app)
+    t3 = time.perf_counter()
+    window = TicTacToeWindow(board_size)
+    t4 = time.perf_counter()
+    painted = []
+
+    class PaintSpy(QObject):
+        def eventFilter(self, obj, event):
+            if event.type() == QEvent.Paint and not painted:
+                painted.append(time.perf_counter())
+            return False
+    spy = PaintSpy()
+    window.board_widget.installEventFilter(spy)
+    window.show()
+    deadline = time.perf_counter() + 10
+    while not painted and time.perf_counter() < deadline:
+        app.processEvents()
+    # the filter fires before paintEvent, so let this paint finish
+    app.processEvents()
+    t5 = time.perf_counter()
+    print(json.dumps({'qt_import': t1-t0, 'ui_import': t2-t1, 'app_init': t3-t2,
+                      'window_build': t4-t3, 'first_paint': t5-t4, 'gui_total': t5-t0}))
+    os._exit(0)  # skip qt teardown, it's not startup
+
+def _child(code):
+    # wall time includes interpreter startup, parsed timings come from stdout
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE='1')
+    t = time.perf_counter()
+    out = subprocess.run([sys.executable, '-c', code], capture_output=True,
+                         text=True, env=env, cwd=os.path.dirname(os.path.dirname(
+                             os.path.abspath(__file__))))
+    wall = time.perf_counter() - t
+    if out.returncode != 0:
+        raise RuntimeError(out.stderr.strip().splitlines()[-1] if out.stderr else
+                           f"probe exited with {out.returncode}")
+    res = json.loads(out.stdout.strip().splitlines()[-1])
+    res['process_wall'] = wall
+    return res
+
+def run(runs=5, board_size=3, gui=True):
+    """
+    median of each timing over `runs` fresh processes
+    returns {'headless': {...}, 'gui': {...}} in seconds
+    """
+    probes = {'headless': "from tictactoe.bench_startup import _probe_headless; _probe_headless()"}
+    if gui:
+        probes['gui'] = f"from tictactoe.bench_startup import _probe_gui; _probe_gui({board_size})"
+    report = {}
+    for name, code in probes.items():
+        samples = [_child(code) for _ in range(runs)]
+        report[name] = {k: (statistics.median(s[k] for s in samples)
+                            if not isinstance(samples[0][k], bool) else samples[0][k])
+                        for k in samples[0]}
+    return report
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="import and first-paint timings")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--size", type=int, default=3, help="board size for the gui run")
+    parser.add_argument("--no-gui", action="store_true", help="skip the qt probe")
+    args = parser.parse_args(argv)
+    report = run(args.runs, args.size, not args.no_gui)
+    for name, timings in report.items():
+        print(f"{name} (median of {args.runs}):")
+        for k, v in timings.items():
+            print(f"  {k:16} {v}" if isinstance(v, bool) else f"  {k:16} {v*1e3:8.1f} ms")
+    if report['headless']['qt_loaded']:
+        print("warning: headless entry points imported PySide6")
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
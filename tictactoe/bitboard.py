@@ -0,0 +1,182 @@
+from functools import lru_cache
+from .game_logic import cell_coords, iter_bits, zobrist_keys
+
+@lru_cache(maxsize=None)
+def line_tables(board_size, win_length):
+    """
+    precompute win masks for an n x n board with k in a row
+    bit index = row*n + col
+    returns: (all line masks, line masks per cell, full board mask)
+    """
+    n, k = board_size, win_length
+    masks = []
+    for r in range(n):
+        for c in range(n):
+            for dr, dc in ((0, 1), (1, 0), (1, 1), (1, -1)):
+                er, ec = r + dr*(k-1), c + dc*(k-1)
+                if not (0 <= er < n and 0 <= ec < n): continue
+                m = 0
+                for i in range(k):
+                    m |= 1 << ((r + dr*i)*n + c + dc*i)
+                masks.append(m)
+    masks = tuple(masks)
+    # per cell: only the lines passing through it
+    cell_lines = tuple(tuple(m for m in masks if m >> i & 1)
+                       for i in range(n*n))
+    return masks, cell_lines, (1 << n*n) - 1
+
+class BitboardGameLogic:
+    """
+    tic-tac-toe rules on integer bitmasks
+    drop-in for GameLogic: same make_move / is_cell_empty / reset_game
+    """
+    def __init__(self, board_size=3, win_length=None):
+        """
+        init masks and counters
+        """
+        if win_length is None: win_length = board_size
+        if board_size < 1 or not 1 <= win_length <= board_size:
+            raise ValueError(f"bad board {board_size}x{board_size}, "
+                             f"{win_length} in a row")
+        self.board_size = board_size      # n x n grid
+        self.win_length = win_length      # k in a row wins
+        self.win_masks, self.cell_lines, self.full_mask = \
+            line_tables(board_size, win_length)
+        self.boards = {'X': 0, 'O': 0}    # stones per player
+        self.occupied = 0                 # union of both boards
+        self.game_over = False            # flag when win/draw
+        self.winner = None                # 'X', 'O', or None
+        self.move_count = 0               # how many moves done
+        self._zkeys = zobrist_keys(board_size)
+        self._hash = 0                    # same keys as GameLogic
+        self.move_stack = []              # (row, col, player) per move
+
+    @property
+    def zobrist_hash(self):
+        """
+        64-bit hash, equal to GameLogic's for the same position
+        """
+        return self._hash
+
+    @property
+    def game_board(self):
+        """
+        list-of-lists view for ui code, built on demand
+        """
+        n = self.board_size; x = self.boards['X']; o = self.boards['O']
+        rows = []
+        for r in range(n):
+            row = []
+            for c in range(n):
+                bit = 1 << (r*n + c)
+                row.append('X' if x & bit else 'O' if o & bit else '')
+            rows.append(row)
+        return rows
+
+    def make_move(self, row, col, player):
+        """
+        place player mark, check result
+        returns: 'win', 'draw', 'continue', or 'invalid'
+        """
+        n = self.board_size
+        if self.game_over or not (0 <= row < n and 0 <= col < n) \
+           or player not in self.boards:
+            return "invalid"
+        idx = row*n + col; bit = 1 << idx
+        if self.occupied & bit:
+            return "invalid"
+        board = self.boards[player] | bit
+        self.boards[player] = board
+        self.occupied |= bit
+        self.move_count += 1               # count this move
+        self._hash ^= self._zkeys[player][idx]
+        self.move_stack.append((row, col, player))
+        # only lines through the new stone can have changed
+        for mask in self.cell_lines[idx]:
+            if board & mask == mask:
+                self.game_over = True; self.winner = player
+                return "win"
+        if self.occupied == self.full_mask:
+            self.game_over = True; self.winner = None
+            return "draw"
+        return "continue"
+
+    def unmake_move(self):
+        """
+        take back the last move, same contract as GameLogic.unmake_move
+        """
+        if not self.move_stack:
+            raise IndexError("no move to undo")
+        row, col, player = self.move_stack.pop()
+        idx = row*self.board_size + col; bit = 1 << idx
+        self.boards[player] &= ~bit; self.occupied &= ~bit
+        self.move_count -= 1
+        self._hash ^= self._zkeys[player][idx]
+        self.game_over = False; self.winner = None
+        return row, col, player
+
+    @property
+    def empty_mask(self):
+        return self.full_mask & ~self.occupied
+
+    @property
+    def legal_mask(self):
+        """
+        every legal move as one bitmask (none once the game is over)
+        """
+        return 0 if self.game_over else self.full_mask & ~self.occupied
+
+    def legal_moves(self):
+        """
+        iterator over (row, col) of each legal move, in board order
+        """
+        return iter_bits(self.legal_mask, cell_coords(self.board_size))
+
+    push = make_move
+    pop = unmake_move
+
+    def load_masks(self, x, o):
+        """
+        set the board from bitmasks, same contract as GameLogic.load_masks
+        """
+        self.boards = {'X': x, 'O': o}; self.occupied = x | o
+        self.move_count = bin(self.occupied).count('1')
+        self._hash = 0; self.move_stack = []
+        for i in range(self.board_size ** 2):
+            if x >> i & 1: self._hash ^= self._zkeys['X'][i]
+            elif o >> i & 1: self._hash ^= self._zkeys['O'][i]
+        self.winner = 'X' if self.check_win('X') else 'O' if self.check_win('O') else None
+        self.game_over = self.winner is not None or self.occupied == self.full_mask
+
+    def check_win(self, player):
+        """
+        true if any win mask is fully covered by player
+        """
+        board = self.boards.get(player, 0)
+        for mask in self.win_masks:
+            if board & mask == mask:
+                return True
+        return False
+
+    def check_draw(self):
+        """
+        no empty cells and no winner
+        """
+        return self.occupied == self.full_mask and not self.winner
+
+    def is_cell_empty(self, row, col):
+        """
+        true if coords valid and cell blank
+        """
+        n = self.board_size
+        if 0 <= row < n and 0 <= col < n:
+            return not self.occupied & (1 << (row*n + col))
+        return False
+
+    def reset_game(self):
+        """
+        clear masks and reset flags
+        """
+        self.boards = {'X': 0, 'O': 0}; self.occupied = 0
+        self.game_over = False; self.winner = None; self.move_count = 0
+        self._hash = 0; self.move_stack = []
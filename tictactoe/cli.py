@@ -0,0 +1,123 @@
+# headless entry points; nothing here (or below it) imports qt
+import argparse, asyncio, sys
+from .game_logic import GameLogic
+from .policies import POLICIES, make_policy, policy_for_board
+
+def render(game):
+    """
+    board as text, '.' for empty cells, rows/cols numbered from 1
+    """
+    n = game.board_size; w = len(str(n))
+    head = ' ' * (w+1) + ' '.join(str(c+1).rjust(w) for c in range(n))
+    rows = [str(r+1).rjust(w) + ' ' + ' '.join((s or '.').rjust(w) for s in row)
+            for r, row in enumerate(game.game_board)]
+    return '\n'.join([head] + rows)
+
+def read_move(game, prompt, inp=input):
+    """
+    ask until we get 'row col' naming an empty cell; None on eof/quit
+    """
+    while True:
+        try:
+            line = inp(prompt).strip().lower()
+        except EOFError:
+            return None
+        if line in ('q', 'quit', 'exit'): return None
+        try:
+            r, c = (int(p) - 1 for p in line.replace(',', ' ').split())
+        except ValueError:
+            print("enter row and column, e.g. '2 3'"); continue
+        if game.is_cell_empty(r, c): return r, c
+        print("cell taken or off the board")
+
+def play(args):
+    """
+    terminal game: you against a bot, or two people at one keyboard
+    """
+    game = GameLogic(args.size, args.win)
+    bot = None if args.bot == 'none' else \
+        make_policy(policy_for_board(args.bot, args.size), args.seed)
+    player = 'X'
+    while not game.game_over:
+        print(render(game))
+        if bot and player != args.play_as:
+            r, c = bot(game, player)
+            print(f"{player} plays {r+1} {c+1}")
+        else:
+            move = read_move(game, f"{player} move (row col, q to quit): ")
+            if move is None: return 1
+            r, c = move
+        game.make_move(r, c, player)
+        player = 'O' if player == 'X' else 'X'
+    print(render(game))
+    print(f"{game.winner} wins!" if game.winner else "it's a draw!")
+    return 0
+
+def bot(args):
+    """
+    a policy joins a desktop host or the server over the network
+    """
+    from .client import BotClient
+    def report(winner):
+        print(f"round over: {winner + ' wins' if winner else 'draw'}")
+    policy = make_policy(policy_for_board(args.bot, args.size), args.seed)
+    client = BotClient(policy, args.size, args.win, args.rounds, args.delay, report)
+    try:
+        results = asyncio.run(client.run(args.host, args.port))
+    except (ConnectionError, OSError, ValueError) as e:
+        print(f"bot: {e}")
+        return 1
+    except KeyboardInterrupt:
+        return 1
+    wins = results.count(client.symbol)
+    print(f"played {len(results)} as {client.symbol}: {wins} won, "
+          f"{results.count(None)} drawn")
+    return 0
+
+def main(argv=None):
+    """
+    python main.py --headless {play,bot,server,stats,load} ...
+    """
+    parser = argparse.ArgumentParser(prog="main.py --headless",
+                                     description="tic-tac-toe without the gui")
+    sub = parser.add_subparsers(dest="mode", required=True)
+
+    p = sub.add_parser("play", help="play in the terminal")
+    p.add_argument("--bot", choices=sorted(POLICIES) + ['none'], default="heuristic",
+                   help="opponent, 'none' for two players")
+    p.add_argument("--play-as", choices=("X", "O"), default="X")
+
+    b = sub.add_parser("bot", help="connect a bot to a host or server")
+    b.add_argument("--host", default="127.0.0.1")
+    b.add_argument("--port", type=int, default=9999)
+    b.add_argument("--bot", choices=sorted(POLICIES), default="solver")
+    b.add_argument("--rounds", type=int, default=1, help="0 = until the peer leaves")
+    b.add_argument("--delay", type=float, default=0.3,
+                   help="seconds before each move")
+
+    for s in (p, b):
+        s.add_argument("--size", type=int, default=3)
+        s.add_argument("--win", type=int, default=None)
+        s.add_argument("--seed", default=None)
+
+    sub.add_parser("server", help="headless match server, see server --help",
+                   add_help=False)
+    sub.add_parser("stats", help="analytics over game record logs, see stats --help",
+                   add_help=False)
+    sub.add_parser("load", help="load test a host or server, see load --help",
+                   add_help=False)
+    args, rest = parser.parse_known_args(argv)
+    if args.mode == "server":
+        from .server import main as server_main
+        return server_main(rest)
+    if args.mode == "stats":
+        from .analytics import main as stats_main
+        return stats_main(rest)
+    if args.mode == "load":
+        from .loadgen import main as load_main
+        return load_main(rest)
+    if rest: parser.error(f"unrecognized arguments: {' '.join(rest)}")
+    return play(args) if args.mode == "play" else bot(args)
+
+if __name__ == '__main__':
+    sys.exit(main())
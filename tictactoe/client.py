@@ -0,0 +1,126 @@
+# qt-free network client: a policy plays against a desktop host, a
+# legacy peer or the headless server, using the same wire protocol
+import asyncio
+from .game_logic import GameLogic
+from .protocol import (
+    T_MOVE, T_REQ_REMATCH, T_ACK_REMATCH, T_DEC_REMATCH, T_ASSIGN,
+    HANDSHAKE_TIMEOUT, HELLO_SIZE, LEGACY_SEND_GAP, FrameCodec, ProtocolError,
+    hello, is_binary_start, negotiate, other
+)
+
+class BotClient:
+    """
+    connects like the desktop client: plays 'O' unless the peer
+    assigns a seat, 'X' starts round one and starters alternate,
+    rematches are asked for and always accepted
+    """
+    def __init__(self, policy, board_size=3, win_length=None,
+                 rounds=1, delay=0.0, on_result=None):
+        self.policy = policy
+        self.board_size = board_size; self.win_length = win_length
+        self.rounds = rounds              # 0 = keep playing until the peer leaves
+        self.delay = delay                # seconds before each of our moves
+        self.on_result = on_result        # called with the winner or None
+        self.game = GameLogic(board_size, win_length)
+        self.symbol = 'O'; self.starter = self.turn = 'X'
+        self.results = []
+        self.codec = None
+        self._asked = False               # our rematch request is pending
+        self._declined = False            # peer said no to another round
+        self._reader = self._writer = None; self._move_task = None
+
+    async def _negotiate(self, reader, writer):
+        # same hello exchange as the server: silence means a legacy peer
+        writer.write(FrameCodec().encode(hello(self.board_size, self.win_length)))
+        data = b''
+        try:
+            data = await asyncio.wait_for(reader.read(1024), HANDSHAKE_TIMEOUT)
+            if is_binary_start(data) and len(data) < HELLO_SIZE:
+                data += await asyncio.wait_for(
+                    reader.readexactly(HELLO_SIZE - len(data)), HANDSHAKE_TIMEOUT)
+        except asyncio.TimeoutError:
+            pass
+        self.codec, leftover = negotiate(data, self.board_size, self.win_length)
+        return leftover
+
+    def _send(self, msg):
+        self._writer.write(self.codec.encode(msg))
+
+    def _maybe_move(self):
+        if not self.game.game_over and self.turn == self.symbol \
+           and self._move_task is None:
+            self._move_task = asyncio.get_running_loop().create_task(self._move())
+
+    async def _move(self):
+        await asyncio.sleep(self.delay)
+        self._move_task = None
+        if self.game.game_over or self.turn != self.symbol: return
+        row, col = self.policy(self.game, self.symbol)
+        self._play(row, col, self.symbol)
+        self._send((T_MOVE, row, col))
+
+    def _play(self, row, col, sym):
+        res = self.game.make_move(row, col, sym)
+        if res == "invalid":
+            raise ProtocolError(f"illegal move {row},{col} by {sym}")
+        if res == "continue":
+            self.turn = other(sym)
+            return
+        self.results.append(self.game.winner)
+        if self.on_result: self.on_result(self.game.winner)
+        if self.done():
+            self._reader.feed_eof()  # wakes run() if our move ended it
+        else:
+            self._asked = True
+            # legacy peers take one msg per recv, don't glue it to the move
+            gap = 0 if self.codec.binary else LEGACY_SEND_GAP
+            asyncio.get_running_loop().call_later(gap, self._send, (T_REQ_REMATCH,))
+
+    def done(self):
+        return self._declined or (bool(self.rounds) and len(self.results) >= self.rounds)
+
+    def _new_round(self):
+        self._asked = False
+        self.game.reset_game()
+        self.starter = self.turn = other(self.starter)
+        self._maybe_move()
+
+    def _dispatch(self, msg):
+        kind = msg[0]
+        if kind == T_MOVE:
+            self._play(msg[1], msg[2], other(self.symbol))
+            self._maybe_move()
+        elif kind == T_ASSIGN:
+            self.symbol = msg[1]
+            self._maybe_move()
+        elif kind == T_REQ_REMATCH:
+            if self.done(): self._send((T_DEC_REMATCH,)); return
+            self._send((T_ACK_REMATCH,))
+            self._new_round()
+        elif kind == T_ACK_REMATCH:
+            if self._asked: self._new_round()  # else we already took theirs
+        elif kind == T_DEC_REMATCH:
+            self._declined = True
+
+    async def run(self, host, port):
+        """
+        connect, play until enough rounds are done or the peer leaves
+        returns the winner of each finished round (None = draw)
+        """
+        reader, writer = await asyncio.open_connection(host, port)
+        self._reader = reader; self._writer = writer
+        try:
+            data = await self._negotiate(reader, writer)
+            self._maybe_move()                 # host/X moves first
+            while not self.done():
+                if not data:
+                    data = await reader.read(1024)
+                    if not data: break
+                for msg in self.codec.feed(data):
+                    self._dispatch(msg)
+                data = b''
+                await writer.drain()
+        finally:
+            if self._move_task: self._move_task.cancel()
+            writer.close()
+        return self.results
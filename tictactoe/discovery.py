@@ -0,0 +1,197 @@
+# lan game discovery: hosts broadcast small udp announcements, clients
+# keep an expiring list of what they've heard. no qt imports
+import random, selectors, socket, struct, threading, time
+from collections import namedtuple
+from .protocol import MAX_BOARD, PROTOCOL_VERSION
+
+DISCOVERY_PORT = 9998
+ANNOUNCE_MAGIC = b'TTTD'
+# magic, protocol version, game port, board size, win length, open seats,
+# name length, then the utf-8 name: at most 43 bytes on the wire
+ANNOUNCE = struct.Struct('>4sBHBBBB')
+MAX_NAME = 32
+ANNOUNCE_INTERVAL = 2.0       # seconds between a host's announcements
+MIN_GAP = 0.5                 # no host sends, or is heard, more often than this
+GAME_TTL = 3 * ANNOUNCE_INTERVAL  # silent this long = gone
+
+DiscoveredGame = namedtuple(
+    'DiscoveredGame', 'host port name board_size win_length seats version')
+
+def encode_announce(port, name, board_size, win_length, seats):
+    # same limit as the hello frame, a bigger board can't be joined anyway
+    if board_size > MAX_BOARD:
+        raise ValueError(f"can't announce a {board_size}x{board_size} board")
+    raw = name.encode('utf-8')[:MAX_NAME]
+    return ANNOUNCE.pack(ANNOUNCE_MAGIC, PROTOCOL_VERSION, port, board_size,
+                         win_length, seats, len(raw)) + raw
+
+def decode_announce(data, host):
+    """
+    announcement bytes -> DiscoveredGame, None if it isn't one
+    """
+    if len(data) < ANNOUNCE.size: return None
+    magic, version, port, n, k, seats, name_len = ANNOUNCE.unpack_from(data)
+    if magic != ANNOUNCE_MAGIC or len(data) != ANNOUNCE.size + name_len:
+        return None
+    name = data[ANNOUNCE.size:].decode('utf-8', 'replace')
+    return DiscoveredGame(host, port, name, n, k, seats, version)
+
+class Announcer:
+    """
+    host side: repeats one small datagram every ~ANNOUNCE_INTERVAL
+    (jittered so a lan full of hosts doesn't send in lockstep) and a
+    final zero-seat one on stop so browsers drop the game at once
+    dest defaults to the broadcast address; tests point it at loopback
+    """
+    def __init__(self, port, name=None, board_size=3, win_length=None,
+                 seats=1, interval=ANNOUNCE_INTERVAL, dest=None):
+        self.port = port
+        self.name = name or socket.gethostname()
+        self.board_size = board_size
+        self.win_length = board_size if win_length is None else win_length
+        self.seats = seats
+        self.interval = max(MIN_GAP, interval)
+        self.dest = dest or ('<broadcast>', DISCOVERY_PORT)
+        self._sock = None; self._thread = None
+        self._stop = threading.Event()
+        self._last = 0.0
+
+    def start(self):
+        """
+        raises ValueError here, not on the thread, if the game can't be announced
+        """
+        encode_announce(self.port, self.name, self.board_size, self.win_length,
+                        self.seats)
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def _send(self, force=False):
+        now = time.monotonic()
+        if not force and now - self._last < MIN_GAP: return
+        self._last = now
+        try:
+            self._sock.sendto(encode_announce(self.port, self.name, self.board_size,
+                                              self.win_length, self.seats), self.dest)
+        except OSError as e:
+            print(f"announce failed: {e}")  # no route/broadcast, keep trying
+        except (ValueError, struct.error) as e:
+            print(f"announce failed: {e}")  # a field out of range, keep the thread
+
+    def _run(self):
+        self._send()
+        while not self._stop.wait(self.interval * random.uniform(0.8, 1.2)):
+            self._send()
+
+    def set_seats(self, seats):
+        """
+        open seats changed, tell browsers now (still rate-limited)
+        """
+        self.seats = seats
+        if self._sock: self._send()
+
+    def stop(self):
+        if self._thread is None: return
+        self._stop.set()
+        if self._thread is not threading.current_thread(): self._thread.join(1.0)
+        self.seats = 0; self._send(force=True)  # "gone"
+        self._sock.close()
+        self._thread = None
+
+class Browser:
+    """
+    client side: listens for announcements, keeps the games heard within
+    ttl, calls on_change(list of DiscoveredGame) on its own thread
+    whenever the set of games (or their seats) changes
+    """
+    def __init__(self, on_change=None, port=DISCOVERY_PORT, ttl=GAME_TTL, bind=''):
+        self.on_change = on_change
+        self.port = port; self.ttl = ttl; self.bind = bind
+        self._games = {}                  # (host, port) -> DiscoveredGame
+        self._seen = {}                   # (host, port) -> monotonic time
+        self._lock = threading.Lock()
+        self._sock = None; self._thread = None
+        self._wake_r = self._wake_w = None
+        self._running = False
+
+    def start(self):
+        """
+        bind and listen; raises OSError if the port can't be bound
+        """
+        s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        if hasattr(socket, 'SO_REUSEPORT'):
+            # several clients on one machine can all listen
+            s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        s.bind((self.bind, self.port))
+        s.setblocking(False)
+        self._sock = s
+        self._wake_r, self._wake_w = socket.socketpair()
+        self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def games(self):
+        with self._lock:
+            return sorted(self._games.values(), key=lambda g: (g.name, g.host, g.port))
+
+    def _run(self):
+        sel = selectors.DefaultSelector()
+        sel.register(self._sock, selectors.EVENT_READ)
+        sel.register(self._wake_r, selectors.EVENT_READ)
+        try:
+            while self._running:
+                # sleep until a packet, stop(), or the next game expires
+                with self._lock:
+                    oldest = min(self._seen.values(), default=None)
+                timeout = None if oldest is None else \
+                    max(0.0, oldest + self.ttl - time.monotonic())
+                sel.select(timeout)
+                if not self._running: break
+                changed = self._drain()
+                changed |= self._expire()
+                if changed and self.on_change: self.on_change(self.games())
+        finally:
+            sel.close()
+            for s in (self._sock, self._wake_r, self._wake_w):
+                try: s.close()
+                except OSError: pass
+
+    def _drain(self):
+        changed = False
+        while True:
+            try:
+                data, (host, _) = self._sock.recvfrom(256)
+            except OSError:  # drained (or closed under us)
+                return changed
+            game = decode_announce(data, host)
+            if game is None: continue
+            key = (host, game.port); now = time.monotonic()
+            with self._lock:
+                if game.seats == 0:
+                    changed |= self._games.pop(key, None) is not None
+                    self._seen.pop(key, None)
+                    continue
+                if now - self._seen.get(key, -MIN_GAP) < MIN_GAP and \
+                   self._games.get(key) == game:
+                    continue                      # flooding host, ignore
+                changed |= self._games.get(key) != game
+                self._games[key] = game; self._seen[key] = now
+
+    def _expire(self):
+        now = time.monotonic()
+        with self._lock:
+            stale = [k for k, t in self._seen.items() if now - t >= self.ttl]
+            for k in stale:
+                del self._games[k]; del self._seen[k]
+        return bool(stale)
+
+    def stop(self):
+        if not self._running: return
+        self._running = False
+        try: self._wake_w.send(b'\0')
+        except OSError: pass
+        if self._thread is not threading.current_thread(): self._thread.join(1.0)
@@ -1,30 +1,89 @@
+import random
+from functools import lru_cache
+from itertools import compress, count
+
+_BIT_FLAGS = bytes.maketrans(b'01', b'\0\1')
+
+def iter_bits(mask, items=None):
+    """
+    items[i] for every set bit i, lowest first (the bit indices when
+    items is None); one bin() pass, then the walk runs in C
+    """
+    flags = bin(mask)[:1:-1].encode().translate(_BIT_FLAGS)  # lsb first
+    return compress(count() if items is None else items, flags)
+
+@lru_cache(maxsize=None)
+def cell_coords(board_size):
+    """
+    (row, col) of every bit index, shared per board size
+    """
+    return tuple(divmod(i, board_size) for i in range(board_size * board_size))
+
+@lru_cache(maxsize=None)
+def zobrist_keys(board_size):
+    """
+    one random 64-bit key per (player, cell), fixed per board size so
+    hashes match across processes and runs
+    """
+    rng = random.Random(f"zobrist:{board_size}")
+    cells = board_size * board_size
+    return {p: tuple(rng.getrandbits(64) for _ in range(cells)) for p in ('X', 'O')}
+
 class GameLogic:
     """
     tic-tac-toe rules and state
     """
-    def __init__(self):
+    # directions a line can run: across, down, and both diagonals
+    DIRECTIONS = ((0, 1), (1, 0), (1, 1), (1, -1))
+
+    def __init__(self, board_size=3, win_length=None):
         """
         init board and counters
+        board_size: cells per side, win_length: marks in a row to win
+        (defaults to board_size, i.e. classic tic-tac-toe)
         """
-        self.board_size = 3               # fixed 3x3 grid
+        if win_length is None: win_length = board_size
+        if board_size < 1 or not 1 <= win_length <= board_size:
+            raise ValueError(f"bad board {board_size}x{board_size}, "
+                             f"{win_length} in a row")
+        self.board_size = board_size      # n x n grid
+        self.win_length = win_length      # k in a row wins
         self.game_board = [['' for _ in range(self.board_size)]
                            for _ in range(self.board_size)]  # empty cells
         self.game_over = False            # flag when win/draw
         self.winner = None                # 'X', 'O', or None
         self.move_count = 0               # how many moves done
+        self._zkeys = zobrist_keys(board_size)
+        self._hash = 0                    # xor of the keys of placed marks
+        self.move_stack = []              # (row, col, player) per move
+        self._full = (1 << board_size * board_size) - 1
+        self.empty_mask = self._full      # bit row*n + col set = cell open
+
+    @property
+    def zobrist_hash(self):
+        """
+        64-bit hash of the marks on the board, kept up to date per move
+        (xor is its own inverse, so taking a mark back restores it)
+        """
+        return self._hash
 
     def make_move(self, row, col, player):
         """
         place player mark, check result
-        returns: 'win', 'draw', 'continue', or 'invalid'
+        returns: 'win', 'draw', 'continue', or 'invalid' (also for a
+        player other than 'X' / 'O', which the hash has no keys for)
         """
-        # only if cell empty and game not over
+        # only if cell empty, game not over and a known mark
         if not self.game_over and 0 <= row < self.board_size \
            and 0 <= col < self.board_size \
-           and self.game_board[row][col] == '':
+           and self.game_board[row][col] == '' and player in self._zkeys:
             self.game_board[row][col] = player
             self.move_count += 1           # count this move
-            if self.check_win(player):
+            idx = row*self.board_size + col
+            self._hash ^= self._zkeys[player][idx]
+            self.empty_mask ^= 1 << idx
+            self.move_stack.append((row, col, player))
+            if self._wins_through(row, col, player):
                 self.game_over = True; self.winner = player
                 return "win"
             elif self.check_draw():
@@ -33,22 +92,87 @@ class GameLogic:
             return "continue"
         return "invalid"
 
+    def unmake_move(self):
+        """
+        take back the last move in O(1), no board copies
+        moves are only accepted while the game is running, so undoing
+        one always leaves game_over False and no winner
+        returns: (row, col, player) of the undone move
+        """
+        if not self.move_stack:
+            raise IndexError("no move to undo")
+        row, col, player = self.move_stack.pop()
+        self.game_board[row][col] = ''
+        self.move_count -= 1
+        idx = row*self.board_size + col
+        self._hash ^= self._zkeys[player][idx]
+        self.empty_mask |= 1 << idx
+        self.game_over = False; self.winner = None
+        return row, col, player
+
+    @property
+    def legal_mask(self):
+        """
+        every legal move as one bitmask (none once the game is over)
+        """
+        return 0 if self.game_over else self.empty_mask
+
+    def legal_moves(self):
+        """
+        iterator over (row, col) of each legal move, in board order,
+        taken from the mask with no per-cell bounds checks or lookups
+        """
+        return iter_bits(self.legal_mask, cell_coords(self.board_size))
+
+    # search-style names: push a move, explore, pop it again
+    push = make_move
+    pop = unmake_move
+
+    def load_masks(self, x, o):
+        """
+        set the board from bitmasks (bit = row*n + col), e.g. a Position;
+        the move history starts empty, so there's nothing to undo
+        """
+        n = self.board_size
+        self.game_board = [['X' if x >> (r*n + c) & 1 else 'O' if o >> (r*n + c) & 1 else ''
+                            for c in range(n)] for r in range(n)]
+        self.move_count = bin(x).count('1') + bin(o).count('1')
+        self.empty_mask = self._full & ~(x | o)
+        self._hash = 0; self.move_stack = []
+        for i in range(n*n):
+            if x >> i & 1: self._hash ^= self._zkeys['X'][i]
+            elif o >> i & 1: self._hash ^= self._zkeys['O'][i]
+        self.winner = 'X' if self.check_win('X') else 'O' if self.check_win('O') else None
+        self.game_over = self.winner is not None or self.check_draw()
+
     def check_win(self, player):
         """
-        scan rows, cols, diags for 3 in a row
+        full scan for k in a row, any direction
+        """
+        n = self.board_size
+        for r in range(n):
+            for c in range(n):
+                if self.game_board[r][c] == player \
+                   and self._wins_through(r, c, player):
+                    return True
+        return False
+
+    def _wins_through(self, row, col, player):
+        """
+        walk the 4 lines through (row, col), stop once k in a row found
+        only the last placed mark can complete a line, so this is O(k)
         """
-        b = self.game_board; n = self.board_size
-        # rows and cols
-        for i in range(n):
-            if all(b[i][j] == player for j in range(n)) \
-               or all(b[j][i] == player for j in range(n)):
+        b = self.game_board; n = self.board_size; k = self.win_length
+        for dr, dc in self.DIRECTIONS:
+            count = 1
+            # forward then backward from the placed mark
+            for sr, sc in ((dr, dc), (-dr, -dc)):
+                r, c = row + sr, col + sc
+                while count < k and 0 <= r < n and 0 <= c < n \
+                      and b[r][c] == player:
+                    count += 1; r += sr; c += sc
+            if count >= k:
                 return True
-        # main diag
-        if all(b[i][i] == player for i in range(n)):
-            return True
-        # anti-diag
-        if all(b[i][n - 1 - i] == player for i in range(n)):
-            return True
         return False
 
     def check_draw(self):
@@ -75,3 +199,4 @@ class GameLogic:
         self.game_board = [['' for _ in range(self.board_size)]
                            for _ in range(self.board_size)]
         self.game_over = False; self.winner = None; self.move_count = 0
+        self._hash = 0; self.move_stack = []; self.empty_mask = self._full
@@ -0,0 +1,227 @@
+import argparse, os, queue, sqlite3, sys, threading, time
+from .records import GameRecord, decode_moves, encode_moves, read_records
+
+# optional match history in sqlite, next to (not instead of) the record
+# log. writes go through one background thread in batched transactions,
+# so the gui and the server loop only ever put a tuple on a queue
+#   python -m tictactoe.history recent alice
+#   python -m tictactoe.history import ~/.tictactoe/games.ttr
+
+DEFAULT_DB = os.path.join(os.path.expanduser('~'), '.tictactoe', 'history.db')
+BATCH = 1000                      # rows per transaction at most
+FLUSH_INTERVAL = 0.5              # seconds a queued game may wait for company
+RESULTS = {0: None, 1: 'X', 2: 'O', 3: None}
+
+# players get integer ids, so a row is a handful of ints plus the move code
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS players (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS games (
+    id INTEGER PRIMARY KEY,
+    started INTEGER NOT NULL,      -- unix seconds
+    duration INTEGER NOT NULL,
+    board_size INTEGER NOT NULL,
+    win_length INTEGER NOT NULL,
+    o_first INTEGER NOT NULL,      -- 1 when O moved first
+    result INTEGER NOT NULL,       -- 0 draw, 1 X won, 2 O won, 3 unfinished
+    x_id INTEGER NOT NULL REFERENCES players(id),
+    o_id INTEGER NOT NULL REFERENCES players(id),
+    move_count INTEGER NOT NULL,
+    moves BLOB NOT NULL            -- records.encode_moves
+);
+CREATE INDEX IF NOT EXISTS games_x ON games (x_id, started);
+CREATE INDEX IF NOT EXISTS games_o ON games (o_id, started);
+CREATE INDEX IF NOT EXISTS games_result ON games (result, started);
+CREATE INDEX IF NOT EXISTS games_started ON games (started);
+"""
+
+def open_db(path=DEFAULT_DB):
+    """
+    connection with the schema in place, wal so readers never block
+    the writer (or each other)
+    """
+    d = os.path.dirname(path)
+    if d: os.makedirs(d, exist_ok=True)
+    db = sqlite3.connect(path)
+    db.execute("PRAGMA journal_mode=WAL")
+    db.execute("PRAGMA synchronous=NORMAL")   # wal: a crash loses at most the last batch
+    db.executescript(SCHEMA)
+    return db
+
+def _row(rec, x_id, o_id):
+    result = 3 if not rec.finished else {None: 0, 'X': 1, 'O': 2}[rec.winner]
+    return (rec.started, rec.duration, rec.board_size, rec.win_length,
+            int(rec.first == 'O'), result, x_id, o_id, len(rec.moves),
+            encode_moves(rec.moves, rec.board_size))
+
+class MatchHistory:
+    """
+    background writer: append() queues a GameRecord and returns at
+    once, the writer thread commits whatever has piled up every
+    FLUSH_INTERVAL or BATCH games, whichever comes first
+    if the database can't be opened the history goes dead: one warning,
+    then append() drops games instead of queueing them forever
+    """
+    def __init__(self, path=DEFAULT_DB, batch=BATCH, flush_interval=FLUSH_INTERVAL):
+        self.path = path
+        self.batch = batch; self.flush_interval = flush_interval
+        self.written = 0
+        self.dead = False
+        self._queue = queue.SimpleQueue()
+        self._ids = {}                    # player name -> id, writer thread only
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def append(self, rec):
+        if not self.dead: self._queue.put(rec)
+
+    def _player_id(self, db, name, new):
+        pid = self._ids.get(name) or new.get(name)
+        if pid is None:
+            db.execute("INSERT OR IGNORE INTO players (name) VALUES (?)", (name,))
+            pid, = db.execute("SELECT id FROM players WHERE name = ?", (name,)).fetchone()
+            new[name] = pid
+        return pid
+
+    def _write(self, db, recs):
+        # ids of players inserted in this batch only become cached once it
+        # commits; after a rollback they'd point at rows that don't exist
+        new = {}
+        with db:                          # one transaction per batch
+            rows = [_row(r, self._player_id(db, r.x_player, new),
+                         self._player_id(db, r.o_player, new)) for r in recs]
+            db.executemany("INSERT INTO games (started, duration, board_size, "
+                           "win_length, o_first, result, x_id, o_id, move_count, "
+                           "moves) VALUES (?,?,?,?,?,?,?,?,?,?)", rows)
+        self._ids.update(new)
+        self.written += len(rows)
+
+    def _run(self):
+        try:
+            db = open_db(self.path)
+        except (sqlite3.Error, OSError) as e:
+            self.dead = True
+            print(f"match history: {e}, games won't be kept")
+            while not self._queue.empty(): self._queue.get_nowait()
+            return
+        stop = False
+        try:
+            while not stop:
+                recs = []
+                item = self._queue.get()
+                deadline = time.monotonic() + self.flush_interval
+                # gather a batch: block for the first game, then take
+                # what arrives until the batch fills or the interval ends
+                while True:
+                    if item is None: stop = True; break
+                    recs.append(item)
+                    if len(recs) >= self.batch: break
+                    wait = deadline - time.monotonic()
+                    try:
+                        item = self._queue.get(timeout=wait) if wait > 0 \
+                            else self._queue.get_nowait()
+                    except queue.Empty: break
+                if recs:
+                    try: self._write(db, recs)
+                    except (sqlite3.Error, ValueError) as e:
+                        print(f"match history: dropped {len(recs)} games: {e}")
+        finally:
+            db.close()
+
+    def close(self):
+        """
+        write out everything queued, then stop the writer
+        """
+        if self._thread is None: return
+        self._queue.put(None)
+        self._thread.join()
+        self._thread = None
+
+    def __enter__(self): return self
+    def __exit__(self, *exc): self.close()
+
+GAME_COLUMNS = ("g.started, g.duration, g.board_size, g.win_length, g.o_first, "
+                "g.result, px.name, po.name, g.move_count, g.moves")
+
+def _record(row, decode=True):
+    started, duration, n, k, o_first, result, x_name, o_name, count, moves = row
+    return GameRecord(n, k, 'O' if o_first else 'X',
+                      decode_moves(moves, count, n) if decode else None,
+                      RESULTS[result], result != 3, x_name, o_name, started, duration)
+
+def recent_games(db, player, limit=100, decode=True):
+    """
+    player's newest `limit` games, newest first, as GameRecords
+    each side comes off its own (player, started) index and the two
+    short lists are merged, so the cost doesn't grow with the table
+    """
+    row = db.execute("SELECT id FROM players WHERE name = ?", (player,)).fetchone()
+    if row is None: return []
+    side = (f"SELECT {GAME_COLUMNS} FROM games g "
+            "JOIN players px ON px.id = g.x_id JOIN players po ON po.id = g.o_id "
+            "WHERE {where} ORDER BY g.started DESC LIMIT ?2")
+    # a game against yourself shows up on the x side only
+    rows = db.execute(
+        f"SELECT * FROM ({side.format(where='g.x_id = ?1')}) UNION ALL "
+        f"SELECT * FROM ({side.format(where='g.o_id = ?1 AND g.x_id != ?1')}) "
+        "ORDER BY 1 DESC LIMIT ?2",
+        (row[0], limit)).fetchall()
+    return [_record(r, decode) for r in rows]
+
+def player_results(db, player):
+    """
+    (won, drawn, lost, unfinished) over all of player's games
+    """
+    row = db.execute("SELECT id FROM players WHERE name = ?", (player,)).fetchone()
+    if row is None: return (0, 0, 0, 0)
+    won = drawn = lost = unfinished = 0
+    for where, mine in (('x_id = ?1', 1), ('o_id = ?1 AND x_id != ?1', 2)):
+        for result, count in db.execute(
+                f"SELECT result, COUNT(*) FROM games WHERE {where} GROUP BY result",
+                (row[0],)):
+            if result == 3: unfinished += count
+            elif result == 0: drawn += count
+            elif result == mine: won += count
+            else: lost += count
+    return won, drawn, lost, unfinished
+
+def main(argv=None):
+    """
+    headless entry: python -m tictactoe.history {recent,import} ...
+    """
+    parser = argparse.ArgumentParser(description="sqlite match history")
+    parser.add_argument("--db", default=DEFAULT_DB)
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    r = sub.add_parser("recent", help="a player's latest games")
+    r.add_argument("player")
+    r.add_argument("-n", "--limit", type=int, default=100)
+    i = sub.add_parser("import", help="load record logs into the database")
+    i.add_argument("logs", nargs="+")
+    args = parser.parse_args(argv)
+
+    if args.cmd == "import":
+        t0 = time.perf_counter()
+        with MatchHistory(args.db, batch=50000) as h:
+            for path in args.logs:
+                for rec in read_records(path): h.append(rec)
+        print(f"imported {h.written} games in {time.perf_counter()-t0:.1f}s")
+        return 0
+    db = open_db(args.db)
+    t0 = time.perf_counter()
+    games = recent_games(db, args.player, args.limit)
+    won, drawn, lost, unfinished = player_results(db, args.player)
+    ms = (time.perf_counter() - t0) * 1e3
+    for g in games:
+        res = 'unfinished' if not g.finished else 'draw' if g.winner is None else \
+              'won' if (g.x_player if g.winner == 'X' else g.o_player) == args.player else 'lost'
+        print(f"{time.strftime('%Y-%m-%d %H:%M', time.localtime(g.started))} "
+              f"{g.board_size}x{g.board_size} {g.x_player} v {g.o_player}: {res}, "
+              f"{len(g.moves)} moves")
+    print(f"{args.player}: {won} won, {drawn} drawn, {lost} lost, "
+          f"{unfinished} unfinished ({ms:.1f} ms)")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
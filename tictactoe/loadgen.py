@@ -0,0 +1,200 @@
+import argparse, asyncio, os, socket, subprocess, sys, time
+from collections import Counter
+from .client import BotClient
+from .policies import POLICIES, make_policy
+from .protocol import (
+    T_MOVE, HANDSHAKE_TIMEOUT, HELLO_SIZE, TextCodec, ProtocolError, is_binary_start
+)
+
+# synthetic load on a host or the headless server: many BotClients in
+# one event loop, each playing full games and rematches, timing every
+# move from our send to the opponent's reply
+#   python -m tictactoe.loadgen --clients 2000 --rounds 5 --spawn-server
+#   python -m tictactoe.loadgen --host 10.0.0.5 --port 9999 --text 0.5
+
+class LoadStats:
+    """
+    shared by every client of a run, single event loop so no locking
+    """
+    def __init__(self):
+        # seconds from our move to their reply, per protocol, since legacy
+        # peers are paced LEGACY_SEND_GAP apart and would hide the rest
+        self.rtts = {'binary': [], 'text': []}
+        self.connects = []                # seconds, connect + handshake
+        self.games = 0; self.moves = 0
+        self.clients_ok = 0
+        self.errors = Counter()           # "ExceptionType: msg" -> count
+
+class LoadClient(BotClient):
+    """
+    BotClient that timestamps its moves; text=True skips our hello so
+    the peer falls back to the legacy "r,c" / NET:: protocol
+    """
+    def __init__(self, stats, policy, board_size=3, win_length=None,
+                 rounds=1, text=False):
+        super().__init__(policy, board_size, win_length, rounds)
+        self.stats = stats; self.text = text
+        self._sent_at = None
+
+    async def _negotiate(self, reader, writer):
+        t0 = time.perf_counter()
+        if not self.text:
+            leftover = await super()._negotiate(reader, writer)
+        else:
+            # stay silent like an old client; a new-style peer still
+            # opens with its hello, which we read past
+            data = b''
+            try:
+                data = await asyncio.wait_for(reader.read(1024), 2 * HANDSHAKE_TIMEOUT)
+                if is_binary_start(data):
+                    if len(data) < HELLO_SIZE:
+                        data += await reader.readexactly(HELLO_SIZE - len(data))
+                    data = data[HELLO_SIZE:]
+            except asyncio.TimeoutError:
+                pass                      # legacy host, it waits for our move or its own
+            self.codec = TextCodec(); leftover = data
+        self.stats.connects.append(time.perf_counter() - t0)
+        return leftover
+
+    def _send(self, msg):
+        if msg[0] == T_MOVE:
+            self._sent_at = time.perf_counter(); self.stats.moves += 1
+        super()._send(msg)
+
+    def _dispatch(self, msg):
+        if msg[0] == T_MOVE and self._sent_at is not None:
+            self.stats.rtts['binary' if self.codec.binary else 'text'].append(
+                time.perf_counter() - self._sent_at)
+            self._sent_at = None
+        super()._dispatch(msg)
+
+    def _play(self, row, col, sym):
+        # every finished game, ours or the peer's last move, ends up here
+        before = len(self.results)
+        super()._play(row, col, sym)
+        self.stats.games += len(self.results) - before
+
+    def _new_round(self):
+        self._sent_at = None              # our winning move gets no reply
+        super()._new_round()
+
+async def _one(stats, i, args, start_at):
+    await asyncio.sleep(max(0.0, start_at - time.monotonic()))
+    # spread the text clients evenly through the run
+    text = int((i + 1) * args.text) > int(i * args.text)
+    client = LoadClient(stats, make_policy(args.policy, f"{args.seed}:{i}"),
+                        args.size, args.win, args.rounds, text)
+    try:
+        await asyncio.wait_for(client.run(args.host, args.port), args.timeout)
+    except (OSError, EOFError, asyncio.IncompleteReadError, asyncio.TimeoutError,
+            ProtocolError, ValueError) as e:
+        stats.errors[f"{type(e).__name__}: {e}"[:80]] += 1
+        return
+    if len(client.results) < args.rounds and not client._declined:
+        stats.errors["peer left mid-session"] += 1
+    else:
+        stats.clients_ok += 1
+
+async def run_load(args):
+    """
+    all clients, connections spread over the ramp so the listen backlog
+    isn't hit with everything at once. returns (LoadStats, wall seconds)
+    """
+    stats = LoadStats()
+    t0 = time.monotonic()
+    step = args.ramp / args.clients if args.clients else 0
+    await asyncio.gather(*(_one(stats, i, args, t0 + i * step)
+                           for i in range(args.clients)))
+    return stats, time.monotonic() - t0
+
+def percentiles(samples):
+    """
+    (p50, p95, p99, max), nearest rank; zeros when there are no samples
+    """
+    if not samples: return (0.0, 0.0, 0.0, 0.0)
+    s = sorted(samples); n = len(s)
+    rank = lambda p: s[min(n - 1, max(0, int(-(-p * n // 100)) - 1))]
+    return rank(50), rank(95), rank(99), s[-1]
+
+def _raise_fd_limit():
+    # every client is a socket, the default soft limit is often 1024
+    try:
+        import resource
+        soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+        if soft != hard: resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+    except (ImportError, ValueError, OSError):
+        pass
+
+def _spawn_server(args):
+    """
+    headless server in a child process on a free port, so its loop and
+    ours don't share a cpu slice; returns the Popen
+    """
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0)); args.port = s.getsockname()[1]
+    cmd = [sys.executable, '-m', 'tictactoe.server', '--host', '127.0.0.1',
+           '--port', str(args.port), '--size', str(args.size), '--bot-delay', '0']
+    if args.win: cmd += ['--win', str(args.win)]
+    proc = subprocess.Popen(cmd, stdout=subprocess.DEVNULL,
+                            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', args.port), 0.2).close()
+            return proc
+        except OSError:
+            if proc.poll() is not None: break
+            time.sleep(0.05)
+    proc.kill()
+    raise RuntimeError("spawned server didn't come up")
+
+def main(argv=None):
+    """
+    headless entry: python -m tictactoe.loadgen --clients 1000
+    """
+    parser = argparse.ArgumentParser(description="load test a host or server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9999)
+    parser.add_argument("--spawn-server", action="store_true",
+                        help="start a local headless server (bot delay 0) to test")
+    parser.add_argument("-c", "--clients", type=int, default=100)
+    parser.add_argument("--rounds", type=int, default=3, help="games per client")
+    parser.add_argument("--ramp", type=float, default=1.0,
+                        help="seconds over which clients connect")
+    parser.add_argument("--text", type=float, default=0.0,
+                        help="fraction of clients on the legacy text protocol")
+    parser.add_argument("--policy", choices=sorted(POLICIES), default="random")
+    parser.add_argument("--timeout", type=float, default=60.0,
+                        help="seconds a client may take for all its rounds")
+    parser.add_argument("--size", type=int, default=3)
+    parser.add_argument("--win", type=int, default=None)
+    parser.add_argument("--seed", default="load")
+    args = parser.parse_args(argv)
+
+    _raise_fd_limit()
+    proc = _spawn_server(args) if args.spawn_server else None
+    try:
+        stats, wall = asyncio.run(run_load(args))
+    except KeyboardInterrupt:
+        return 1
+    finally:
+        if proc: proc.terminate(); proc.wait()
+
+    c50, _, c99, _ = (1e3 * v for v in percentiles(stats.connects))
+    failed = args.clients - stats.clients_ok
+    print(f"{args.clients} clients against {args.host}:{args.port} in {wall:.2f}s: "
+          f"{stats.clients_ok} ok, {failed} failed")
+    print(f"  {stats.games} games ({stats.games / wall:.0f}/s), "
+          f"{stats.moves} moves sent ({stats.moves / wall:.0f}/s)")
+    for proto, rtts in stats.rtts.items():
+        if not rtts: continue
+        p50, p95, p99, worst = (1e3 * v for v in percentiles(rtts))
+        print(f"  {proto} move rtt ms: p50 {p50:.2f}  p95 {p95:.2f}  p99 {p99:.2f}  "
+              f"max {worst:.2f}  ({len(rtts)} samples)")
+    print(f"  connect+handshake ms: p50 {c50:.1f}  p99 {c99:.1f}")
+    for err, n in stats.errors.most_common(10):
+        print(f"  error x{n}: {err}")
+    return 1 if failed else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
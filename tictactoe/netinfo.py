@@ -0,0 +1,102 @@
+# local address discovery for hosting, done off the gui thread and cached
+# no qt imports, the window hooks in through the callback
+import socket, struct, sys, threading, time
+
+CACHE_TTL = 60.0                  # seconds before a lookup counts as stale
+SIOCGIFADDR = 0x8915              # linux ioctl: ipv4 address of an interface
+
+def route_ip(target='10.254.254.254'):
+    """
+    ip the os would send from to reach target; a udp "connect" only picks
+    a route, no packet goes out. None without a usable route
+    """
+    s = None
+    try:
+        s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        s.connect((target, 1))
+        return s.getsockname()[0]
+    except OSError: return None
+    finally:
+        if s: s.close()
+
+def interface_ips():
+    """
+    ipv4 address of every interface, straight from the kernel (linux only)
+    """
+    if not sys.platform.startswith('linux'): return []
+    import fcntl
+    ips = []
+    s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    try:
+        for _, name in socket.if_nameindex():
+            try:
+                res = fcntl.ioctl(s.fileno(), SIOCGIFADDR,
+                                  struct.pack('256s', name.encode()[:15]))
+            except OSError: continue  # down or no ipv4 address
+            ips.append(socket.inet_ntoa(res[20:24]))
+    finally:
+        s.close()
+    return ips
+
+def hostname_ips():
+    # resolver based, may block for seconds on a slow dns
+    try:
+        infos = socket.getaddrinfo(socket.gethostname(), None, socket.AF_INET)
+    except OSError: return []
+    return [sa[0] for *_, sa in infos]
+
+def local_addresses():
+    """
+    every non-loopback ipv4 address, the default route's first
+    blocking, so call it from a worker thread (see AddressCache)
+    """
+    addrs = []
+    for ip in [route_ip()] + interface_ips() + hostname_ips():
+        if ip and not ip.startswith('127.') and ip not in addrs:
+            addrs.append(ip)
+    return addrs
+
+class AddressCache:
+    """
+    last local_addresses() result; reads never block, a stale or
+    invalidated cache refreshes in a background thread and hands the
+    new list to on_update (called on that thread)
+    """
+    def __init__(self, on_update=None, ttl=CACHE_TTL, lookup=local_addresses):
+        self.on_update = on_update
+        self.ttl = ttl
+        self._lookup = lookup
+        self._addrs = []
+        self._stamp = None                # monotonic time of the last lookup
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def addresses(self):
+        """
+        cached list right away ([] before the first lookup finishes),
+        kicking off a refresh when it's stale
+        """
+        if self._stamp is None or time.monotonic() - self._stamp > self.ttl:
+            self.refresh()
+        return list(self._addrs)
+
+    def refresh(self):
+        # one lookup at a time; callers during it just get the old list
+        with self._lock:
+            if self._thread and self._thread.is_alive(): return
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def invalidate(self):
+        """
+        interfaces changed (or binding failed): look again
+        """
+        self._stamp = None
+        self.refresh()
+
+    def _run(self):
+        try: addrs = self._lookup()
+        except Exception as e:
+            print(f"address lookup failed: {e}"); addrs = []
+        self._addrs = addrs; self._stamp = time.monotonic()
+        if self.on_update: self.on_update(list(addrs))
@@ -1,10 +1,12 @@
-import threading, socket
-from PySide6.QtCore import QObject, Signal, Slot
-
-NET_MSG_PREFIX = "NET::"
-REQ_REMATCH = NET_MSG_PREFIX + "REQ_REMATCH"
-ACK_REMATCH = NET_MSG_PREFIX + "ACK_REMATCH"
-DEC_REMATCH = NET_MSG_PREFIX + "DEC_REMATCH"
+import threading, socket, selectors, errno, os
+from PySide6.QtCore import QObject, Signal, Slot, QTimer
+from PySide6.QtNetwork import QTcpServer, QTcpSocket, QHostAddress, QAbstractSocket
+from .protocol import (
+    T_MOVE, T_REQ_REMATCH, T_ACK_REMATCH, T_DEC_REMATCH, T_ASSIGN,
+    HANDSHAKE_TIMEOUT, HELLO_SIZE, FrameCodec, ProtocolError,
+    hello, is_binary_start, negotiate
+)
+from .discovery import Announcer
 
 class NetworkWorker(QObject):
     """
@@ -20,18 +22,25 @@ class NetworkWorker(QObject):
     rematch_accepted = Signal()
     rematch_declined = Signal()
 
-    def __init__(self):
+    def __init__(self, board_size=3, win_length=None):
         """
         init sockets and control flags
         """
         super().__init__()
+        self.board_size = board_size  # bounds for incoming moves
+        self.win_length = win_length  # checked against peer's hello
+        self.codec = None       # text or binary, set by handshake
         self.socket = None
         self.server_socket = None
         self.host_ip = ""       # ip to bind or connect
+        self.peer = ""          # opponent's ip:port once connected
         self.port = 0
         self.is_hosting = False # host vs client mode
         self._running = False   # thread control flag
         self.connection_thread = None
+        self._wake_r = self._wake_w = None  # socketpair, stop() pokes it
+        self.announcer = None   # lan announcements while hosting
+        self.discovery_dest = None  # None = broadcast, tests use loopback
 
     def _start_connection_thread(self, target_func, args_tuple):
         """
@@ -40,13 +49,64 @@ class NetworkWorker(QObject):
         # only one thread at a time
         if self.connection_thread and self.connection_thread.is_alive(): return
         self._running = True
+        # every blocking wait also watches this pair, so stop() is instant
+        self._wake_r, self._wake_w = socket.socketpair()
+        self._wake_r.setblocking(False); self._wake_w.setblocking(False)
         self.connection_thread = threading.Thread(
-            target=target_func,
-            args=args_tuple,
+            target=self._io_thread_main,
+            args=(target_func, args_tuple, self._wake_r, self._wake_w),
             daemon=True
         )
         self.connection_thread.start()
 
+    def _io_thread_main(self, target_func, args_tuple, wake_r, wake_w):
+        """
+        run host/connect func, then release this thread's sockets
+        """
+        try:
+            target_func(*args_tuple)
+        finally:
+            s = self.socket
+            self.socket = None
+            if s:
+                try: s.close()
+                except: pass
+            for w in (wake_r, wake_w):
+                try: w.close()
+                except: pass
+
+    def _wake(self):
+        # interrupt whatever the io thread is blocked on
+        try: self._wake_w.send(b'x')
+        except (OSError, AttributeError): pass  # already gone or full
+
+    def _wait(self, sock, events=selectors.EVENT_READ, timeout=None):
+        """
+        block until sock is ready or stop() wakes us
+        returns: True if ready, False on timeout
+        raises ConnectionAbortedError once stopped
+        """
+        with selectors.DefaultSelector() as sel:
+            sel.register(sock, events)
+            sel.register(self._wake_r, selectors.EVENT_READ)
+            ready = sel.select(timeout)
+        if not self._running or any(k.fileobj is self._wake_r for k, _ in ready):
+            raise ConnectionAbortedError("stopped")
+        return bool(ready)
+
+    def _start_announcing(self):
+        # let browsers on the lan see the open seat
+        try:
+            self.announcer = Announcer(self.port, None, self.board_size, self.win_length,
+                                       dest=self.discovery_dest).start()
+        except (OSError, ValueError) as e:
+            print(f"lan announce unavailable: {e}")
+
+    def _stop_announcing(self):
+        # seat taken or hosting over; stop() sends the "gone" packet
+        a = self.announcer; self.announcer = None
+        if a: a.stop()
+
     @Slot(str, int)
     def start_hosting(self, host_ip, port):
         """
@@ -75,39 +135,39 @@ class NetworkWorker(QObject):
             self.server_socket.bind((self.host_ip, self.port))
             self.server_socket.listen(1)
             self.status_update.emit(f"listening on {self.host_ip}:{self.port}. waiting...")
-            self.server_socket.settimeout(1.0)
-            client_socket = None
-
-            # wait for connection or stop
-            while self._running and client_socket is None:
-                try:
-                    client_socket, addr = self.server_socket.accept()
-                except socket.timeout:
-                    continue
-                except Exception as e:
-                    if self._running: self.error_occurred.emit(f"accept error: {e}")
-                    self._running = False
-                    break
+            self._start_announcing()
 
-            if self.server_socket:
-                self.server_socket.settimeout(None)
+            # wait for connection or stop, no polling
+            self._wait(self.server_socket)
+            self._stop_announcing()
+            try:
+                client_socket, addr = self.server_socket.accept()
+            except Exception as e:
+                if self._running: self.error_occurred.emit(f"accept error: {e}")
+                self._running = False
+                return
 
             # stopped before connect
             if not self._running:
-                if client_socket: client_socket.close()
+                client_socket.close()
                 return
 
             # client connected
             self.socket = client_socket
-            self.status_update.emit(f"opponent connected from {addr[0]}:{addr[1]}")
+            self.peer = f"{addr[0]}:{addr[1]}"
+            leftover = self._negotiate()
+            self.status_update.emit(f"opponent connected from {self.peer}")
             self.assign_player_symbol.emit('X'); self.connected.emit()
-            self._handle_connection()
+            self._handle_connection(leftover)
 
+        except ProtocolError as e:
+            if self._running: self.error_occurred.emit(f"protocol error: {e}")
         except (socket.error, ConnectionAbortedError) as e:
             if self._running: self.error_occurred.emit(f"hosting error: {e}")
         except Exception as e:
             if self._running: self.error_occurred.emit(f"unexpected hosting error: {e}")
         finally:
+            self._stop_announcing()
             serv = self.server_socket
             self.server_socket = None
             if serv:
@@ -120,20 +180,27 @@ class NetworkWorker(QObject):
         """
         try:
             client_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            self.socket = client_socket   # io thread closes it on exit
             self.status_update.emit(f"connecting to {self.host_ip}:{self.port}...")
-            client_socket.settimeout(10.0)
-            client_socket.connect((self.host_ip, self.port))
-            client_socket.settimeout(None)
-
-            if not self._running:
-                client_socket.close()
-                raise ConnectionAbortedError("connection stopped")
-
-            self.socket = client_socket
+            # non-blocking connect so stop() can cut it short
+            client_socket.setblocking(False)
+            err = client_socket.connect_ex((self.host_ip, self.port))
+            if err not in (0, errno.EINPROGRESS, errno.EWOULDBLOCK,
+                           getattr(errno, 'WSAEWOULDBLOCK', -1)):
+                raise OSError(err, os.strerror(err))
+            if not self._wait(client_socket, selectors.EVENT_WRITE, 10.0):
+                raise socket.timeout()
+            err = client_socket.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+            if err: raise OSError(err, os.strerror(err))
+            client_socket.setblocking(True)
+            self.peer = f"{self.host_ip}:{self.port}"
+            leftover = self._negotiate()
             self.status_update.emit("connected to host.")
             self.assign_player_symbol.emit('O'); self.connected.emit()
-            self._handle_connection()
+            self._handle_connection(leftover)
 
+        except ProtocolError as e:
+            if self._running: self.error_occurred.emit(f"protocol error: {e}")
         except socket.timeout:
             if self._running:
                 self.error_occurred.emit(f"connection timed out to {self.host_ip}:{self.port}.")
@@ -153,32 +220,67 @@ class NetworkWorker(QObject):
                 except: pass
                 self.socket = None
 
-    def _handle_connection(self):
+    def _negotiate(self):
+        """
+        send our hello, then pick text or binary from the peer's reply;
+        a legacy peer sends nothing first, so silence means text
+        returns: bytes read past the hello
+        """
+        s = self.socket
+        s.sendall(FrameCodec().encode(hello(self.board_size, self.win_length)))
+        data = b''
+        if self._wait(s, timeout=HANDSHAKE_TIMEOUT):
+            data = s.recv(1024)
+            while is_binary_start(data) and len(data) < HELLO_SIZE \
+                  and self._wait(s, timeout=HANDSHAKE_TIMEOUT):
+                more = s.recv(1024)
+                if not more: break
+                data += more
+        self.codec, leftover = negotiate(data, self.board_size, self.win_length)
+        return leftover
+
+    def _dispatch(self, msg):
+        """
+        one decoded msg -> matching signal
+        """
+        kind = msg[0]
+        if kind == T_MOVE:
+            r, c = msg[1], msg[2]; n = self.board_size
+            if 0<=r<n and 0<=c<n: self.move_received.emit(r,c)
+            else: print(f"oob move: {r},{c}")
+        elif kind == T_REQ_REMATCH: self.rematch_request_received.emit()
+        elif kind == T_ACK_REMATCH: self.rematch_accepted.emit()
+        elif kind == T_DEC_REMATCH: self.rematch_declined.emit()
+        elif kind == T_ASSIGN: self.assign_player_symbol.emit(msg[1])  # server seating
+        else: print(f"unexpected msg: {msg}")
+
+    def _handle_connection(self, data=b''):
         """
         main loop: recv msgs, emit signals
+        data: bytes already read during the handshake
         """
+        codec = self.codec
+        try:
+            for msg in codec.feed(data): self._dispatch(msg)
+        except ValueError as e:
+            print(e)
+        sel = selectors.DefaultSelector()
+        sel.register(self.socket, selectors.EVENT_READ)
+        sel.register(self._wake_r, selectors.EVENT_READ)
         while self._running and self.socket:
             try:
-                data = self.socket.recv(1024)
-                if not data:
+                # sleep until data or a stop() wakeup
+                ready = sel.select()
+                if not self._running or any(k.fileobj is self._wake_r for k, _ in ready):
+                    break
+                # straight into the codec's buffer, no per-recv bytes
+                if not codec.recv_into(self.socket):
                     if self._running: self.disconnected.emit("opponent disconnected")
                     self._running = False; break
 
-                msg = data.decode('utf-8')
-                # rematch commands
-                if msg.startswith(NET_MSG_PREFIX):
-                    if msg == REQ_REMATCH: self.rematch_request_received.emit()
-                    elif msg == ACK_REMATCH: self.rematch_accepted.emit()
-                    elif msg == DEC_REMATCH: self.rematch_declined.emit()
-                    else: print(f"unknown net msg: {msg}")
-                else:
-                    parts = msg.split(',')
-                    if len(parts)==2:
-                        r,c = int(parts[0]), int(parts[1])
-                        if 0<=r<=2 and 0<=c<=2: self.move_received.emit(r,c)
-                        else: print(f"oob move: {msg}")
-                    else:
-                        print(f"malformed move data: {msg}")
+                # one recv may hold several frames, or part of one
+                for msg in codec.drain():
+                    self._dispatch(msg)
 
             except ConnectionResetError:
                 if self._running: self.disconnected.emit("connection lost")
@@ -186,26 +288,30 @@ class NetworkWorker(QObject):
             except socket.error as e:
                 if self._running: self.disconnected.emit(f"socket error: {e}")
                 self._running=False; break
-            except ValueError:
-                print(f"non-int move data: {msg}")
+            except ProtocolError as e:
+                if self._running: self.disconnected.emit(f"protocol error: {e}")
+                self._running=False; break
+            except ValueError as e:
+                print(e)   # bad text msg, skip it
             except Exception as e:
                 if self._running: self.disconnected.emit(f"recv error: {e}")
                 self._running=False; break
 
         # tear down socket
+        sel.close()
         s = self.socket
         self.socket = None
         if s:
             try: s.close()
             except: pass
 
-    def _send_message(self, message):
+    def _send_message(self, msg):
         """
-        send raw msg over socket, handle errors
+        encode msg for the negotiated protocol and send, handle errors
         """
-        if self.socket and self._running:
+        if self.socket and self._running and self.codec:
             try:
-                self.socket.sendall(message.encode('utf-8'))
+                self.socket.sendall(self.codec.encode(msg))
                 return True
             except socket.error as e:
                 if self._running: self.disconnected.emit(f"send error: {e}")
@@ -214,26 +320,23 @@ class NetworkWorker(QObject):
                 if self._running: self.disconnected.emit(f"unexpected send error: {e}")
                 self._running=False
 
-            # cleanup on send fail
-            if self.socket:
-                try: self.socket.close()
-                except: pass
-                self.socket=None
+            # cleanup on send fail: io thread closes the socket
+            self._wake()
         return False
 
     @Slot(int, int)
     def send_move(self, row, col):
         # fire off a move
-        self._send_message(f"{row},{col}")
+        self._send_message((T_MOVE, row, col))
 
     @Slot()
-    def send_rematch_request(self): self._send_message(REQ_REMATCH)  # ask for another round
+    def send_rematch_request(self): self._send_message((T_REQ_REMATCH,))  # ask for another round
 
     @Slot()
-    def send_rematch_accept(self): self._send_message(ACK_REMATCH)   # accepted rematch
+    def send_rematch_accept(self): self._send_message((T_ACK_REMATCH,))   # accepted rematch
 
     @Slot()
-    def send_rematch_decline(self): self._send_message(DEC_REMATCH)  # declined rematch
+    def send_rematch_decline(self): self._send_message((T_DEC_REMATCH,))  # declined rematch
 
     @Slot()
     def stop(self):
@@ -243,16 +346,168 @@ class NetworkWorker(QObject):
         if not self._running: return
         self._explicit_stop = True
         self._running = False
-        # close client socket
-        if self.socket:
-            try: self.socket.shutdown(socket.SHUT_RDWR)
-            except: pass
-            try: self.socket.close()
-            except: pass
-            self.socket=None
-        # close server socket
-        if self.server_socket:
-            try: self.server_socket.close()
-            except: pass
-            self.server_socket=None
+        # wake the io thread; it closes its own sockets on the way out
+        self._wake()
+        t = self.connection_thread
+        if t and t is not threading.current_thread():
+            t.join(1.0)
         self._explicit_stop=False
+
+class QtNetworkWorker(NetworkWorker):
+    """
+    same signals and slots as NetworkWorker, but the sockets live on
+    the qt event loop (QTcpServer/QTcpSocket): no QThread and no python
+    thread, and every signal is a direct call on the gui thread
+    """
+    def __init__(self, board_size=3, win_length=None):
+        super().__init__(board_size, win_length)
+        self._server = None       # QTcpServer while hosting
+        self._sock = None         # QTcpSocket to the opponent
+        self._symbol = None       # our seat once connected
+        self._hs_data = b''       # peer bytes seen during handshake
+        self._hs_timer = None
+        self._connect_timer = None
+
+    @Slot(str, int)
+    def start_hosting(self, host_ip, port):
+        """
+        listen on the event loop, first connection becomes the opponent
+        """
+        if self._running: return
+        self.host_ip = host_ip; self.port = port; self.is_hosting = True
+        self._running = True
+        self._server = QTcpServer(self)
+        self._server.setMaxPendingConnections(1)
+        self._server.newConnection.connect(self._on_new_connection)
+        if not self._server.listen(QHostAddress(host_ip), port):
+            err = self._server.errorString()
+            self.stop()
+            self.error_occurred.emit(f"hosting error: {err}")
+            return
+        self.status_update.emit(f"listening on {self.host_ip}:{self.port}. waiting...")
+        self._start_announcing()
+
+    @Slot(str, int)
+    def start_connecting(self, host_ip, port):
+        """
+        async connect, 10s timeout like the threaded worker
+        """
+        if self._running: return
+        self.host_ip = host_ip; self.port = port; self.is_hosting = False
+        self._running = True
+        sock = QTcpSocket(self)
+        self.peer = f"{host_ip}:{port}"
+        sock.connected.connect(lambda: self._attach(sock, 'O', "connected to host."))
+        sock.errorOccurred.connect(self._on_socket_error)
+        self._sock = sock
+        self.status_update.emit(f"connecting to {self.host_ip}:{self.port}...")
+        self._connect_timer = QTimer(self)
+        self._connect_timer.setSingleShot(True)
+        self._connect_timer.timeout.connect(self._on_connect_timeout)
+        self._connect_timer.start(10000)
+        sock.connectToHost(host_ip, port)
+
+    def _on_connect_timeout(self):
+        if self._running and self._symbol is None:
+            self.stop()
+            self.error_occurred.emit(f"connection timed out to {self.host_ip}:{self.port}.")
+
+    def _on_new_connection(self):
+        sock = self._server.nextPendingConnection()
+        if sock is None: return
+        if self._sock is not None:
+            sock.abort(); return          # one opponent per game
+        self._server.close()              # stop accepting
+        self._stop_announcing()
+        sock.errorOccurred.connect(self._on_socket_error)
+        self.peer = f"{sock.peerAddress().toString()}:{sock.peerPort()}"
+        self._attach(sock, 'X', f"opponent connected from {self.peer}")
+
+    def _attach(self, sock, symbol, status):
+        """
+        connected: send our hello and start the handshake timer
+        """
+        if self._connect_timer: self._connect_timer.stop()
+        self._sock = sock; self._symbol = symbol; self._status = status
+        sock.setSocketOption(QAbstractSocket.LowDelayOption, 1)
+        sock.readyRead.connect(self._on_ready_read)
+        sock.disconnected.connect(self._on_disconnected)
+        sock.write(FrameCodec().encode(hello(self.board_size, self.win_length)))
+        self._hs_data = b''; self.codec = None
+        self._hs_timer = QTimer(self)
+        self._hs_timer.setSingleShot(True)
+        self._hs_timer.timeout.connect(self._finish_handshake)
+        self._hs_timer.start(int(HANDSHAKE_TIMEOUT * 1000))
+
+    def _finish_handshake(self):
+        # peer's hello arrived, or it stayed silent (legacy text peer)
+        if self.codec is not None or not self._running: return
+        self._hs_timer.stop()
+        try:
+            self.codec, leftover = negotiate(self._hs_data, self.board_size, self.win_length)
+        except ProtocolError as e:
+            self.stop()
+            self.error_occurred.emit(f"protocol error: {e}")
+            return
+        self.status_update.emit(self._status)
+        self.assign_player_symbol.emit(self._symbol); self.connected.emit()
+        self._feed(leftover)
+
+    def _on_ready_read(self):
+        data = self._sock.readAll().data()
+        if self.codec is None:
+            self._hs_data += data
+            if is_binary_start(self._hs_data) and len(self._hs_data) < HELLO_SIZE:
+                return  # rest of the hello still in flight
+            self._finish_handshake()
+            return
+        self._feed(data)
+
+    def _feed(self, data):
+        try:
+            for msg in self.codec.feed(data):
+                self._dispatch(msg)
+        except ProtocolError as e:
+            if self._running:
+                self.stop(); self.disconnected.emit(f"protocol error: {e}")
+        except ValueError as e:
+            print(e)   # bad text msg, skip it
+
+    def _on_disconnected(self):
+        if self._running:
+            self.stop(); self.disconnected.emit("opponent disconnected")
+
+    def _on_socket_error(self, err):
+        if not self._running: return
+        if err == QAbstractSocket.RemoteHostClosedError:
+            return  # _on_disconnected reports this one
+        msg = self._sock.errorString() if self._sock else str(err)
+        connected = self.codec is not None
+        self.stop()
+        if connected: self.disconnected.emit(f"socket error: {msg}")
+        else: self.error_occurred.emit(f"connection error: {msg}")
+
+    def _send_message(self, msg):
+        """
+        queue on the socket; qt flushes it from the event loop
+        """
+        if self._sock and self._running and self.codec:
+            self._sock.write(self.codec.encode(msg))
+            return True
+        return False
+
+    @Slot()
+    def stop(self):
+        """
+        drop timers and sockets, all on this thread, nothing to join
+        """
+        if not self._running: return
+        self._running = False
+        for t in (self._hs_timer, self._connect_timer):
+            if t: t.stop()
+        self._hs_timer = self._connect_timer = None
+        if self._sock:
+            self._sock.abort(); self._sock.deleteLater(); self._sock = None
+        if self._server:
+            self._server.close(); self._server.deleteLater(); self._server = None
+        self._stop_announcing()
@@ -0,0 +1,88 @@
+import random
+from .bitboard import line_tables
+from .game_logic import iter_bits
+from .solver import board_masks, solve
+
+# a policy is a callable (game, player) -> (row, col)
+# built fresh per process from its name, so pools only pickle strings
+
+# the solver searches exhaustively, seconds per move on 4x4 and far
+# worse above, so bigger boards get the heuristic instead
+SOLVER_MAX_CELLS = 9
+
+def empty_cells(game):
+    """
+    all open (row, col) on the board
+    """
+    return list(game.legal_moves())
+
+class RandomPolicy:
+    """
+    uniformly random open cell
+    """
+    def __init__(self, seed=None):
+        self.rng = random.Random(seed)
+
+    def __call__(self, game, player):
+        return self.rng.choice(empty_cells(game))
+
+class SolverPolicy:
+    """
+    perfect play, random pick among equally good moves
+    """
+    def __init__(self, seed=None):
+        self.rng = random.Random(seed)
+
+    def __call__(self, game, player):
+        _, moves = solve(game, player)
+        return self.rng.choice(moves)
+
+class HeuristicPolicy:
+    """
+    win now, else block, else the cell on most lines still open to us
+    """
+    def __init__(self, seed=None):
+        self.rng = random.Random(seed)
+
+    def __call__(self, game, player):
+        n = game.board_size
+        _, cell_lines, _ = line_tables(n, game.win_length)
+        x, o = board_masks(game)
+        me, opp = (x, o) if player == 'X' else (o, x)
+        cells = list(iter_bits(game.legal_mask))
+        for board in (me, opp):   # our win first, then their threat
+            for i in cells:
+                b = board | 1 << i
+                if any(b & m == m for m in cell_lines[i]):
+                    return divmod(i, n)
+        best, picks = -1, []
+        for i in cells:
+            score = sum(1 for m in cell_lines[i] if not m & opp)
+            if score > best: best, picks = score, [i]
+            elif score == best: picks.append(i)
+        return divmod(self.rng.choice(picks), n)
+
+POLICIES = {
+    'random': RandomPolicy,
+    'heuristic': HeuristicPolicy,
+    'solver': SolverPolicy,
+}
+
+def policy_for_board(name, board_size):
+    """
+    name, or 'heuristic' if it's the solver on a board too big to search
+    """
+    if name == 'solver' and board_size * board_size > SOLVER_MAX_CELLS:
+        print(f"solver is too slow for {board_size}x{board_size}, using heuristic")
+        return 'heuristic'
+    return name
+
+def make_policy(name, seed=None):
+    """
+    policy instance from its registry name
+    """
+    try:
+        return POLICIES[name](seed)
+    except KeyError:
+        raise ValueError(f"unknown policy {name!r}, "
+                         f"choose from {', '.join(POLICIES)}") from None
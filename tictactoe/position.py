@@ -0,0 +1,105 @@
+# compact, immutable board snapshots for caches, indexes and match tables
+from .game_logic import GameLogic
+from .solver import board_masks
+
+_SIDES = ('X', 'O')
+_shapes = {}          # (n, k, side) -> one shared int, so positions don't each own one
+
+def _shape(board_size, win_length, side):
+    key = (board_size, win_length, side)
+    shape = _shapes.get(key)
+    if shape is None:
+        shape = _shapes[key] = board_size | win_length << 16 | side << 32
+    return shape
+
+class Position:
+    """
+    a board as two ints: stones = x_mask | o_mask << n*n (bit = row*n
+    + col) and shape = board size, win length (16 bits each) and side
+    to move packed together; ~80 bytes for a 3x3 position where a GameLogic with its
+    nested lists takes ~900. immutable and hashable
+    """
+    __slots__ = ('stones', 'shape')
+
+    def __init__(self, x=0, o=0, board_size=3, win_length=None, to_move='X'):
+        if win_length is None: win_length = board_size
+        if not 0 < board_size <= 0xffff or not 0 < win_length <= 0xffff:
+            raise ValueError(f"board {board_size}x{board_size}, {win_length} in a row "
+                             "doesn't fit a Position")
+        if x & o:
+            raise ValueError("a cell can't hold both X and O")
+        if (x | o) >> (board_size * board_size):
+            raise ValueError(f"stones outside a {board_size}x{board_size} board")
+        object.__setattr__(self, 'stones', x | o << board_size * board_size)
+        object.__setattr__(self, 'shape',
+                           _shape(board_size, win_length, _SIDES.index(to_move)))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Position is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("Position is immutable")
+
+    # unpacked views
+    @property
+    def board_size(self): return self.shape & 0xffff
+    @property
+    def win_length(self): return self.shape >> 16 & 0xffff
+    @property
+    def to_move(self): return _SIDES[self.shape >> 32]
+    @property
+    def x(self): return self.stones & ((1 << self.board_size ** 2) - 1)
+    @property
+    def o(self): return self.stones >> self.board_size ** 2
+
+    @property
+    def move_count(self):
+        return bin(self.stones).count('1')
+
+    def __eq__(self, other):
+        if not isinstance(other, Position): return NotImplemented
+        return self.stones == other.stones and self.shape == other.shape
+
+    def __hash__(self):
+        return hash((self.stones, self.shape))
+
+    def __reduce__(self):
+        # slots + no setattr: pickle through the constructor
+        return (Position, (self.x, self.o, self.board_size, self.win_length, self.to_move))
+
+    def __repr__(self):
+        return (f"Position(x={self.x:#x}, o={self.o:#x}, board_size={self.board_size}, "
+                f"win_length={self.win_length}, to_move={self.to_move!r})")
+
+    @classmethod
+    def from_game(cls, game, to_move=None):
+        """
+        snapshot of any engine; to_move defaults to whoever follows the
+        last move, else the side with fewer marks (X on ties)
+        """
+        x, o = board_masks(game)
+        if to_move is None:
+            stack = getattr(game, 'move_stack', None)
+            if stack: to_move = 'O' if stack[-1][2] == 'X' else 'X'
+            else: to_move = 'O' if bin(x).count('1') > bin(o).count('1') else 'X'
+        return cls(x, o, game.board_size, game.win_length, to_move)
+
+    def to_game(self, engine=GameLogic):
+        """
+        fresh engine (GameLogic or BitboardGameLogic) set to this board
+        """
+        game = engine(self.board_size, self.win_length)
+        game.load_masks(self.x, self.o)
+        return game
+
+    def play(self, row, col):
+        """
+        position after the side to move takes (row, col), no legality
+        checks beyond the cell being empty
+        """
+        n = self.board_size; bit = 1 << (row*n + col)
+        x, o = self.x, self.o
+        if not 0 <= row < n or not 0 <= col < n or (x | o) & bit:
+            raise ValueError(f"can't play {row},{col}")
+        if self.to_move == 'X': return Position(x | bit, o, n, self.win_length, 'O')
+        return Position(x, o | bit, n, self.win_length, 'X')
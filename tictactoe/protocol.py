@@ -0,0 +1,236 @@
+# wire protocol shared by the desktop client and the headless server
+# no qt imports here, so servers and tools can use it directly
+import struct
+
+# legacy text protocol: a move is "r,c", control msgs carry this prefix
+NET_MSG_PREFIX = "NET::"
+REQ_REMATCH = NET_MSG_PREFIX + "REQ_REMATCH"
+ACK_REMATCH = NET_MSG_PREFIX + "ACK_REMATCH"
+DEC_REMATCH = NET_MSG_PREFIX + "DEC_REMATCH"
+
+# binary protocol: [u16 payload length][u8 type][fixed-width payload]
+# every peer that speaks it sends HELLO first; its leading 0x00 byte can
+# never start a text msg, so one byte tells the two protocols apart
+PROTOCOL_VERSION = 1
+MAGIC = b'TTT'
+HEADER = struct.Struct('>HB')
+MAX_PAYLOAD = 64                  # anything larger is a broken stream
+HANDSHAKE_TIMEOUT = 1.0           # seconds to wait for the peer's HELLO
+MAX_BOARD = 0xff                  # HELLO carries board size in one byte
+# legacy peers read one message per recv, so space out back-to-back sends
+LEGACY_SEND_GAP = 0.05
+
+# msg types; a msg is a tuple (type, *fields) in both protocols
+T_HELLO = 0x01        # (T_HELLO, version, board_size, win_length)
+T_MOVE = 0x02         # (T_MOVE, row, col)
+T_REQ_REMATCH = 0x03  # (T_REQ_REMATCH,)
+T_ACK_REMATCH = 0x04  # (T_ACK_REMATCH,)
+T_DEC_REMATCH = 0x05  # (T_DEC_REMATCH,)
+T_ASSIGN = 0x06       # (T_ASSIGN, 'X' or 'O'), server seats a player
+
+PAYLOADS = {
+    T_HELLO: struct.Struct('>3sBBB'),
+    T_MOVE: struct.Struct('>HH'),
+    T_REQ_REMATCH: struct.Struct(''),
+    T_ACK_REMATCH: struct.Struct(''),
+    T_DEC_REMATCH: struct.Struct(''),
+    T_ASSIGN: struct.Struct('>c'),
+}
+TEXT_CONTROL = {
+    REQ_REMATCH: T_REQ_REMATCH,
+    ACK_REMATCH: T_ACK_REMATCH,
+    DEC_REMATCH: T_DEC_REMATCH,
+}
+CONTROL_TEXT = {t: s for s, t in TEXT_CONTROL.items()}
+# type byte + payload, so one unpack_from yields the whole msg tuple
+FRAME_BODIES = {t: struct.Struct('>B' + p.format.lstrip('>'))
+                for t, p in PAYLOADS.items()}
+HELLO_SIZE = HEADER.size + PAYLOADS[T_HELLO].size
+MAX_FRAME = HEADER.size + MAX_PAYLOAD
+RECV_BUFFER = 4096
+
+def other(sym):
+    return 'O' if sym == 'X' else 'X'
+
+class ProtocolError(ValueError):
+    """
+    stream can't be decoded, drop the connection
+    """
+
+def hello(board_size=3, win_length=None):
+    """
+    our HELLO msg for a board
+    raises ProtocolError for a board too big to announce
+    """
+    if board_size > MAX_BOARD:
+        raise ProtocolError(f"network games go up to {MAX_BOARD}x{MAX_BOARD}, "
+                            f"not {board_size}x{board_size}")
+    return (T_HELLO, PROTOCOL_VERSION, board_size,
+            board_size if win_length is None else win_length)
+
+def parse_text(msg):
+    """
+    one legacy text message -> (type, *fields)
+    raises ValueError on anything else
+    """
+    if msg.startswith(NET_MSG_PREFIX):
+        if msg in TEXT_CONTROL: return (TEXT_CONTROL[msg],)
+        raise ValueError(f"unknown net msg: {msg}")
+    parts = msg.split(',')
+    if len(parts) != 2:
+        raise ValueError(f"malformed move data: {msg}")
+    return (T_MOVE, int(parts[0]), int(parts[1]))
+
+class TextCodec:
+    """
+    legacy protocol: no framing, one recv is taken as one msg
+    """
+    binary = False
+
+    def __init__(self, size=RECV_BUFFER):
+        self._buf = bytearray(size)       # reused for every recv
+        self._view = memoryview(self._buf)
+        self._n = 0
+
+    def encode(self, msg):
+        if msg[0] == T_MOVE: return f"{msg[1]},{msg[2]}".encode('utf-8')
+        if msg[0] in CONTROL_TEXT: return CONTROL_TEXT[msg[0]].encode('utf-8')
+        raise ValueError(f"text protocol can't carry msg type {msg[0]}")
+
+    def recv_into(self, sock):
+        """
+        one recv straight into the buffer, returns byte count (0 = eof)
+        """
+        self._n = sock.recv_into(self._view)
+        return self._n
+
+    def drain(self):
+        """
+        msgs from the last recv_into
+        """
+        n = self._n; self._n = 0
+        if not n: return []
+        try:
+            return [parse_text(str(self._view[:n], 'utf-8'))]
+        except UnicodeDecodeError as e:
+            raise ValueError(f"undecodable text msg: {e}") from None
+
+    def feed(self, data):
+        """
+        bytes from one recv -> list of msgs
+        """
+        if not data: return []
+        try:
+            return [parse_text(bytes(data).decode('utf-8'))]
+        except UnicodeDecodeError as e:
+            raise ValueError(f"undecodable text msg: {e}") from None
+
+class FrameCodec:
+    """
+    length-prefixed frames over one preallocated buffer
+    sockets recv_into the free tail, frames are unpacked in place, and
+    only a trailing partial frame is ever moved (back to the front)
+    """
+    binary = True
+
+    def __init__(self, size=RECV_BUFFER):
+        self._buf = bytearray(size)
+        self._view = memoryview(self._buf)
+        self._start = 0                   # first unparsed byte
+        self._end = 0                     # end of received bytes
+
+    def encode(self, msg):
+        body = PAYLOADS[msg[0]]
+        if msg[0] == T_HELLO: payload = body.pack(MAGIC, *msg[1:])
+        elif msg[0] == T_ASSIGN: payload = body.pack(msg[1].encode('ascii'))
+        else: payload = body.pack(*msg[1:])
+        return HEADER.pack(len(payload), msg[0]) + payload
+
+    def _tail(self):
+        # free space after the data, compacting once it gets short
+        if self._start == self._end:
+            self._start = self._end = 0
+        elif len(self._buf) - self._end < MAX_FRAME:
+            n = self._end - self._start
+            self._view[:n] = self._view[self._start:self._end]
+            self._start, self._end = 0, n
+        return self._view[self._end:]
+
+    def recv_into(self, sock):
+        """
+        one recv straight into the buffer, returns byte count (0 = eof)
+        """
+        n = sock.recv_into(self._tail())
+        self._end += n
+        return n
+
+    def drain(self):
+        """
+        every complete msg in the buffer; a partial frame stays put
+        """
+        buf = self._buf; pos = self._start; end = self._end
+        msgs = []
+        while end - pos >= HEADER.size:
+            length, mtype = HEADER.unpack_from(buf, pos)
+            if length > MAX_PAYLOAD:
+                raise ProtocolError(f"frame of {length} bytes")
+            nxt = pos + HEADER.size + length
+            if nxt > end: break               # wait for the rest
+            body = FRAME_BODIES.get(mtype)
+            if body is None or body.size != length + 1:
+                raise ProtocolError(f"bad frame type {mtype} / length {length}")
+            # type byte + payload in one unpack -> (type, *fields)
+            msg = body.unpack_from(buf, pos + 2)
+            if mtype == T_HELLO:
+                if msg[1] != MAGIC: raise ProtocolError("bad hello magic")
+                msg = (T_HELLO,) + msg[2:]
+            elif mtype == T_ASSIGN:
+                msg = (T_ASSIGN, msg[1].decode('ascii'))
+            msgs.append(msg)
+            pos = nxt
+        self._start = pos
+        return msgs
+
+    def feed(self, data):
+        """
+        copy bytes in (for stream apis that hand us bytes), return
+        every msg now complete
+        """
+        data = memoryview(data); msgs = []
+        while data:
+            tail = self._tail()
+            n = min(len(tail), len(data))
+            tail[:n] = data[:n]; self._end += n
+            data = data[n:]
+            msgs += self.drain()
+        return msgs
+
+def is_binary_start(data):
+    """
+    true if the peer's first bytes open a binary HELLO frame
+    """
+    return len(data) > 0 and data[0] == 0
+
+def negotiate(first_data, board_size=3, win_length=None):
+    """
+    pick a codec from the peer's first bytes (b'' if it sent nothing
+    before HANDSHAKE_TIMEOUT, i.e. a legacy peer waiting on us);
+    callers read at least HELLO_SIZE bytes when is_binary_start()
+    returns: (codec, leftover bytes to feed it like any later recv)
+    raises ProtocolError on a version or board mismatch
+    """
+    if not is_binary_start(first_data):
+        return TextCodec(), first_data
+    if len(first_data) < HELLO_SIZE:
+        raise ProtocolError("short hello")
+    length, mtype = HEADER.unpack_from(first_data)
+    if (length, mtype) != (PAYLOADS[T_HELLO].size, T_HELLO):
+        raise ProtocolError("binary peer didn't open with hello")
+    magic, version, n, k = PAYLOADS[T_HELLO].unpack_from(first_data, HEADER.size)
+    if magic != MAGIC:
+        raise ProtocolError("bad hello magic")
+    if version != PROTOCOL_VERSION:
+        raise ProtocolError(f"peer speaks protocol v{version}, we speak v{PROTOCOL_VERSION}")
+    if (n, k) != hello(board_size, win_length)[2:]:
+        raise ProtocolError(f"peer plays {n}x{n} with {k} in a row")
+    return FrameCodec(), first_data[HELLO_SIZE:]
@@ -0,0 +1,233 @@
+import argparse, json, os, sys, threading, time
+from .records import read_records
+
+# elo ladder kept in memory and updated one result at a time; snapshots
+# let a restart pick up where it left off instead of replaying everything
+# a ladder is one of two kinds and its snapshot says which:
+#   live     fed game by game through append() (the server's --ratings)
+#   history  built and caught up only through apply_history(), tracking
+#            the last history row it applied
+# the two never share a file, or games would be rated twice
+#   python -m tictactoe.ratings --history ~/.tictactoe/history.db --snapshot r.json
+#   python -m tictactoe.ratings --log games.ttr --top 20
+
+START = 1500.0
+K = 24                            # settled players
+PROVISIONAL_K = 48                # first PROVISIONAL games move faster
+PROVISIONAL = 20
+SNAPSHOT_EVERY = 1000             # games between automatic snapshots
+CHUNK = 50000                     # history rows per fetch when recomputing
+SNAPSHOT_VERSION = 1
+
+class Ratings:
+    """
+    name -> [rating, games, wins, draws, losses]; update() is O(1), so
+    a result costs the same on a ladder of ten games or ten million
+    append(rec) takes GameRecords, same as GameLog and MatchHistory
+    source is 'live' or 'history', see the top of the file
+    """
+    def __init__(self, snapshot_path=None, snapshot_every=SNAPSHOT_EVERY,
+                 source='live'):
+        self.players = {}
+        self.games = 0                    # results applied
+        self.source = source
+        self.last_id = 0                  # newest history row applied
+        self.snapshot_path = snapshot_path
+        self.snapshot_every = snapshot_every
+        self._since_snapshot = 0
+        self._writer = None
+
+    def _entry(self, name):
+        e = self.players.get(name)
+        if e is None: e = self.players[name] = [START, 0, 0, 0, 0]
+        return e
+
+    def update(self, x_player, o_player, winner):
+        """
+        one finished game: winner 'X', 'O' or None for a draw
+        """
+        if x_player == o_player: return   # self-play says nothing
+        x = self._entry(x_player); o = self._entry(o_player)
+        score = 0.5 if winner is None else 1.0 if winner == 'X' else 0.0
+        expect = 1.0 / (1.0 + 10.0 ** ((o[0] - x[0]) / 400.0))
+        delta = score - expect
+        x[0] += (K if x[1] >= PROVISIONAL else PROVISIONAL_K) * delta
+        o[0] -= (K if o[1] >= PROVISIONAL else PROVISIONAL_K) * delta
+        x[1] += 1; o[1] += 1
+        if winner is None: x[3] += 1; o[3] += 1
+        elif winner == 'X': x[2] += 1; o[4] += 1
+        else: x[4] += 1; o[2] += 1
+        self.games += 1
+        if self.snapshot_path and self.snapshot_every:
+            self._since_snapshot += 1
+            # never wait on the last write here (callers include the server
+            # loop); while it's in flight the snapshot is put off a game
+            if self._since_snapshot >= self.snapshot_every and \
+               not (self._writer and self._writer.is_alive()):
+                self.snapshot()
+
+    def _live(self):
+        if self.source != 'live':
+            raise ValueError("a history ladder only advances through apply_history")
+
+    def update_game(self, game, x_player, o_player):
+        """
+        result straight from a finished GameLogic
+        """
+        self._live()
+        if game.game_over: self.update(x_player, o_player, game.winner)
+
+    def append(self, rec):
+        # unfinished games have no result to rate
+        self._live()
+        if rec.finished: self.update(rec.x_player, rec.o_player, rec.winner)
+
+    def rating(self, name):
+        e = self.players.get(name)
+        return START if e is None else e[0]
+
+    def top(self, n=10, min_games=1):
+        """
+        [(name, rating, games, wins, draws, losses)] best first
+        """
+        rows = [(name, *e) for name, e in self.players.items() if e[1] >= min_games]
+        rows.sort(key=lambda r: -r[1])
+        return rows[:n]
+
+    # ----- snapshots -----
+
+    def snapshot(self, path=None, wait=False):
+        """
+        write the index to json; the copy is taken here, the disk write
+        happens on a thread unless wait is set. file is replaced
+        atomically so a crash leaves the previous snapshot
+        """
+        path = path or self.snapshot_path
+        self._since_snapshot = 0
+        data = {'version': SNAPSHOT_VERSION, 'source': self.source,
+                'games': self.games, 'last_id': self.last_id,
+                'players': {n: list(e) for n, e in self.players.items()}}
+        if self._writer: self._writer.join()   # keep snapshots in order
+        if wait:
+            _write_json(path, data); self._writer = None
+        else:
+            self._writer = threading.Thread(target=_write_json, args=(path, data),
+                                            daemon=True)
+            self._writer.start()
+
+    def close(self):
+        """
+        final snapshot (if snapshotting), waits for the write
+        """
+        if self.snapshot_path: self.snapshot(wait=True)
+        elif self._writer: self._writer.join()
+
+    @classmethod
+    def load(cls, path, snapshot_every=SNAPSHOT_EVERY, source='live'):
+        """
+        ratings from a snapshot, empty ones if it doesn't exist yet;
+        later snapshots go back to the same file. raises ValueError if
+        the file holds the other kind of ladder
+        """
+        r = cls(path, snapshot_every, source)
+        try:
+            with open(path) as f: data = json.load(f)
+        except FileNotFoundError:
+            return r
+        if data.get('version') != SNAPSHOT_VERSION:
+            raise ValueError(f"{path}: unknown ratings snapshot version")
+        # snapshots from before the field: only history ladders moved last_id
+        kind = data.get('source') or ('history' if data['last_id'] else 'live')
+        if kind != source:
+            raise ValueError(f"{path}: a {kind} ladder, not a {source} one")
+        r.players = {n: list(e) for n, e in data['players'].items()}
+        r.games = data['games']; r.last_id = data['last_id']
+        return r
+
+    # ----- bulk (re)computation -----
+
+    def apply_history(self, db, chunk=CHUNK):
+        """
+        stream history rows newer than last_id in id order, chunk rows
+        per query (keyset paging, no OFFSET), so a fresh index replays
+        the whole table and a loaded snapshot only what came after it
+        returns: games applied
+        """
+        if self.source != 'history':
+            if self.games:
+                raise ValueError("a live ladder can't catch up from a match history")
+            self.source = 'history'
+        names = dict(db.execute("SELECT id, name FROM players"))
+        before = self.games
+        while True:
+            rows = db.execute("SELECT id, x_id, o_id, result FROM games "
+                              "WHERE id > ? ORDER BY id LIMIT ?",
+                              (self.last_id, chunk)).fetchall()
+            if not rows: break
+            for _, x_id, o_id, result in rows:
+                if result == 3: continue  # unfinished
+                x, o = names.get(x_id), names.get(o_id)
+                if x is None or o is None:  # player added since we read the table
+                    names = dict(db.execute("SELECT id, name FROM players"))
+                    x, o = names[x_id], names[o_id]
+                self.update(x, o, (None, 'X', 'O')[result])
+            self.last_id = rows[-1][0]
+        return self.games - before
+
+    def apply_logs(self, paths):
+        """
+        replay record logs start to end (moves aren't decoded)
+        """
+        before = self.games
+        for path in paths:
+            for rec in read_records(path, decode=False): self.append(rec)
+        return self.games - before
+
+def _write_json(path, data):
+    d = os.path.dirname(path)
+    if d: os.makedirs(d, exist_ok=True)
+    tmp = f"{path}.tmp"
+    try:
+        with open(tmp, 'w') as f: json.dump(data, f, separators=(',', ':'))
+        os.replace(tmp, path)
+    except OSError as e:
+        print(f"ratings snapshot: {e}")
+
+def main(argv=None):
+    """
+    headless entry: python -m tictactoe.ratings --history DB [--snapshot PATH]
+    """
+    parser = argparse.ArgumentParser(description="elo ratings from match history")
+    src = parser.add_mutually_exclusive_group(required=True)
+    src.add_argument("--history", metavar="DB", help="sqlite match history")
+    src.add_argument("--log", nargs="+", metavar="LOG", help="record logs")
+    parser.add_argument("--snapshot", default=None, metavar="PATH",
+                        help="history ladder to resume from and save to "
+                             "(--history only; not the server's live --ratings file)")
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--min-games", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    t0 = time.perf_counter()
+    if args.history:
+        from .history import open_db
+        # no periodic snapshots mid-run, one at the end is enough
+        try:
+            ratings = Ratings.load(args.snapshot, 0, 'history') if args.snapshot \
+                else Ratings(source='history')
+        except ValueError as e:
+            print(e); return 1
+        n = ratings.apply_history(open_db(args.history))
+    else:
+        ratings = Ratings(); n = ratings.apply_logs(args.log)
+    secs = time.perf_counter() - t0
+    if args.snapshot and args.history: ratings.snapshot(wait=True)
+    print(f"applied {n} games in {secs:.2f}s, {ratings.games} rated in total")
+    for i, (name, rating, games, won, drawn, lost) in enumerate(
+            ratings.top(args.top, args.min_games), 1):
+        print(f"{i:4} {name or '-':24} {rating:7.1f} {games:7} games "
+              f"({won}/{drawn}/{lost})")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
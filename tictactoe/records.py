@@ -0,0 +1,248 @@
+import os, mmap, struct, time
+from bisect import bisect_left
+from collections import namedtuple
+from functools import lru_cache
+from math import perm
+
+# append-only game log: 8 byte file header, then one record per game
+#   header: magic, version, pad
+#   record: u16 board size, u16 win length, u8 flags, u32 start (unix s),
+#           u16 duration (s), u32 move count,
+#           u8-length-prefixed utf-8 X and O player names,
+#           move code: each move's rank among the cells still empty,
+#           packed as one mixed-radix int (a full 3x3 game is 3 bytes),
+#           u16 record length trailer, so a writer can check the last
+#           record from the end of the file without scanning it
+#   flags:  bits 0-1 result (0 draw, 1 X won, 2 O won, 3 unfinished),
+#           bit 2 set when O moved first
+# v1 logs had u8 board size and win length and a u16 move count; they
+# are still read, and appended to in their own layout
+FILE_HEADER = struct.Struct('<4sB3x')
+RECORDS = {1: struct.Struct('<BBBIHH'), 2: struct.Struct('<HHBIHI')}
+VERSION = 2
+TRAILER = struct.Struct('<H')
+MAGIC = b'TTTR'
+MAX_NAME = 64
+MAX_RECORD = 0xffff
+RESULTS = {0: None, 1: 'X', 2: 'O', 3: None}
+DEFAULT_LOG = os.path.join(os.path.expanduser('~'), '.tictactoe', 'games.ttr')
+
+GameRecord = namedtuple('GameRecord', 'board_size win_length first moves winner '
+                        'finished x_player o_player started duration')
+
+@lru_cache(maxsize=None)
+def code_size(cells, moves):
+    """
+    bytes for the move code of `moves` moves on `cells` cells
+    """
+    return ((perm(cells, moves) - 1).bit_length() + 7) // 8
+
+def encode_moves(moves, board_size):
+    """
+    [(row, col), ...] -> move code bytes
+    """
+    cells = board_size * board_size
+    empty = list(range(cells)); code = 0; radix = 1
+    for r, c in moves:
+        i = bisect_left(empty, r*board_size + c)
+        code += i * radix; radix *= len(empty)
+        del empty[i]
+    return code.to_bytes(code_size(cells, len(moves)), 'little')
+
+def decode_moves(data, count, board_size):
+    """
+    move code bytes -> [(row, col), ...]
+    """
+    code = int.from_bytes(data, 'little')
+    empty = list(range(board_size * board_size)); moves = []
+    for _ in range(count):
+        code, i = divmod(code, len(empty))
+        moves.append(divmod(empty.pop(i), board_size))
+    return moves
+
+def record_from_game(game, x_player='', o_player='', started=None, ended=None):
+    """
+    GameRecord for a game played through make_move (its move_stack)
+    """
+    ended = time.time() if ended is None else ended
+    started = ended if started is None else started
+    stack = game.move_stack
+    return GameRecord(game.board_size, game.win_length,
+                      stack[0][2] if stack else 'X',
+                      [(r, c) for r, c, _ in stack],
+                      game.winner, game.game_over, x_player, o_player,
+                      int(started), int(ended - started))
+
+def _name(s):
+    raw = s.encode('utf-8')[:MAX_NAME]
+    return bytes((len(raw),)) + raw
+
+def encode_record(rec, version=VERSION):
+    layout = RECORDS[version]
+    limit = 0xff if version == 1 else 0xffff
+    if rec.board_size > limit:
+        raise ValueError(f"{rec.board_size}x{rec.board_size} board too big "
+                         f"for a v{version} game log")
+    result = 3 if not rec.finished else {None: 0, 'X': 1, 'O': 2}[rec.winner]
+    flags = result | (4 if rec.first == 'O' else 0)
+    body = layout.pack(rec.board_size, rec.win_length, flags, rec.started,
+                       min(max(rec.duration, 0), 0xffff), len(rec.moves)) + \
+           _name(rec.x_player) + _name(rec.o_player) + \
+           encode_moves(rec.moves, rec.board_size)
+    size = len(body) + TRAILER.size
+    if size > MAX_RECORD:
+        raise ValueError(f"game of {len(rec.moves)} moves too long to record")
+    return body + TRAILER.pack(size)
+
+def record_size(buf, pos):
+    """
+    length of the record at buf[pos:] from its own fields, None if it
+    runs past the end of buf, its trailer disagrees (torn write) or
+    its board can't hold its moves
+    buf is the whole log, its header says which record layout to use
+    """
+    layout = RECORDS[buf[4]]; end = len(buf)
+    if pos + layout.size + 2 > end: return None
+    n, k, _, _, _, count = layout.unpack_from(buf, pos)
+    # fields no writer produces; the move code can't be decoded from them
+    if not 0 < k <= n or count > n*n: return None
+    p = pos + layout.size
+    p += 1 + buf[p]                           # x name
+    if p >= end: return None
+    p += 1 + buf[p] + code_size(n*n, count)   # o name, moves
+    if p + TRAILER.size > end or TRAILER.unpack_from(buf, p)[0] != p + 2 - pos:
+        return None
+    return p + TRAILER.size - pos
+
+def decode_record(buf, pos, decode=True):
+    """
+    record at buf[pos:] -> (GameRecord, next pos); moves is None when
+    decode is off, for scans that only need results and players
+    """
+    layout = RECORDS[buf[4]]
+    n, k, flags, started, duration, count = layout.unpack_from(buf, pos)
+    p = pos + layout.size
+    x_len = buf[p]; x_name = bytes(buf[p+1:p+1+x_len]).decode('utf-8', 'replace')
+    p += 1 + x_len
+    o_len = buf[p]; o_name = bytes(buf[p+1:p+1+o_len]).decode('utf-8', 'replace')
+    p += 1 + o_len
+    end = p + code_size(n*n, count)
+    moves = decode_moves(buf[p:end], count, n) if decode else None
+    return GameRecord(n, k, 'O' if flags & 4 else 'X', moves, RESULTS[flags & 3],
+                      flags & 3 != 3, x_name, o_name, started, duration), \
+           end + TRAILER.size
+
+class GameLog:
+    """
+    append-only writer, one write (and flush) per finished game; a
+    crash can at worst tear the last record, which is cut off on the
+    next open so new records never land behind garbage
+    """
+    def __init__(self, path=DEFAULT_LOG):
+        self.path = path
+        self.version = VERSION            # an existing log keeps its own
+        d = os.path.dirname(path)
+        if d: os.makedirs(d, exist_ok=True)
+        self._f = open(path, 'ab')
+        if self._f.tell() == 0:
+            self._f.write(FILE_HEADER.pack(MAGIC, VERSION)); self._f.flush()
+        else:
+            try:
+                self._check_tail()
+            except ValueError:
+                self._f.close(); raise
+
+    def _check_tail(self):
+        # the trailer points at the last record's start; only if that
+        # doesn't hold up do we walk the file to find the last good one
+        with open(self.path, 'r+b') as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                magic, version = FILE_HEADER.unpack_from(mm, 0) \
+                    if len(mm) >= FILE_HEADER.size else (None, None)
+                if magic != MAGIC or version not in RECORDS:
+                    raise ValueError(f"{self.path}: not a game log (v{VERSION})")
+                self.version = version
+                end = len(mm)
+                if end == FILE_HEADER.size: return
+                size, = TRAILER.unpack_from(mm, end - TRAILER.size)
+                start = end - size
+                if start >= FILE_HEADER.size and record_size(mm, start) == size:
+                    return
+                pos = FILE_HEADER.size
+                while (size := record_size(mm, pos)) is not None: pos += size
+            finally:
+                mm.close()
+            print(f"{self.path}: dropping {end - pos} bytes of a torn record")
+            f.truncate(pos)
+
+    def append(self, rec):
+        self._f.write(encode_record(rec, self.version)); self._f.flush()
+
+    def close(self):
+        self._f.close()
+
+    def __enter__(self): return self
+    def __exit__(self, *exc): self.close()
+
+def map_log(path):
+    """
+    read-only mmap of a log with a valid header, None when it's empty;
+    the caller closes it. raises ValueError for anything else
+    """
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size < FILE_HEADER.size: return None
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    magic, version = FILE_HEADER.unpack_from(mm, 0)
+    if magic != MAGIC or version not in RECORDS:
+        mm.close()
+        raise ValueError(f"{path}: not a game log (v{VERSION})")
+    return mm
+
+def scan_records(buf, start=FILE_HEADER.size, stop=None, decode=True):
+    """
+    (offset, GameRecord) for each record starting in buf[start:stop];
+    start must be a record boundary. stops at a record that doesn't
+    hold together, callers compare the last offset to stop to tell
+    """
+    pos = start; stop = len(buf) if stop is None else stop
+    while pos < stop:
+        if record_size(buf, pos) is None: return   # torn or corrupt
+        rec, nxt = decode_record(buf, pos, decode)
+        yield pos, rec
+        pos = nxt
+
+def read_records(path, decode=True):
+    """
+    stream every record from a memory-mapped log without reading it
+    all in; stops quietly at a torn final record
+    """
+    mm = map_log(path)
+    if mm is None: return
+    try:
+        for _, rec in scan_records(mm, decode=decode): yield rec
+    finally:
+        mm.close()
+
+def split_log(path, parts):
+    """
+    cut a log into about `parts` record-aligned (start, stop) byte
+    ranges; hops over record lengths only, nothing is decoded
+    """
+    mm = map_log(path)
+    if mm is None: return []
+    try:
+        end = len(mm); step = max(1, (end - FILE_HEADER.size) // max(1, parts))
+        bounds = [FILE_HEADER.size]; pos = FILE_HEADER.size
+        target = pos + step
+        while pos < end:
+            size = record_size(mm, pos)
+            if size is None: break
+            pos += size
+            if pos >= target and pos < end:
+                bounds.append(pos); target = pos + step
+        # a torn tail stays in the last range so its reader reports it
+        bounds.append(end)
+        return list(zip(bounds, bounds[1:]))
+    finally:
+        mm.close()
@@ -0,0 +1,373 @@
+import argparse, asyncio, sys, time
+from .game_logic import GameLogic
+from .policies import POLICIES, make_policy, policy_for_board
+from .records import GameLog, record_from_game
+from .history import MatchHistory
+from .ratings import Ratings
+from .protocol import (
+    T_MOVE, T_REQ_REMATCH, T_ACK_REMATCH, T_DEC_REMATCH, T_ASSIGN,
+    HANDSHAKE_TIMEOUT, HELLO_SIZE, LEGACY_SEND_GAP, FrameCodec, ProtocolError,
+    hello, is_binary_start, negotiate, other
+)
+
+class ClientSeat:
+    """
+    one tcp connection in a match, text or binary protocol
+    """
+    def __init__(self, server, reader, writer):
+        self.server = server
+        self.reader = reader; self.writer = writer
+        self.match = None; self.symbol = None
+        self.codec = None; self.leftover = b''
+        self.peer = writer.get_extra_info('peername')
+        # the host, not host:port: the port is new on every reconnect, so
+        # the ladder would never see the same player twice
+        self.name = str(self.peer[0]) if self.peer else 'remote'
+        self.anonymous = not self.peer    # no identity to rate
+        self._outbox = asyncio.Queue()
+        self._sender = None
+
+    async def negotiate(self):
+        """
+        hello exchange; a legacy client stays silent, so timeout = text
+        """
+        self.writer.write(FrameCodec().encode(
+            hello(self.server.board_size, self.server.win_length)))
+        data = b''
+        try:
+            data = await asyncio.wait_for(self.reader.read(1024), HANDSHAKE_TIMEOUT)
+            if is_binary_start(data) and len(data) < HELLO_SIZE:
+                data += await asyncio.wait_for(
+                    self.reader.readexactly(HELLO_SIZE - len(data)), HANDSHAKE_TIMEOUT)
+        except asyncio.TimeoutError:
+            pass
+        self.codec, self.leftover = negotiate(
+            data, self.server.board_size, self.server.win_length)
+
+    def attach(self, match, symbol):
+        self.match = match; self.symbol = symbol
+        if self.codec.binary:
+            self._send((T_ASSIGN, symbol))  # tell the client its seat
+
+    def your_turn(self):
+        pass  # the desktop client tracks its own turn
+
+    def _send(self, msg):
+        self._outbox.put_nowait(self.codec.encode(msg))
+
+    def send_move(self, row, col): self._send((T_MOVE, row, col))
+    def rematch_requested(self): self._send((T_REQ_REMATCH,))
+    def rematch_answered(self, accepted):
+        self._send((T_ACK_REMATCH,) if accepted else (T_DEC_REMATCH,))
+
+    async def _send_loop(self):
+        # single writer per socket keeps messages in order; legacy peers
+        # get LEGACY_SEND_GAP between any two writes, not just queued ones,
+        # or a zero-delay bot reply lands in the same recv as our last msg
+        loop = asyncio.get_running_loop(); last = -LEGACY_SEND_GAP
+        while True:
+            data = await self._outbox.get()
+            if not self.codec.binary:
+                wait = last + LEGACY_SEND_GAP - loop.time()
+                if wait > 0: await asyncio.sleep(wait)
+            self.writer.write(data)
+            await self.writer.drain()
+            last = loop.time()
+
+    def _dispatch(self, msg):
+        if self.match is None:
+            return  # still waiting for an opponent
+        kind = msg[0]
+        if kind == T_MOVE: self.match.on_move(self.symbol, msg[1], msg[2])
+        elif kind == T_REQ_REMATCH: self.match.on_rematch_request(self.symbol)
+        elif kind == T_ACK_REMATCH: self.match.on_rematch_answer(self.symbol, True)
+        elif kind == T_DEC_REMATCH: self.match.on_rematch_answer(self.symbol, False)
+
+    async def run(self):
+        """
+        read msgs until the peer goes away, hand them to the match
+        """
+        self._sender = asyncio.create_task(self._send_loop())
+        data = self.leftover
+        try:
+            while True:
+                if not data:
+                    data = await self.reader.read(1024)
+                    if not data: break
+                try:
+                    for msg in self.codec.feed(data):
+                        self._dispatch(msg)
+                except ProtocolError as e:
+                    print(f"{self.peer}: {e}")
+                    break
+                except ValueError as e:
+                    print(f"{self.peer}: bad msg: {e}")
+                data = b''
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            if self.match: self.match.on_leave(self.symbol)
+            else: self.server.unqueue(self)
+
+    def close(self):
+        if self._sender: self._sender.cancel()
+        try: self.writer.close()
+        except Exception: pass
+
+class BotSeat:
+    """
+    server-side opponent driven by a move policy
+    """
+    def __init__(self, policy, delay=0.3, name='bot'):
+        self.policy = policy; self.delay = delay
+        self.name = name; self.anonymous = False
+        self.match = None; self.symbol = None
+        self._pending = None
+
+    def attach(self, match, symbol):
+        self.match = match; self.symbol = symbol
+
+    def your_turn(self):
+        # short pause so the move reads as a reply, not part of the last msg
+        loop = asyncio.get_running_loop()
+        self._pending = loop.call_later(self.delay, self._play)
+
+    def _play(self):
+        self._pending = None
+        game = self.match.game
+        if game.game_over or self.match.turn != self.symbol: return
+        # think on a worker thread, a slow policy mustn't stall every match;
+        # the board can't change meanwhile, it's our turn
+        loop = asyncio.get_running_loop()
+        self._pending = loop.run_in_executor(None, self.policy, game, self.symbol)
+        self._pending.add_done_callback(self._played)
+
+    def _played(self, fut):
+        self._pending = None
+        if fut.cancelled() or self.match.closed: return
+        if fut.exception():
+            print(f"bot {self.name}: {fut.exception()}"); return
+        game = self.match.game
+        if game.game_over or self.match.turn != self.symbol: return
+        self.match.on_move(self.symbol, *fut.result())
+
+    def send_move(self, row, col): pass
+
+    def rematch_requested(self):
+        # always up for another round
+        asyncio.get_running_loop().call_soon(
+            self.match.on_rematch_answer, self.symbol, True)
+
+    def rematch_answered(self, accepted): pass
+
+    def close(self):
+        if self._pending: self._pending.cancel()
+
+class Match:
+    """
+    authoritative game between two seats, X starts round one,
+    starters alternate on every rematch like the desktop client
+    """
+    def __init__(self, server, seats):
+        self.server = server
+        self.seats = seats                # {'X': seat, 'O': seat}
+        self.game = GameLogic(server.board_size, server.win_length)
+        self.starter = self.turn = 'X'
+        self.started = time.time()
+        self.rematch_from = None
+        self.closed = False
+        for sym, seat in seats.items(): seat.attach(self, sym)
+
+    def start(self):
+        self.seats[self.turn].your_turn()
+
+    def on_move(self, sym, row, col):
+        """
+        validate through GameLogic, then relay to the other seat
+        """
+        if self.closed or sym != self.turn:
+            return
+        res = self.game.make_move(row, col, sym)
+        if res == "invalid":
+            print(f"match {id(self):x}: rejected {sym} move {row},{col}")
+            return
+        self.seats[other(sym)].send_move(row, col)
+        if res == "continue":
+            self.turn = other(sym)
+            self.seats[self.turn].your_turn()
+        else:
+            self.server.games_finished += 1
+            self.server.record(self)
+
+    def on_rematch_request(self, sym):
+        if self.closed or not self.game.game_over or self.rematch_from: return
+        self.rematch_from = sym
+        self.seats[other(sym)].rematch_requested()
+
+    def on_rematch_answer(self, sym, accepted):
+        if self.closed or self.rematch_from != other(sym): return
+        self.rematch_from = None
+        self.seats[other(sym)].rematch_answered(accepted)
+        if accepted:
+            self.game.reset_game()
+            self.started = time.time()
+            self.starter = self.turn = other(self.starter)
+            self.seats[self.turn].your_turn()
+
+    def on_leave(self, sym):
+        # either side leaving ends the match for both
+        if self.closed: return
+        self.closed = True
+        if self.game.move_stack and not self.game.game_over:
+            self.server.record(self)      # abandoned mid-game
+        for seat in self.seats.values(): seat.close()
+        self.server.matches.discard(self)
+
+class GameServer:
+    """
+    headless asyncio host: every match runs in one event loop
+    binary-protocol clients are paired with each other and told their
+    seat; legacy text clients always play 'O' and expect the host to
+    move first, so they are seated against a bot 'X' right away
+    """
+    def __init__(self, host='0.0.0.0', port=9999, board_size=3,
+                 win_length=None, bot='solver', bot_delay=0.3, pair_wait=10.0,
+                 log_path=None, history_path=None, ratings_path=None):
+        self.host = host; self.port = port
+        self.board_size = board_size; self.win_length = win_length
+        hello(board_size, win_length)     # raises if clients couldn't be told the board
+        self.bot = policy_for_board(bot, board_size)
+        self.bot_delay = bot_delay
+        self.pair_wait = pair_wait        # seconds before a bot steps in
+        self.matches = set()
+        self.games_finished = 0
+        self._waiting = None              # (seat, bot timer) or None
+        self._server = None
+        self.log = GameLog(log_path) if log_path else None
+        self.history = MatchHistory(history_path) if history_path else None
+        # live ladder, snapshotted to ratings_path every SNAPSHOT_EVERY games;
+        # its own file, a ladder built by `ratings --history` is refused
+        self.ratings = Ratings.load(ratings_path) if ratings_path else None
+
+    def _start_match(self, seats):
+        match = Match(self, seats)
+        self.matches.add(match)
+        match.start()
+
+    def _bot_seat(self):
+        return BotSeat(make_policy(self.bot), self.bot_delay, f"bot:{self.bot}")
+
+    def record(self, match):
+        # one small append per game; history only queues for its writer
+        if self.log is None and self.history is None and self.ratings is None:
+            return
+        rec = record_from_game(match.game, match.seats['X'].name,
+                               match.seats['O'].name, match.started)
+        if self.history: self.history.append(rec)
+        if self.ratings and not any(s.anonymous for s in match.seats.values()):
+            self.ratings.append(rec)
+        if self.log is None: return
+        try:
+            self.log.append(rec)
+        except (OSError, ValueError) as e:
+            print(f"game log: {e}")
+
+    def _pair(self, seat):
+        # first come plays X, next binary client plays O
+        if self._waiting is None:
+            timer = asyncio.get_running_loop().call_later(
+                self.pair_wait, self._pair_with_bot, seat)
+            self._waiting = (seat, timer)
+            return
+        first, timer = self._waiting
+        self._waiting = None; timer.cancel()
+        self._start_match({'X': first, 'O': seat})
+
+    def _pair_with_bot(self, seat):
+        if self._waiting and self._waiting[0] is seat:
+            self._waiting = None
+            self._start_match({'X': seat, 'O': self._bot_seat()})
+
+    def unqueue(self, seat):
+        # client left before it was paired
+        if self._waiting and self._waiting[0] is seat:
+            self._waiting[1].cancel(); self._waiting = None
+        seat.close()
+
+    async def _on_connect(self, reader, writer):
+        seat = ClientSeat(self, reader, writer)
+        try:
+            await seat.negotiate()
+        except (ProtocolError, ConnectionError, OSError,
+                asyncio.IncompleteReadError) as e:
+            print(f"{seat.peer}: handshake failed: {e}")
+            writer.close()
+            return
+        if seat.codec.binary: self._pair(seat)
+        else: self._start_match({'X': self._bot_seat(), 'O': seat})
+        await seat.run()
+
+    async def start(self):
+        """
+        bind and start accepting, returns once listening
+        """
+        self._server = await asyncio.start_server(
+            self._on_connect, self.host, self.port,
+            backlog=4096, reuse_address=True)
+        self.port = self._server.sockets[0].getsockname()[1]  # port 0 -> real one
+        return self._server
+
+    async def serve_forever(self):
+        if self._server is None: await self.start()
+        print(f"serving on {self.host}:{self.port}")
+        async with self._server:
+            await self._server.serve_forever()
+
+    def close(self):
+        if self._server: self._server.close()
+        for match in list(self.matches):
+            match.on_leave('X')
+        if self.log: self.log.close(); self.log = None
+        if self.history: self.history.close(); self.history = None
+        if self.ratings: self.ratings.close(); self.ratings = None
+
+def main(argv=None):
+    """
+    headless entry: python -m tictactoe.server --port 9999
+    """
+    parser = argparse.ArgumentParser(description="headless tic-tac-toe server")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=9999)
+    parser.add_argument("--size", type=int, default=3)
+    parser.add_argument("--win", type=int, default=None)
+    parser.add_argument("--bot", choices=sorted(POLICIES), default="solver")
+    parser.add_argument("--bot-delay", type=float, default=0.3,
+                        help="seconds before the bot replies")
+    parser.add_argument("--pair-wait", type=float, default=10.0,
+                        help="seconds a client waits for a human opponent")
+    parser.add_argument("--log", default=None, metavar="PATH",
+                        help="append every finished game to this record log")
+    parser.add_argument("--history", default=None, metavar="PATH",
+                        help="also keep games in this sqlite match history")
+    parser.add_argument("--ratings", default=None, metavar="PATH",
+                        help="keep a live elo ladder of this server's games, one "
+                             "player per client host, snapshotted to this file (not a ratings --history one)")
+    args = parser.parse_args(argv)
+    try:
+        server = GameServer(args.host, args.port, args.size, args.win,
+                            args.bot, args.bot_delay, args.pair_wait, args.log,
+                            args.history, args.ratings)
+    except ValueError as e:
+        print(e); return 1
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if server.log: server.log.close()
+        if server.history: server.history.close()
+        if server.ratings: server.ratings.close()
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
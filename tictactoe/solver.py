@@ -0,0 +1,207 @@
+from .bitboard import line_tables
+
+# transposition table bound flags
+EXACT, LOWER, UPPER = 0, 1, 2
+INF = float('inf')
+# transposition entries kept per solver, ~150 bytes each
+MAX_ENTRIES = 1 << 20
+
+def board_masks(game):
+    """
+    (x_mask, o_mask) for any engine with a game_board view
+    bit index = row*n + col
+    """
+    if hasattr(game, 'boards'):           # bitboard engine, no copy needed
+        return game.boards['X'], game.boards['O']
+    x = o = 0; n = game.board_size
+    for r, row in enumerate(game.game_board):
+        for c, sym in enumerate(row):
+            if sym == 'X': x |= 1 << (r*n + c)
+            elif sym == 'O': o |= 1 << (r*n + c)
+    return x, o
+
+def symmetry_perms(n):
+    """
+    the 8 rotations/reflections of an n x n board as cell index maps
+    """
+    maps = (
+        lambda r, c: (r, c), lambda r, c: (c, n-1-r),
+        lambda r, c: (n-1-r, n-1-c), lambda r, c: (n-1-c, r),
+        lambda r, c: (r, n-1-c), lambda r, c: (n-1-r, c),
+        lambda r, c: (c, r), lambda r, c: (n-1-c, n-1-r),
+    )
+    perms = []
+    for f in maps:
+        perm = []
+        for i in range(n*n):
+            r, c = f(*divmod(i, n))
+            perm.append(r*n + c)
+        perms.append(tuple(perm))
+    return tuple(perms)
+
+class Solver:
+    """
+    perfect-play negamax with alpha-beta and a transposition table
+    positions are folded over the 8 board symmetries before lookup
+    """
+    def __init__(self, board_size=3, win_length=None, max_entries=MAX_ENTRIES):
+        """
+        build symmetry and line tables, empty caches
+        max_entries caps the transposition table (and root cache); when
+        full it's cleared and refilled, so a long-lived solver stays bounded
+        """
+        if win_length is None: win_length = board_size
+        self.board_size = board_size
+        self.win_length = win_length
+        self.cells = board_size * board_size
+        _, self.cell_lines, self.full_mask = line_tables(board_size, win_length)
+        # per symmetry, one 256-entry table per byte of the mask
+        self._sym_tables = []
+        for perm in symmetry_perms(board_size):
+            chunks = []
+            for base in range(0, self.cells, 8):
+                table = []
+                for byte in range(256):
+                    m = 0
+                    for b in range(8):
+                        if byte >> b & 1 and base + b < self.cells:
+                            m |= 1 << perm[base + b]
+                    table.append(m)
+                chunks.append(table)
+            self._sym_tables.append(chunks)
+        # try cells on many lines first (center, then corners)
+        self.move_order = sorted(range(self.cells),
+                                 key=lambda i: -len(self.cell_lines[i]))
+        self.max_entries = max_entries
+        self.table = {}                   # canonical key -> (score, flag)
+        self._root_cache = {}             # raw (me, opp) -> root answer
+
+    def _transform(self, mask, chunks):
+        # map a mask through one symmetry, a byte at a time
+        out = 0; shift = 0
+        for table in chunks:
+            out |= table[mask >> shift & 0xff]; shift += 8
+        return out
+
+    def canonical(self, me, opp):
+        """
+        smallest packed (me, opp) over all 8 symmetries
+        """
+        cells = self.cells; best = None
+        for chunks in self._sym_tables:
+            key = self._transform(me, chunks) \
+                  | self._transform(opp, chunks) << cells
+            if best is None or key < best: best = key
+        return best
+
+    def _wins(self, board, idx):
+        # does the stone at idx complete a line for board
+        for mask in self.cell_lines[idx]:
+            if board & mask == mask:
+                return True
+        return False
+
+    def _negamax(self, me, opp, alpha, beta):
+        """
+        score for side to move: +empties for a win (faster is higher),
+        0 for a draw, negative for a loss
+        """
+        occupied = me | opp
+        if occupied == self.full_mask:
+            return 0
+        key = self.canonical(me, opp)
+        entry = self.table.get(key)
+        if entry is not None:
+            score, flag = entry
+            if flag == EXACT: return score
+            if flag == LOWER: alpha = max(alpha, score)
+            else: beta = min(beta, score)
+            if alpha >= beta: return score
+        alpha0 = alpha
+        empties = self.cells - bin(occupied).count('1')
+        best = -INF
+        for idx in self.move_order:
+            bit = 1 << idx
+            if occupied & bit: continue
+            nme = me | bit
+            if self._wins(nme, idx):
+                score = empties
+            else:
+                score = -self._negamax(opp, nme, -beta, -alpha)
+            if score > best:
+                best = score
+                if best > alpha: alpha = best
+                if alpha >= beta: break
+        if best <= alpha0: flag = UPPER
+        elif best >= beta: flag = LOWER
+        else: flag = EXACT
+        if len(self.table) >= self.max_entries: self.table.clear()
+        self.table[key] = (best, flag)
+        return best
+
+    def solve_masks(self, me, opp):
+        """
+        exact value (1 win, 0 draw, -1 loss) for side to move
+        and every move index that achieves it
+        """
+        cached = self._root_cache.get((me, opp))
+        if cached is not None:
+            return cached
+        occupied = me | opp
+        scores = {}
+        for idx in self.move_order:
+            bit = 1 << idx
+            if occupied & bit: continue
+            nme = me | bit
+            if self._wins(nme, idx):
+                scores[idx] = self.cells - bin(occupied).count('1')
+            elif nme | opp == self.full_mask:
+                scores[idx] = 0
+            else:
+                scores[idx] = -self._negamax(opp, nme, -INF, INF)
+        if not scores:
+            result = (0, ())
+        else:
+            top = max(scores.values())
+            value = (top > 0) - (top < 0)
+            result = (value, tuple(sorted(i for i, s in scores.items() if s == top)))
+        if len(self._root_cache) >= self.max_entries: self._root_cache.clear()
+        self._root_cache[(me, opp)] = result
+        return result
+
+    def solve(self, game, player=None):
+        """
+        value and best moves for player to move in a GameLogic position
+        player defaults to whoever has fewer marks (X on ties)
+        returns: (value, [(row, col), ...]); value is 1, 0 or -1
+        """
+        if (game.board_size, game.win_length) != (self.board_size, self.win_length):
+            raise ValueError("solver built for a different board")
+        x, o = board_masks(game)
+        if player is None:
+            player = 'O' if bin(x).count('1') > bin(o).count('1') else 'X'
+        if game.game_over:
+            if game.winner is None: return 0, []
+            return (1 if game.winner == player else -1), []
+        me, opp = (x, o) if player == 'X' else (o, x)
+        value, moves = self.solve_masks(me, opp)
+        return value, [divmod(i, self.board_size) for i in moves]
+
+    def best_move(self, game, player=None):
+        """
+        one optimal (row, col), or None if no move left
+        """
+        _, moves = self.solve(game, player)
+        return moves[0] if moves else None
+
+_default_solvers = {}
+
+def solve(game, player=None):
+    """
+    module-level shortcut, one shared solver per board shape
+    """
+    shape = (game.board_size, game.win_length)
+    solver = _default_solvers.get(shape)
+    if solver is None:
+        solver = _default_solvers[shape] = Solver(*shape)
+    return solver.solve(game, player)
@@ -0,0 +1,136 @@
+import os, sys, mmap, struct
+from .game_logic import GameLogic
+from .solver import Solver, board_masks
+
+# file layout: 16 byte header, then one little-endian u16 per position
+#   header: magic, version, board_size, win_length, pad, entry count
+#   entry:  bits 0..n*n-1 best-move mask, top 2 bits value code
+HEADER = struct.Struct('<4sBBBxI4x')
+ENTRY = struct.Struct('<H')
+MAGIC = b'TTTB'
+VERSION = 1
+# value codes: 0 = unreachable, 1 = loss, 2 = draw, 3 = win (side to move)
+VALUE_SHIFT = 14
+DEFAULT_PATH = os.path.join(os.path.dirname(__file__), 'tablebase_3x3.ttb')
+
+def index_tables(cells):
+    """
+    per-mask base-3 weights so index(me, opp) = t[me] + 2*t[opp]
+    a perfect hash of the position seen from the side to move
+    """
+    table = [0] * (1 << cells)
+    for m in range(1, 1 << cells):
+        low = m & -m
+        table[m] = table[m ^ low] + 3 ** (low.bit_length() - 1)
+    return table
+
+def reachable_positions(board_size=3, win_length=None):
+    """
+    walk every game GameLogic allows, X or O moving first
+    yields each distinct (me, opp, game) once, me = side to move;
+    game is one board walked with push/pop, valid until the next item
+    """
+    seen = set()
+
+    def walk(game, player):
+        x, o = board_masks(game)
+        me, opp = (x, o) if player == 'X' else (o, x)
+        if (me, opp) in seen: return
+        seen.add((me, opp))
+        yield me, opp, game
+        if game.game_over: return
+        nxt = 'O' if player == 'X' else 'X'
+        for r, c in game.legal_moves():
+            game.push(r, c, player)
+            yield from walk(game, nxt)
+            game.pop()
+
+    for first in ('X', 'O'):
+        yield from walk(GameLogic(board_size, win_length), first)
+
+def build(path=DEFAULT_PATH, board_size=3, win_length=None):
+    """
+    solve every reachable position and write the table
+    returns: number of reachable positions stored
+    """
+    if win_length is None: win_length = board_size
+    cells = board_size * board_size
+    if cells > VALUE_SHIFT:
+        raise ValueError("tablebase entries only fit boards up to 3x3")
+    solver = Solver(board_size, win_length)
+    weights = index_tables(cells)
+    entries = [0] * 3 ** cells
+    count = 0
+    for me, opp, game in reachable_positions(board_size, win_length):
+        if game.game_over:
+            # the side to move can only have lost, or it's a draw
+            value, moves = (-1 if game.winner else 0), ()
+        else:
+            value, moves = solver.solve_masks(me, opp)
+        mask = 0
+        for i in moves: mask |= 1 << i
+        entries[weights[me] + 2*weights[opp]] = (value + 2) << VALUE_SHIFT | mask
+        count += 1
+    tmp = path + '.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, board_size, win_length, len(entries)))
+        f.write(struct.pack(f'<{len(entries)}H', *entries))
+    os.replace(tmp, path)  # readers never see a half-written table
+    return count
+
+class Tablebase:
+    """
+    read-only, memory-mapped position table
+    every process mapping the same file shares one page-cached copy
+    """
+    def __init__(self, path=DEFAULT_PATH):
+        """
+        map file and check header
+        """
+        with open(path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, n, k, count = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION:
+            self._mm.close()
+            raise ValueError(f"{path}: not a tablebase (v{VERSION})")
+        if HEADER.size + count * ENTRY.size > len(self._mm):
+            self._mm.close()
+            raise ValueError(f"{path}: truncated tablebase")
+        self.board_size = n; self.win_length = k
+        self._move_mask = (1 << n*n) - 1
+        self._weights = index_tables(n*n)
+
+    def lookup_masks(self, me, opp):
+        """
+        (value, best-move mask) for side to move, or None if unreachable
+        """
+        w = self._weights
+        entry, = ENTRY.unpack_from(self._mm, HEADER.size + 2*(w[me] + 2*w[opp]))
+        code = entry >> VALUE_SHIFT
+        if not code: return None
+        return code - 2, entry & self._move_mask
+
+    def lookup(self, game, player=None):
+        """
+        same answer as Solver.solve, no search
+        returns: (value, [(row, col), ...]) or None if not in the table
+        """
+        if (game.board_size, game.win_length) != (self.board_size, self.win_length):
+            raise ValueError("tablebase built for a different board")
+        x, o = board_masks(game)
+        if player is None:
+            player = 'O' if bin(x).count('1') > bin(o).count('1') else 'X'
+        me, opp = (x, o) if player == 'X' else (o, x)
+        hit = self.lookup_masks(me, opp)
+        if hit is None: return None
+        value, mask = hit
+        n = self.board_size
+        return value, [divmod(i, n) for i in range(n*n) if mask >> i & 1]
+
+    def close(self):
+        self._mm.close()
+
+if __name__ == '__main__':
+    # build step: python -m tictactoe.tablebase [path]
+    out = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_PATH
+    print(f"wrote {build(out)} positions to {out}")
@@ -0,0 +1,122 @@
+import argparse, os, sys, time
+from concurrent.futures import ProcessPoolExecutor
+from .game_logic import GameLogic
+from .policies import POLICIES, make_policy
+
+def play_game(policies, board_size=3, win_length=None, timing=None):
+    """
+    one game, policies = {'X': policy, 'O': policy}, X moves first
+    GameLogic.make_move is the referee: an illegal move forfeits
+    returns: winning symbol, or None for a draw
+    """
+    game = GameLogic(board_size, win_length)
+    player = 'X'
+    while True:
+        t0 = time.perf_counter()
+        row, col = policies[player](game, player)
+        if timing is not None:
+            timing[player][0] += time.perf_counter() - t0
+            timing[player][1] += 1
+        res = game.make_move(row, col, player)
+        if res == "win": return player
+        if res == "draw": return None
+        if res == "invalid":
+            return 'O' if player == 'X' else 'X'
+        player = 'O' if player == 'X' else 'X'
+
+SEATS = ('first', 'second')
+
+def _new_tally():
+    # wins/draws/losses from first's side, timing per seat (not per policy
+    # name, which both seats share in e.g. solver vs solver)
+    return {
+        'games': 0, 'wins': 0, 'draws': 0, 'losses': 0,
+        'moves': {seat: 0 for seat in SEATS},
+        'seconds': {seat: 0.0 for seat in SEATS},
+    }
+
+def _run_chunk(args):
+    """
+    worker: play games [start, stop), seats alternate by game index
+    """
+    first, second, start, stop, board_size, win_length, seed = args
+    # seeded per chunk -> reproducible regardless of worker count
+    pols = (make_policy(first, f"{seed}:{start}:0"),
+            make_policy(second, f"{seed}:{start}:1"))
+    tally = _new_tally()
+    for i in range(start, stop):
+        # first policy plays X on even games, O on odd ones
+        first_sym = 'X' if i % 2 == 0 else 'O'
+        seat = {first_sym: 0, ('O' if first_sym == 'X' else 'X'): 1}
+        timing = {'X': [0.0, 0], 'O': [0.0, 0]}
+        winner = play_game({sym: pols[k] for sym, k in seat.items()},
+                           board_size, win_length, timing)
+        tally['games'] += 1
+        if winner is None: tally['draws'] += 1
+        elif winner == first_sym: tally['wins'] += 1
+        else: tally['losses'] += 1
+        for sym, k in seat.items():
+            tally['seconds'][SEATS[k]] += timing[sym][0]
+            tally['moves'][SEATS[k]] += timing[sym][1]
+    return tally
+
+def _merge(total, part):
+    # fold one chunk's tally into the running total
+    for key in ('games', 'wins', 'draws', 'losses'):
+        total[key] += part[key]
+    for seat in SEATS:
+        total['seconds'][seat] += part['seconds'][seat]
+        total['moves'][seat] += part['moves'][seat]
+
+def run_tournament(first, second, games, workers=None, chunk_size=500,
+                   board_size=3, win_length=None, seed=0):
+    """
+    play `games` games between two named policies over a process pool
+    returns: merged tally (from first's side, timing keyed by seat
+    'first' / 'second') plus wall time
+    """
+    for name in (first, second):
+        if name not in POLICIES:
+            raise ValueError(f"unknown policy {name!r}")
+    chunks = [(first, second, s, min(s + chunk_size, games),
+               board_size, win_length, seed)
+              for s in range(0, games, chunk_size)]
+    total = _new_tally()
+    t0 = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for part in pool.map(_run_chunk, chunks):
+            _merge(total, part)
+    total['wall_seconds'] = time.perf_counter() - t0
+    return total
+
+def main(argv=None):
+    """
+    headless entry: python -m tictactoe.tournament random solver -n 1000
+    """
+    parser = argparse.ArgumentParser(description="self-play tournament")
+    parser.add_argument("first", choices=sorted(POLICIES))
+    parser.add_argument("second", choices=sorted(POLICIES))
+    parser.add_argument("-n", "--games", type=int, default=1000)
+    parser.add_argument("-j", "--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--chunk", type=int, default=500, help="games per task")
+    parser.add_argument("--size", type=int, default=3)
+    parser.add_argument("--win", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    t = run_tournament(args.first, args.second, args.games, args.workers,
+                       args.chunk, args.size, args.win, args.seed)
+    g = t['games'] or 1
+    print(f"{args.first} vs {args.second}: {t['games']} games "
+          f"in {t['wall_seconds']:.2f}s ({t['games']/t['wall_seconds']:.0f} games/s)")
+    print(f"  first ({args.first}): {t['wins']} wins ({100*t['wins']/g:.1f}%), "
+          f"{t['draws']} draws ({100*t['draws']/g:.1f}%), "
+          f"{t['losses']} losses ({100*t['losses']/g:.1f}%)")
+    for seat, name in zip(SEATS, (args.first, args.second)):
+        moves = t['moves'][seat] or 1
+        print(f"  {seat} ({name}): {t['moves'][seat]} moves, "
+              f"{1e6*t['seconds'][seat]/moves:.1f}us per move")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,6 +1,7 @@
+import math
 from PySide6.QtWidgets import QWidget, QSizePolicy
-from PySide6.QtCore import Qt, QSize, Signal, QPointF, QRect
-from PySide6.QtGui import QPainter, QColor, QPen, QFont
+from PySide6.QtCore import Qt, QSize, Signal, QPointF, QRect, QRectF
+from PySide6.QtGui import QPainter, QColor, QPen, QFont, QPixmap
 
 class BoardWidget(QWidget):
     """
@@ -14,6 +15,8 @@ class BoardWidget(QWidget):
         self.setSizePolicy(QSizePolicy.Ignored, QSizePolicy.Ignored)
         self.setMinimumSize(QSize(150, 150))
         self._accept_clicks = True      # toggle click handling
+        self._cache_key = None          # (board size, side, dpr) of the cache
+        self._grid = None; self._glyphs = {}; self._font = None
 
     def set_accept_clicks(self, accept):
         # enable/disable user input
@@ -26,57 +29,124 @@ class BoardWidget(QWidget):
     def hasHeightForWidth(self):
         return True
 
+    def _geometry(self):
+        # square board centered in the widget: side, x/y offset, cell size
+        w, h = self.width(), self.height()
+        side = min(w, h)
+        return side, (w-side)/2, (h-side)/2, side / self.game_logic.board_size
+
+    def _cell_rect(self, r, c):
+        _, ox, oy, cell = self._geometry()
+        x0, y0 = ox + c*cell, oy + r*cell
+        # whole pixels covering the cell, plus a pixel for antialiasing
+        return QRect(math.floor(x0)-1, math.floor(y0)-1,
+                     math.ceil(x0+cell) - math.floor(x0) + 2,
+                     math.ceil(y0+cell) - math.floor(y0) + 2)
+
+    def update_cell(self, r, c):
+        """
+        repaint just one cell after a move; a finished game needs the
+        whole board for the winner overlay
+        """
+        if self.game_logic.game_over: self.update()
+        else: self.update(self._cell_rect(r, c))
+
+    def _pixmap(self, w, h, dpr):
+        pm = QPixmap(max(1, math.ceil(w*dpr)), max(1, math.ceil(h*dpr)))
+        pm.setDevicePixelRatio(dpr)
+        return pm
+
+    def _make_glyphs(self, cell, dpr):
+        """
+        one transparent cell-sized pixmap per symbol
+        """
+        # thinner strokes on big boards
+        mark_w = max(1.0, min(4.0, cell*0.06))
+        rad = cell/2 * 0.7
+        mid = QPointF(cell/2, cell/2)
+        glyphs = {}
+        for sym, color in (('X', "#8acaff"), ('O', "#ff8a8a")):
+            pm = self._pixmap(cell, cell, dpr)
+            pm.fill(Qt.transparent)
+            p = QPainter(pm)
+            p.setRenderHint(QPainter.Antialiasing, True)
+            p.setPen(QPen(QColor(color), mark_w))
+            if sym == 'X':
+                # two crossing lines
+                p.drawLine(mid + QPointF(-rad, -rad), mid + QPointF(rad, rad))
+                p.drawLine(mid + QPointF(rad, -rad), mid + QPointF(-rad, rad))
+            else:
+                p.drawEllipse(mid, rad, rad)
+            p.end()
+            glyphs[sym] = pm
+        return glyphs
+
+    def _render_cache(self, side, cell):
+        """
+        grid and X/O glyphs rasterized once per cell size and dpr,
+        so a paint is just pixmap blits
+        """
+        size = self.game_logic.board_size
+        dpr = self.devicePixelRatioF()
+        key = (size, side, dpr)
+        if key == self._cache_key: return
+        self._cache_key = key
+        # background + grid lines for the whole board
+        grid = self._pixmap(side, side, dpr)
+        grid.fill(QColor("#333"))
+        p = QPainter(grid)
+        p.setPen(QPen(QColor("#555"), 2))
+        for i in range(1, size):
+            x = int(i*cell)
+            p.drawLine(x, 0, x, side)
+            p.drawLine(0, x, side, x)
+        p.end()
+        self._grid = grid
+        self._glyphs = self._make_glyphs(cell, dpr)
+        self._font = QFont("Arial", max(1, int(side*0.6)), QFont.Bold)
+
     def paintEvent(self, event):
         """
-        draw grid, X/O marks, and highlight winner
+        draw grid, X/O marks, and highlight winner; only cells inside
+        the dirty rect are touched
         """
+        side, ox, oy, cell = self._geometry()
+        if side <= 0: return
+        self._render_cache(side, cell)
+        dirty = event.rect()
         painter = QPainter(self)
         try:
-            painter.setRenderHint(QPainter.Antialiasing, True)
-            w, h = self.width(), self.height()
-            side = min(w, h)
-            offset_x, offset_y = (w-side)/2, (h-side)/2
-            # background
-            painter.fillRect(self.rect(), QColor("#333"))
+            # background around the board, then the cached grid
+            painter.fillRect(dirty, QColor("#333"))
+            board_rect = QRect(int(ox), int(oy), side, side)
+            area = dirty.intersected(board_rect)
+            if area.isEmpty(): return
+            dpr = self._grid.devicePixelRatio()
+            src = area.translated(-int(ox), -int(oy))
+            painter.drawPixmap(QRectF(area), self._grid,
+                               QRectF(src.x()*dpr, src.y()*dpr,
+                                      src.width()*dpr, src.height()*dpr))
+            # marks in the dirty cells only
             size = self.game_logic.board_size
-            cell_size = side / size
-            # grid lines
-            pen = QPen(QColor("#555"), 2)
-            painter.setPen(pen)
-            for i in range(1, size):
-                x = offset_x + i*cell_size
-                painter.drawLine(int(x), int(offset_y), int(x), int(offset_y+side))
-                y = offset_y + i*cell_size
-                painter.drawLine(int(offset_x), int(y), int(offset_x+side), int(y))
-            # draw marks
-            for r in range(size):
-                for c in range(size):
-                    sym = self.game_logic.game_board[r][c]
-                    if not sym: continue
-                    cx = offset_x + c*cell_size + cell_size/2
-                    cy = offset_y + r*cell_size + cell_size/2
-                    rad = cell_size/2 * 0.7
-                    if sym == 'X':
-                        pen = QPen(QColor("#8acaff"), 4)
-                        painter.setPen(pen)
-                        # two crossing lines
-                        painter.drawLine(QPointF(cx-rad, cy-rad), QPointF(cx+rad, cy+rad))
-                        painter.drawLine(QPointF(cx+rad, cy-rad), QPointF(cx-rad, cy+rad))
-                    else:
-                        pen = QPen(QColor("#ff8a8a"), 4)
-                        painter.setPen(pen)
-                        painter.drawEllipse(QPointF(cx, cy), rad, rad)
+            r0 = max(0, int((area.top()-oy)//cell)); r1 = min(size-1, int((area.bottom()-oy)//cell))
+            c0 = max(0, int((area.left()-ox)//cell)); c1 = min(size-1, int((area.right()-ox)//cell))
+            board = self.game_logic.game_board
+            glyphs = self._glyphs
+            for r in range(r0, r1+1):
+                row = board[r]; y = oy + r*cell
+                for c in range(c0, c1+1):
+                    sym = row[c]
+                    if sym: painter.drawPixmap(QPointF(ox + c*cell, y), glyphs[sym])
             # if game over, draw winner in center
             if self.game_logic.game_over and self.game_logic.winner:
                 win = self.game_logic.winner
-                font = QFont("Arial", int(side*0.6), QFont.Bold)
-                painter.setFont(font)
+                painter.setRenderHint(QPainter.Antialiasing, True)
+                painter.setFont(self._font)
                 color = QColor("#8acaff") if win=='X' else QColor("#ff8a8a")
                 painter.setPen(QPen(color, 10, Qt.SolidLine, Qt.RoundCap, Qt.RoundJoin))
-                rect = QRect(int(offset_x), int(offset_y), int(side), int(side))
-                painter.drawText(rect, Qt.AlignCenter, win)
+                painter.drawText(board_rect, Qt.AlignCenter, win)
         finally:
-            pass  # nothing else
+            painter.end()
 
     def mouseReleaseEvent(self, event):
         """
@@ -84,15 +154,12 @@ class BoardWidget(QWidget):
         """
         if not self._accept_clicks or self.game_logic.game_over:
             return
-        w, h = self.width(), self.height()
-        side = min(w, h)
-        ox, oy = (w-side)/2, (h-side)/2
+        side, ox, oy, cell = self._geometry()
         x, y = event.position().x(), event.position().y()
         # only inside grid
         if not (ox <= x < ox+side and oy <= y < oy+side):
             return
         size = self.game_logic.board_size
-        cell = side / size
         if cell <= 0: return
         cx, cy = x-ox, y-oy
         col = int(cx//cell); row = int(cy//cell)
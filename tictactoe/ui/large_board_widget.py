@@ -0,0 +1,175 @@
+import math
+from PySide6.QtCore import Qt, QLineF, QRect
+from PySide6.QtGui import QPainter, QColor, QPen, QFont
+from .board_widget import BoardWidget
+
+MIN_CELL = 6.0      # px; caps how many cells one frame can show
+MAX_CELL = 120.0
+ZOOM_STEP = 1.25    # per wheel notch
+DRAG_SLOP = 4       # px of movement before a press becomes a pan
+
+class LargeBoardWidget(BoardWidget):
+    """
+    zoomable, pannable view for boards far bigger than the screen
+    only cells inside the viewport are painted, so a frame costs the
+    same on a 19x19 or a 300x300 board; wheel zooms around the cursor,
+    dragging pans, a click without drag plays the cell under it
+    """
+    def __init__(self, game_logic, parent=None):
+        super().__init__(game_logic, parent)
+        self._cell = None               # px per cell, set on first resize
+        self._ox = self._oy = 0.0       # board px at the widget's top-left
+        self._press = None              # (pos, ox, oy) of the last press
+        self._dragging = False
+
+    def hasHeightForWidth(self):
+        return False  # the viewport can be any shape
+
+    def _board_px(self):
+        return self.game_logic.board_size * self._cell
+
+    def _clamp_pan(self):
+        # center a board smaller than the view, else keep it on screen
+        span = self._board_px()
+        w, h = self.width(), self.height()
+        self._ox = (span-w)/2 if span <= w else max(0.0, min(self._ox, span-w))
+        self._oy = (span-h)/2 if span <= h else max(0.0, min(self._oy, span-h))
+
+    def fit_view(self):
+        """
+        zoom out as far as MIN_CELL allows, centered on the board
+        """
+        side = min(self.width(), self.height())
+        self._cell = max(MIN_CELL, min(MAX_CELL, side / self.game_logic.board_size))
+        span = self._board_px()
+        self._ox = (span-self.width())/2; self._oy = (span-self.height())/2
+        self._clamp_pan()
+        self.update()
+
+    def zoom(self, factor, x, y):
+        """
+        scale by factor keeping the board point under (x, y) fixed
+        """
+        cell = max(MIN_CELL, min(MAX_CELL, self._cell * factor))
+        bx, by = (x+self._ox) / self._cell, (y+self._oy) / self._cell
+        self._cell = cell
+        self._ox = bx*cell - x; self._oy = by*cell - y
+        self._clamp_pan()
+        self.update()
+
+    def cell_at(self, x, y):
+        """
+        (row, col) under a widget point, or None; O(1) at any size
+        """
+        n = self.game_logic.board_size
+        col = math.floor((x+self._ox) / self._cell)
+        row = math.floor((y+self._oy) / self._cell)
+        if 0 <= row < n and 0 <= col < n: return row, col
+        return None
+
+    def _cell_rect(self, r, c):
+        cell = self._cell
+        x0, y0 = c*cell - self._ox, r*cell - self._oy
+        return QRect(math.floor(x0)-1, math.floor(y0)-1,
+                     math.ceil(cell)+3, math.ceil(cell)+3)
+
+    def _visible(self, rect):
+        # inclusive row/col range of cells touching rect
+        n = self.game_logic.board_size; cell = self._cell
+        c0 = max(0, math.floor((rect.left()+self._ox) / cell))
+        c1 = min(n-1, math.floor((rect.right()+self._ox) / cell))
+        r0 = max(0, math.floor((rect.top()+self._oy) / cell))
+        r1 = min(n-1, math.floor((rect.bottom()+self._oy) / cell))
+        return r0, r1, c0, c1
+
+    def _render_cache(self, side, cell):
+        # glyphs follow the zoom level; there's no whole-board grid pixmap
+        dpr = self.devicePixelRatioF()
+        key = (cell, dpr)
+        if key == self._cache_key: return
+        self._cache_key = key
+        self._glyphs = self._make_glyphs(cell, dpr)
+
+    def paintEvent(self, event):
+        """
+        grid lines and marks for the visible cells only
+        """
+        if self._cell is None: self.fit_view()
+        cell = self._cell; ox, oy = self._ox, self._oy
+        self._render_cache(None, cell)
+        dirty = event.rect()
+        painter = QPainter(self)
+        try:
+            painter.fillRect(dirty, QColor("#333"))
+            r0, r1, c0, c1 = self._visible(dirty)
+            if r0 <= r1 and c0 <= c1:
+                # grid: interior lines bordering the visible cells
+                n = self.game_logic.board_size
+                top, bottom = r0*cell - oy, (r1+1)*cell - oy
+                left, right = c0*cell - ox, (c1+1)*cell - ox
+                lines = [QLineF(int(c*cell - ox), top, int(c*cell - ox), bottom)
+                         for c in range(max(1, c0), min(n, c1+2))]
+                lines += [QLineF(left, int(r*cell - oy), right, int(r*cell - oy))
+                          for r in range(max(1, r0), min(n, r1+2))]
+                painter.setPen(QPen(QColor("#555"), 2 if cell >= 16 else 1))
+                painter.drawLines(lines)
+                board = self.game_logic.game_board
+                glyphs = self._glyphs
+                for r in range(r0, r1+1):
+                    row = board[r]; y = r*cell - oy
+                    for c in range(c0, c1+1):
+                        sym = row[c]
+                        if sym: painter.drawPixmap(int(c*cell - ox), int(y), glyphs[sym])
+            # winner over the whole viewport
+            if self.game_logic.game_over and self.game_logic.winner:
+                win = self.game_logic.winner
+                size = max(1, int(min(self.width(), self.height())*0.6))
+                if self._font is None or self._font.pointSize() != size:
+                    self._font = QFont("Arial", size, QFont.Bold)
+                painter.setRenderHint(QPainter.Antialiasing, True)
+                painter.setFont(self._font)
+                color = QColor("#8acaff") if win=='X' else QColor("#ff8a8a")
+                painter.setPen(QPen(color, 10, Qt.SolidLine, Qt.RoundCap, Qt.RoundJoin))
+                painter.drawText(self.rect(), Qt.AlignCenter, win)
+        finally:
+            painter.end()
+
+    def resizeEvent(self, event):
+        if self._cell is None: self.fit_view()
+        else: self._clamp_pan()
+        super().resizeEvent(event)
+
+    def wheelEvent(self, event):
+        steps = event.angleDelta().y() / 120
+        if not steps: return
+        pos = event.position()
+        self.zoom(ZOOM_STEP ** steps, pos.x(), pos.y())
+
+    def mouseDoubleClickEvent(self, event):
+        self.fit_view()
+
+    def mousePressEvent(self, event):
+        self._press = (event.position(), self._ox, self._oy)
+        self._dragging = False
+
+    def mouseMoveEvent(self, event):
+        if self._press is None: return
+        start, ox, oy = self._press
+        d = event.position() - start
+        if not self._dragging and abs(d.x()) + abs(d.y()) < DRAG_SLOP: return
+        self._dragging = True
+        self._ox = ox - d.x(); self._oy = oy - d.y()
+        self._clamp_pan()
+        self.update()
+
+    def mouseReleaseEvent(self, event):
+        """
+        a press that never turned into a drag is a click on a cell
+        """
+        dragged = self._dragging
+        self._press = None; self._dragging = False
+        if dragged or not self._accept_clicks or self.game_logic.game_over:
+            return
+        if event.button() != Qt.LeftButton: return
+        hit = self.cell_at(event.position().x(), event.position().y())
+        if hit: self.cell_clicked.emit(*hit)
@@ -1,27 +1,44 @@
-import socket
 from ..game_logic import GameLogic
 from ..ui.board_widget import BoardWidget
-from ..network import NetworkWorker
+from ..ui.large_board_widget import LargeBoardWidget
+from ..network import NetworkWorker, QtNetworkWorker
+from ..netinfo import AddressCache
+from ..discovery import Browser
+from ..protocol import PROTOCOL_VERSION, ProtocolError, hello
+from ..records import GameLog, record_from_game
 
 from PySide6.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
-    QPushButton, QLabel, QMenuBar, QMenu, QLineEdit,
-    QRadioButton, QGroupBox, QMessageBox, QSizePolicy
+    QPushButton, QLabel, QMenuBar, QMenu,
+    QRadioButton, QGroupBox, QMessageBox, QSizePolicy, QComboBox
 )
-from PySide6.QtGui import QAction, QFont
-from PySide6.QtCore import Qt, QThread, Slot
+from PySide6.QtGui import QAction, QFont, QKeySequence
+from PySide6.QtCore import Qt, QThread, Slot, Signal
+import time
+
+LARGE_BOARD = 19
 
 class TicTacToeWindow(QMainWindow):
     """
     main window UI and game flow
     """
-    def __init__(self):
+    addresses_ready = Signal(list)  # local ips, from the lookup thread
+    games_found = Signal(list)      # lan games, from the discovery thread
+    def __init__(self, board_size=3, win_length=None, transport="thread",
+                 log_path=None, history_path=None):
         """
         init state, ui widgets, signals
+        transport: "thread" (blocking sockets on a worker thread) or
+        "qt" (QTcpSocket on the gui event loop, no extra threads)
+        log_path: game record log every finished game is appended to
+        history_path: sqlite match history that also gets every game
         """
         super().__init__()
-        self.game_logic = GameLogic()
-        self.board_widget = BoardWidget(self.game_logic, parent=self)
+        self.transport = transport
+        self.game_logic = GameLogic(board_size, win_length)
+        # past this size cells get too small to click, switch to zoom/pan
+        board_cls = LargeBoardWidget if board_size > LARGE_BOARD else BoardWidget
+        self.board_widget = board_cls(self.game_logic, parent=self)
         # network thread + worker placeholders
         self.network_thread = None; self.network_worker = None
         # game state flags
@@ -30,6 +47,16 @@ class TicTacToeWindow(QMainWindow):
         self.rematch_requested_by_me = False
         self.rematch_requested_by_opponent = False
         self.who_started_last_round = 'X'
+        # interface lookup runs in the background, never on the gui thread
+        self.addresses_ready.connect(self._on_addresses_ready)
+        self._addresses = AddressCache(self.addresses_ready.emit)
+        self.games_found.connect(self._on_games_found)
+        self._browser = None            # lan discovery while picking a host
+        # opened on the first finished game, keeps them off the startup path
+        self.log_path = log_path; self._log = None
+        self.history_path = history_path; self._history = None
+        self._round_started = time.time()
+        self._finished = None           # last game's record, written once it can't be undone
 
         self._setup_ui()
         self._update_message("Select game mode or start local game.")
@@ -65,9 +92,12 @@ class TicTacToeWindow(QMainWindow):
         local_action.triggered.connect(self.reset_game)
         net_action = QAction("Setup Network Game", self)
         net_action.triggered.connect(self._enable_network_setup)
+        self.undo_action = QAction("Undo Move", self)   # local games only
+        self.undo_action.setShortcut(QKeySequence.Undo)
+        self.undo_action.triggered.connect(self._undo_move)
         quit_action = QAction("Quit", self)
         quit_action.triggered.connect(self.close)
-        for act in (local_action, net_action): game_menu.addAction(act)
+        for act in (local_action, net_action, self.undo_action): game_menu.addAction(act)
         game_menu.addSeparator(); game_menu.addAction(quit_action)
         menu_bar.addMenu(game_menu)
         self.setMenuBar(menu_bar)
@@ -87,12 +117,11 @@ class TicTacToeWindow(QMainWindow):
         layout.addLayout(mode_layout)
         # ip + port input
         ip_layout = QHBoxLayout(); ip_layout.addWidget(QLabel("IP Address:"))
-        self.ip_address_input = QLineEdit()
-        self.ip_address_input.setPlaceholderText("Your IP (auto-detect)")
-        ip = self._get_local_ip()         # auto-detect
-        if ip: self.ip_address_input.setText(ip)
-        self.ip_address_input.setEnabled(False)
+        # host: pick one of our addresses, client: type the host's
+        self.ip_address_input = QComboBox()
+        self.ip_address_input.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Fixed)
         ip_layout.addWidget(self.ip_address_input)
+        self._fill_host_addresses(self._addresses.addresses())  # starts the lookup
         layout.addLayout(ip_layout)
         self.port = 9999
         self.start_network_button = QPushButton("Start Hosting")
@@ -100,37 +129,63 @@ class TicTacToeWindow(QMainWindow):
         layout.addWidget(self.start_network_button, alignment=Qt.AlignCenter)
         self.network_controls_group.setLayout(layout)
 
-    def _get_local_ip(self):
-        '''
-        Return the machine's LAN IP (not 127.0.0.1) by opening a UDP socket to a non-routable address (no packets sent).
-        
-        - By “connecting” a UDP socket to a non-routable address, 
-        you force the OS to pick which local interface (and IP) 
-        it would use to send to that destination without actually sending any packets.
-        - If that comes back as 127.0.0.1, it falls back to the hostname, 
-        which usually gives you your LAN IP instead of loopback.
-        - Then it closes the socket and returns whatever IP it found (or None on error).
-        '''
-        s = None
+    def _local_ip(self):
+        # first cached address (the default route's), None before the lookup is done
+        addrs = self._addresses.addresses()
+        return addrs[0] if addrs else None
+
+    def _fill_host_addresses(self, addrs):
+        # keep the user's pick if it's still there
+        box = self.ip_address_input
+        current = box.currentText()
+        box.clear(); box.addItems(addrs)
+        if current in addrs: box.setCurrentText(current)
+        box.setPlaceholderText("Your IP (detecting...)" if not addrs else "")
+
+    @Slot(list)
+    def _on_addresses_ready(self, addrs):
+        if not self.client_radio.isChecked():
+            self._fill_host_addresses(addrs)
+
+    def _start_browsing(self):
+        if self._browser: return
         try:
-            s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-            s.settimeout(0.1)
-            s.connect(('10.254.254.254', 1))
-            ip = s.getsockname()[0]
-            if ip == '127.0.0.1':
-                ip = socket.gethostbyname(socket.gethostname())
-            return ip
-        except: return None
-        finally:
-            if s: s.close()
+            self._browser = Browser(self.games_found.emit).start()
+        except OSError as e:
+            print(f"lan discovery unavailable: {e}")
+
+    def _stop_browsing(self):
+        b = self._browser; self._browser = None
+        if b: b.stop()
+
+    @Slot(list)
+    def _on_games_found(self, games):
+        # joinable games for our board, typed text survives the refresh
+        if not self.client_radio.isChecked(): return
+        box = self.ip_address_input
+        text = box.currentText()
+        box.clear()
+        n, k = self.game_logic.board_size, self.game_logic.win_length
+        for g in games:
+            if g.version == PROTOCOL_VERSION and (g.board_size, g.win_length) == (n, k):
+                box.addItem(f"{g.name} ({g.host}:{g.port})", (g.host, g.port))
+        box.setEditText(text)
+
+    def _host_target(self, text):
+        """
+        picked lan game -> its (ip, port); typed "ip" or "ip:port" also works
+        """
+        idx = self.ip_address_input.findText(text)
+        if idx >= 0 and self.ip_address_input.itemData(idx):
+            return self.ip_address_input.itemData(idx)
+        host, _, port = text.partition(':')
+        return host, int(port) if port.isdigit() else self.port
 
     def _update_ip_input_state(self):
         # toggle ip field for client vs host
         is_client = self.client_radio.isChecked()
-        self.ip_address_input.setEnabled(is_client)
-        self.ip_address_input.setPlaceholderText(
-            "Enter Host IP" if is_client else "Your IP (auto)"
-        )
+        box = self.ip_address_input
+        box.setEditable(is_client)
         # swap the button label
         if is_client:
             self.start_network_button.setText("Connect to Host")
@@ -138,12 +193,13 @@ class TicTacToeWindow(QMainWindow):
             self.start_network_button.setText("Start Hosting")
 
         
-        # reset ip text
+        # reset ip text; cached addresses show at once, a stale cache
+        # refreshes in the background and lands in _on_addresses_ready
         if not is_client:
-            ip = self._get_local_ip()
-            self.ip_address_input.setText(ip or "")
+            self._fill_host_addresses(self._addresses.addresses())
         else:
-            self.ip_address_input.setText("")
+            box.clear(); box.lineEdit().setPlaceholderText("Enter Host IP or pick a LAN game")
+        self._update_network_ui_state(self.network_controls_group.isEnabled())
 
     def _create_bottom_controls(self):
         # status label + rematch/reset buttons
@@ -189,8 +245,10 @@ class TicTacToeWindow(QMainWindow):
         self.message_label.setText(text)
 
     def _update_network_ui_state(self, enabled):
-        # enable/disable network controls
+        # enable/disable network controls, browse the lan while picking a host
         self.network_controls_group.setEnabled(enabled)
+        if enabled and self.client_radio.isChecked(): self._start_browsing()
+        else: self._stop_browsing()
 
     def _enable_network_setup(self):
         # switch to network mode
@@ -201,18 +259,23 @@ class TicTacToeWindow(QMainWindow):
     @Slot()
     def _start_or_connect_network_game(self):
         # start host or client thread
-        if self.network_thread and self.network_thread.isRunning():
+        if (self.network_thread and self.network_thread.isRunning()) \
+           or (self.network_worker and self.network_worker._running):
             self._update_message("network active.", is_error=True)
             return
         self._stop_network_worker()
-        ip = self.ip_address_input.text().strip()
+        try:
+            hello(self.game_logic.board_size, self.game_logic.win_length)
+        except ProtocolError as e:
+            QMessageBox.warning(self, "Network Error", str(e))
+            return
+        ip = self.ip_address_input.currentText().strip()
         if self.host_radio.isChecked():
             self.game_mode='host'
-            host_ip = ip or self._get_local_ip()
+            host_ip = ip or self._local_ip()
             if not host_ip or host_ip=='127.0.0.1':
-                self._update_message("Enter valid host ip", is_error=True)
+                self._update_message("No local address found yet, try again", is_error=True)
                 return
-            self.ip_address_input.setText(host_ip)
             self._setup_and_start_worker()
             self.network_worker.start_hosting(host_ip, self.port)
         else:
@@ -220,8 +283,9 @@ class TicTacToeWindow(QMainWindow):
             if not ip:
                 QMessageBox.warning(self, "Network Error", "Enter host ip")
                 return
+            host_ip, port = self._host_target(ip)
             self._setup_and_start_worker()
-            self.network_worker.start_connecting(ip, self.port)
+            self.network_worker.start_connecting(host_ip, port)
         # lock ui
         self._update_network_ui_state(False)
         self.board_widget.set_accept_clicks(False)
@@ -229,9 +293,23 @@ class TicTacToeWindow(QMainWindow):
 
     def _setup_and_start_worker(self):
         # create thread + worker + connect signals
+        n, k = self.game_logic.board_size, self.game_logic.win_length
+        if self.transport == "qt":
+            # event-loop sockets: worker stays on this thread
+            self.network_worker = QtNetworkWorker(n, k)
+            self._connect_worker_signals()
+            return
         self.network_thread = QThread(self)
-        self.network_worker = NetworkWorker()
+        self.network_worker = NetworkWorker(n, k)
         self.network_worker.moveToThread(self.network_thread)
+        self._connect_worker_signals()
+        self.network_thread.started.connect(lambda: print("network thread started"))
+        self.network_thread.finished.connect(self._on_network_thread_finished)
+        self.network_thread.finished.connect(self.network_worker.deleteLater)
+        self.network_thread.start()
+
+    def _connect_worker_signals(self):
+        # worker signals -> window slots, same for both transports
         self.network_worker.connected.connect(self._on_network_connected)
         self.network_worker.disconnected.connect(self._on_network_disconnected)
         self.network_worker.move_received.connect(self._on_move_received)
@@ -241,16 +319,13 @@ class TicTacToeWindow(QMainWindow):
         self.network_worker.rematch_request_received.connect(self._handle_rematch_request)
         self.network_worker.rematch_accepted.connect(self._handle_rematch_accepted)
         self.network_worker.rematch_declined.connect(self._handle_rematch_declined)
-        self.network_thread.started.connect(lambda: print("network thread started"))
-        self.network_thread.finished.connect(self._on_network_thread_finished)
-        self.network_thread.finished.connect(self.network_worker.deleteLater)
-        self.network_thread.start()
 
     @Slot(str)
     def _on_assign_symbol(self, symbol):
         # set player symbols + first turn
         self.my_symbol = symbol
         self.opponent_symbol = 'O' if symbol=='X' else 'X'
+        self._round_started = time.time()
         self._update_message(f"network game started. you are '{self.my_symbol}'.")
         self.is_my_turn = (self.my_symbol==self.who_started_last_round)
         self.board_widget.set_accept_clicks(self.is_my_turn)
@@ -277,6 +352,7 @@ class TicTacToeWindow(QMainWindow):
     def _on_network_error(self, err):
         # show error + revert to local
         if self.game_mode!='local':
+            if self.game_mode=='host': self._addresses.invalidate()  # address may be gone
             self._update_message(f"Network error: {err}", is_error=True)
             QMessageBox.critical(self, "Network Error", err)
             self._stop_network_worker()
@@ -305,6 +381,46 @@ class TicTacToeWindow(QMainWindow):
         self.board_widget.set_accept_clicks(False)
         self.is_my_turn=False
         self._update_rematch_buttons_visibility()
+        self._hold_record()
+
+    def _hold_record(self):
+        # undo can still take the ending back, so only note the record here;
+        # _record_game writes it when the next round, a reset or close comes
+        if not (self.log_path or self.history_path): return
+        if self.game_mode == 'local': names = {'X': 'local', 'O': 'local'}
+        else:
+            peer = getattr(self.network_worker, 'peer', '') or 'remote'
+            names = {self.my_symbol: 'me', self.opponent_symbol: peer}
+        self._finished = record_from_game(self.game_logic, names['X'], names['O'],
+                                          self._round_started)
+
+    def _record_game(self):
+        # append the held game to the record log and match history
+        rec, self._finished = self._finished, None
+        if rec is None: return
+        if self.log_path:
+            try:
+                if self._log is None: self._log = GameLog(self.log_path)
+                self._log.append(rec)
+            except (OSError, ValueError) as e:
+                print(f"game log: {e}"); self.log_path = None  # don't retry every game
+        if self.history_path:
+            # queued for the writer thread, never waits on disk
+            if self._history is None:
+                from ..history import MatchHistory  # sqlite3 stays off startup
+                self._history = MatchHistory(self.history_path)
+            self._history.append(rec)
+
+    @Slot()
+    def _undo_move(self):
+        # take back the last local move, even the one that ended the game
+        if self.game_mode != 'local' or not self.game_logic.move_stack:
+            return
+        r, c, p = self.game_logic.unmake_move()
+        self._finished = None       # that ending is gone, the replay gets its own
+        self.board_widget.update()  # full repaint, may clear the winner overlay
+        self.board_widget.set_accept_clicks(True); self.is_my_turn = True
+        self._update_message(f"player {p}'s turn")
 
     @Slot(int, int)
     def _on_cell_clicked(self, r, c):
@@ -317,7 +433,7 @@ class TicTacToeWindow(QMainWindow):
             p = 'X' if self.game_logic.move_count % 2 == 0 else 'O'
             res = self.game_logic.make_move(r, c, p)
             if res != "invalid":
-                self.board_widget.update()
+                self.board_widget.update_cell(r, c)
                 if res == "win":
                     self._handle_game_over(f"player {p} wins!", True)
                 elif res == "draw":
@@ -335,7 +451,7 @@ class TicTacToeWindow(QMainWindow):
 
         if self.game_logic.is_cell_empty(r, c):
             res = self.game_logic.make_move(r, c, self.my_symbol)
-            self.board_widget.update()
+            self.board_widget.update_cell(r, c)
             if self.network_worker and self.network_worker._running:
                 self.network_worker.send_move(r, c)
             if res == "win":
@@ -356,7 +472,7 @@ class TicTacToeWindow(QMainWindow):
         # when opponent moves
         if self.game_logic.game_over or self.game_mode=='local': return
         res = self.game_logic.make_move(r, c, self.opponent_symbol)
-        self.board_widget.update()
+        self.board_widget.update_cell(r, c)
         if res=="win": self._handle_game_over(f"Opponent ({self.opponent_symbol}) wins!", False)
         elif res=="draw": self._handle_game_over("It's a draw!", True)
         elif res=="continue":
@@ -408,7 +524,8 @@ class TicTacToeWindow(QMainWindow):
 
     def _start_new_round(self):
         # clear board + swap starter
-        self.game_logic.reset_game()
+        self._record_game()
+        self.game_logic.reset_game(); self._round_started = time.time()
         self.rematch_requested_by_me=False; self.rematch_requested_by_opponent=False
         self.who_started_last_round = 'O' if self.who_started_last_round=='X' else 'X'
         self.is_my_turn = (self.my_symbol==self.who_started_last_round)
@@ -427,16 +544,21 @@ class TicTacToeWindow(QMainWindow):
             try: self.network_worker.stop()
             except: pass
         if self.network_thread and self.network_thread.isRunning():
+            # worker.stop() already woke and joined the socket thread,
+            # so this only ends the qt event loop
             self.network_thread.quit()
-            if not self.network_thread.wait(1000): self.network_thread.terminate()
+            if not self.network_thread.wait(1000): print("network thread slow to stop")
+        elif self.network_worker and not self.network_thread:
+            self.network_worker.deleteLater()  # qt transport, no thread to clean up
         self.network_thread=None; self.network_worker=None
         self._explicit_stop=False
 
     @Slot()
     def reset_game(self):
         # full reset to local
+        self._record_game()
         self._stop_network_worker()
-        self.game_logic.reset_game()
+        self.game_logic.reset_game(); self._round_started = time.time()
         self.game_mode='local'; self.my_symbol='X'; self.opponent_symbol='O'; self.is_my_turn=True
         self.rematch_requested_by_me=False; self.rematch_requested_by_opponent=False
         self.who_started_last_round='X'
@@ -448,5 +570,8 @@ class TicTacToeWindow(QMainWindow):
 
     def closeEvent(self, event):
         # ensure cleanup on close
-        self._stop_network_worker()
+        self._stop_network_worker(); self._stop_browsing()
+        self._record_game()
+        if self._log: self._log.close(); self._log = None
+        if self._history: self._history.close(); self._history = None
         event.accept()